@@ -0,0 +1,130 @@
+"""
+Classic converters, which dispatch every field at runtime, vs generated
+structure and unstructure functions compiled per class.
+
+With default dict factory generated unstructuring skips unset fields
+itself and builds plain dicts. For comparison it is also measured with
+dict subclass factory, which receives all fields and omits unset ones
+on assignment.
+
+Models are nested: page contains list of items with 55 fields, each item
+contains nested model with 55 fields. Fields are ints, strs, str
+subclasses, pendulum datetimes and optional values.
+
+Run: python benchmarks/bench_converter.py
+"""
+import dataclasses
+import time
+from typing import List, Optional
+
+import attr
+import pendulum
+from server import report
+
+from apitist import Converter, ConverterType
+from apitist.constructor import MissingDict, NothingDict
+
+N = 200
+ITEMS = 50
+FIELDS = 55
+
+
+class Code(str):
+    pass
+
+
+FIELD_TYPES = [
+    (int, 1),
+    (str, "value"),
+    (Code, "code"),
+    (pendulum.DateTime, "2019-03-06T14:58:10+00:00"),
+    (Optional[int], None),
+]
+
+
+def field_types():
+    for i in range(FIELDS):
+        t, value = FIELD_TYPES[i % len(FIELD_TYPES)]
+        yield f"field{i}", t, value
+
+
+def attrs_models():
+    nested = attr.make_class(
+        "Nested", {name: attr.ib(type=t) for name, t, _ in field_types()}
+    )
+    fields = {name: attr.ib(type=t) for name, t, _ in field_types()}
+    fields["nested"] = attr.ib(type=nested)
+    item = attr.make_class("Item", fields)
+    return attr.make_class("Page", {"items": attr.ib(type=List[item])})
+
+
+def dataclass_models():
+    nested = dataclasses.make_dataclass(
+        "Nested", [(name, t) for name, t, _ in field_types()]
+    )
+    fields = [(name, t) for name, t, _ in field_types()]
+    item = dataclasses.make_dataclass("Item", fields + [("nested", nested)])
+    return dataclasses.make_dataclass("Page", [("items", List[item])])
+
+
+def page():
+    nested = {name: value for name, _, value in field_types()}
+    return {"items": [dict(nested, nested=nested) for _ in range(ITEMS)]}
+
+
+class OmittingNothingDict(NothingDict):
+    pass
+
+
+class OmittingMissingDict(MissingDict):
+    pass
+
+
+def run(converter_type, generated, models, dict_factory=None):
+    conv = Converter(converter_type, generated)
+    conv.register_additional_hooks()
+    if dict_factory is not None:
+        conv.set_dict_factory(dict_factory)
+    data = page()
+    structure, unstructure = conv.structure, conv.unstructure
+    start = time.perf_counter()
+    for _ in range(N):
+        structured = structure(data, models)
+    structured_in = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(N):
+        unstructured = unstructure(structured)
+    unstructured_in = time.perf_counter() - start
+    assert unstructured == data
+    return structured_in, unstructured_in
+
+
+if __name__ == "__main__":
+    count = N * ITEMS * 2
+    for title, converter_type, models, dict_subclass in [
+        ("attrs", ConverterType.ATTRS, attrs_models(), OmittingNothingDict),
+        (
+            "dataclasses",
+            ConverterType.DATACLASS,
+            dataclass_models(),
+            OmittingMissingDict,
+        ),
+    ]:
+        classic = run(converter_type, False, models)
+        subclass = run(converter_type, True, models, dict_subclass)
+        generated = run(converter_type, True, models)
+        report(
+            f"Structure {count} {title} models of {FIELDS} fields",
+            [
+                ("Classic converter", classic[0], count),
+                ("Generated functions", generated[0], count),
+            ],
+        )
+        report(
+            f"Unstructure {count} {title} models of {FIELDS} fields",
+            [
+                ("Classic converter", classic[1], count),
+                ("Generated, dict subclass", subclass[1], count),
+                ("Generated, plain dict", generated[1], count),
+            ],
+        )
@@ -0,0 +1,71 @@
+"""
+Request overhead with many session cookies: RequestsCookieJar
+vs CompactCookieJar, for a single session and for SharedSession.
+
+Requests are dispatched to in-process WSGI application, so that network
+does not hide cookie handling overhead.
+
+Run: python benchmarks/bench_cookies.py
+"""
+import time
+
+from server import BODY, report
+
+from apitist import session
+from apitist.requests import SharedSession
+
+N = 2000
+DOMAINS = 50
+COOKIES_PER_DOMAIN = 3
+
+
+def app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "application/json")])
+    return [BODY]
+
+
+def make_session(**kwargs):
+    # Environment settings are cached to leave only cookies overhead
+    s = session(
+        "http://testserver.domain0.com/api", cache_environment=True, **kwargs
+    )
+    for d in range(DOMAINS):
+        for i in range(COOKIES_PER_DOMAIN):
+            s.cookies.set(f"cookie{i}", str(i), domain=f"domain{d}.com")
+    s.mount_wsgi(app)
+    return s
+
+
+def run(sessions):
+    start = time.perf_counter()
+    for i in range(N):
+        sessions[i % len(sessions)].get(f"/users/{i}")
+    return time.perf_counter() - start
+
+
+def run_shared(compact):
+    sessions = [make_session(compact_cookies=compact) for _ in range(4)]
+    SharedSession(*sessions, compact_cookies=compact)
+    return run(sessions)
+
+
+if __name__ == "__main__":
+    cookies = DOMAINS * COOKIES_PER_DOMAIN
+    report(
+        f"GET {N} requests with {cookies} cookies",
+        [
+            ("RequestsCookieJar", run([make_session()]), N),
+            (
+                "CompactCookieJar",
+                run([make_session(compact_cookies=True)]),
+                N,
+            ),
+        ],
+    )
+    report(
+        f"GET {N} requests with {cookies} cookies, SharedSession of 4",
+        [
+            ("RequestsCookieJar", run_shared(False), N),
+            ("CompactCookieJar", run_shared(True), N),
+        ],
+    )
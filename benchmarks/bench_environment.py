@@ -0,0 +1,45 @@
+"""
+Per-request cost of environment settings resolution.
+
+Run: python benchmarks/bench_environment.py
+"""
+import time
+
+from server import local_server, report
+
+from apitist import session
+
+N = 2000
+
+
+def run(base_url, **kwargs):
+    s = session(base_url, **kwargs)
+    s.get("/")
+    start = time.perf_counter()
+    for _ in range(N):
+        s.get("/")
+    return time.perf_counter() - start
+
+
+def run_merge(base_url, **kwargs):
+    s = session(base_url, **kwargs)
+    start = time.perf_counter()
+    for _ in range(N):
+        s.merge_environment_settings(f"{base_url}/", {}, None, None, None)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    with local_server() as url:
+        cached = run_merge(url, cache_environment=True)
+        report(
+            "merge_environment_settings",
+            [("default", run_merge(url), N), ("cache_environment", cached, N)],
+        )
+        report(
+            f"GET {N} requests to local server",
+            [
+                ("default", run(url), N),
+                ("cache_environment", run(url, cache_environment=True), N),
+            ],
+        )
@@ -0,0 +1,46 @@
+"""
+Default requests transport vs urllib3 fast path.
+
+Requests go to local HTTP server with structuring response hook, so that
+the numbers include usual apitist work.
+
+Run: python benchmarks/bench_fastpath.py
+"""
+import time
+from dataclasses import dataclass
+
+from server import local_server, report
+
+from apitist import ResponseDataclassConverterHook, session
+
+N = 3000
+
+
+@dataclass
+class Item:
+    id: int
+    name: str
+
+
+def run(base_url, **kwargs):
+    s = session(base_url, **kwargs)
+    s.add_hook(ResponseDataclassConverterHook)
+    s.get("/")
+    start = time.perf_counter()
+    for i in range(N):
+        s.get(f"/items/{i}", params={"q": "1"}, structure_type=Item)
+    elapsed = time.perf_counter() - start
+    s.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    with local_server() as url:
+        report(
+            f"GET {N} requests to local server",
+            [
+                ("default", run(url), N),
+                ("cache_environment", run(url, cache_environment=True), N),
+                ("fast_path", run(url, fast_path=True), N),
+            ],
+        )
@@ -0,0 +1,79 @@
+"""
+Memory footprint of kept responses: with and without releasing raw
+content after structuring.
+
+Responses are created in memory and kept in a list, as in fixtures
+collecting responses for the whole test session.
+
+Run: python benchmarks/bench_memory.py
+"""
+import gc
+import json
+import tracemalloc
+from typing import List
+
+import attr
+from requests import PreparedRequest, Response
+
+from apitist import ResponseAttrsConverterHook, session
+
+N = 5000
+# Model uses only part of fields of body, as it is usual for API tests
+BODY = json.dumps(
+    {
+        "items": [
+            {"id": i, "name": f"item {i}", "description": "x" * 100}
+            for i in range(100)
+        ]
+    }
+).encode()
+
+
+@attr.s
+class Item:
+    id: int = attr.ib()
+    name: str = attr.ib()
+
+
+@attr.s
+class Page:
+    items: List[Item] = attr.ib()
+
+
+def make_response(request):
+    response = Response()
+    # Every response has its own body, as if it was received
+    response._content = bytes(bytearray(BODY))
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response.request = request
+    return response
+
+
+def footprint(**kwargs):
+    """Returns retained bytes per response"""
+    s = session(**kwargs)
+    s.add_hook(ResponseAttrsConverterHook)
+    request = PreparedRequest()
+    request.prepare(method="GET", url="http://testserver/items")
+    gc.collect()
+    tracemalloc.start()
+    kept = []
+    for _ in range(N):
+        response = make_response(request)
+        kept.append(s.pipeline.process_response(response, None, Page))
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memory / N
+
+
+if __name__ == "__main__":
+    kept = footprint()
+    released = footprint(release_content=True)
+    print(f"Retained memory of {N} responses, {len(BODY)} bytes body")
+    print(f"  {'Content kept':<30} {kept:10.0f} bytes/response")
+    print(
+        f"  {'Content released':<30} {released:10.0f} bytes/response"
+        f"  x{kept / released:.2f}"
+    )
@@ -0,0 +1,124 @@
+"""
+Response structuring cost: per-response ``structure`` closure bound with
+``types.MethodType`` vs class-level ``ApitistResponse.structure``, and
+eager vs lazy structuring, when only status code is checked.
+
+Responses are created in memory, so that only hooks and structuring are
+measured. Retained memory is measured for all responses kept in a list.
+
+Run: python benchmarks/bench_structure.py
+"""
+import time
+import tracemalloc
+import types
+
+import attr
+from requests import PreparedRequest, Response
+from server import BODY, report
+
+from apitist import ResponseAttrsConverterHook, ResponseHook, converter
+from apitist import session
+
+N = 100000
+
+
+@attr.s
+class Item:
+    id: int = attr.ib()
+    name: str = attr.ib()
+
+
+class ClosureConverterHook(ResponseHook):
+    """Previous implementation of response converter hook"""
+
+    def run(self, response: Response) -> Response:
+        def func(self, t):
+            self.data = converter.structure(self.json(), t)
+            return self
+
+        response.structure = types.MethodType(func, response)
+        return response
+
+
+def responses():
+    request = PreparedRequest()
+    request.prepare(method="GET", url="http://testserver/items")
+    for _ in range(N):
+        response = Response()
+        response._content = BODY
+        response.status_code = 200
+        response.encoding = "utf-8"
+        response.request = request
+        yield response
+
+
+def run_hooks(hook):
+    s = session()
+    s.add_hook(hook)
+    pipeline = s.pipeline
+    items = [s.response_class(r) for r in responses()]
+    start = time.perf_counter()
+    for response in items:
+        pipeline.run_response_hooks(response)
+    return time.perf_counter() - start
+
+
+def run(hook, trace_memory=False, lazy=False):
+    s = session(lazy_structure=lazy)
+    s.add_hook(hook)
+    pipeline = s.pipeline
+    # Responses are kept only for memory measurement
+    kept = []
+    keep = kept.append if trace_memory else id
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for response in responses():
+        response = pipeline.process_response(response, None, Item)
+        keep(response)
+    elapsed = time.perf_counter() - start
+    if not lazy:
+        assert response.data == Item(1, "benchmark")
+    if trace_memory:
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return memory
+    return elapsed
+
+
+if __name__ == "__main__":
+    report(
+        f"Structure {N} responses",
+        [
+            ("Per-response closure", run(ClosureConverterHook), N),
+            ("Class-level structure", run(ResponseAttrsConverterHook), N),
+        ],
+    )
+    report(
+        f"Check status of {N} responses",
+        [
+            ("Eager structure", run(ResponseAttrsConverterHook), N),
+            (
+                "Lazy structure",
+                run(ResponseAttrsConverterHook, lazy=True),
+                N,
+            ),
+        ],
+    )
+    report(
+        f"Converter hook only, {N} responses",
+        [
+            ("Per-response closure", run_hooks(ClosureConverterHook), N),
+            (
+                "Class-level structure",
+                run_hooks(ResponseAttrsConverterHook),
+                N,
+            ),
+        ],
+    )
+    closure = run(ClosureConverterHook, trace_memory=True)
+    class_level = run(ResponseAttrsConverterHook, trace_memory=True)
+    print(
+        f"  Retained memory per response: "
+        f"{closure / N:.0f} -> {class_level / N:.0f} bytes"
+    )
@@ -0,0 +1,59 @@
+"""
+Request preparation cost: Session.request vs RequestTemplate.
+
+Requests are dispatched to in-process WSGI application, so that network
+does not hide preparation overhead.
+
+Run: python benchmarks/bench_template.py
+"""
+import time
+
+from server import BODY, report
+
+from apitist import session
+
+N = 5000
+HEADERS = {f"X-Header-{i}": str(i) for i in range(20)}
+
+
+def app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "application/json")])
+    return [BODY]
+
+
+def make_session():
+    s = session("http://testserver/api")
+    s.headers.update(HEADERS)
+    s.auth = ("user", "password")
+    for i in range(20):
+        s.cookies.set(f"cookie{i}", str(i))
+    s.mount_wsgi(app)
+    return s
+
+
+def run_request():
+    s = make_session()
+    start = time.perf_counter()
+    for i in range(N):
+        s.get(f"/users/{i}", params={"fields": "name"})
+    return time.perf_counter() - start
+
+
+def run_template():
+    get_user = make_session().template(
+        "GET", "/users/{}", params={"fields": "name"}
+    )
+    start = time.perf_counter()
+    for i in range(N):
+        get_user(i)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    report(
+        f"GET {N} requests",
+        [
+            ("Session.request", run_request(), N),
+            ("RequestTemplate", run_template(), N),
+        ],
+    )
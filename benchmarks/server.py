@@ -0,0 +1,51 @@
+"""Local HTTP server used by benchmarks"""
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BODY = json.dumps({"id": 1, "name": "benchmark"}).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    do_GET = do_POST = do_PUT = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def local_server():
+    """Yields base url of local HTTP server"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def report(title, results):
+    """Prints timings in microseconds per operation"""
+    print(title)
+    base = None
+    for name, seconds, count in results:
+        per_op = seconds / count * 1e6
+        base = base or per_op
+        print(f"  {name:<30} {per_op:10.1f} us/op  x{base / per_op:.2f}")
@@ -1,6 +1,19 @@
 """Apitist package"""
 from pkg_resources import DistributionNotFound, get_distribution
 
+from .adapters import ASGIAdapter, WSGIAdapter
+from .cassette import (
+    Cassette,
+    CassetteAdapter,
+    CassetteMissError,
+    CassetteMode,
+)
+from .compression import (
+    CompressionStats,
+    PrepRequestCompressionHook,
+    ResponseCompressionStatsHook,
+    request_compression_hook,
+)
 from .constructor import (
     AttrsConverter,
     Converter,
@@ -9,6 +22,10 @@ from .constructor import (
     convclass,
     converter,
 )
+from .cookies import CompactCookieJar
+from .exchanges import ExchangeBuffer, exchange_buffer_hook
+from .fastpath import Urllib3Transport
+from .har import HarWriter, har_hook
 from .hooks import (
     PreparedRequestHook,
     PrepRequestDebugLoggingHook,
@@ -28,14 +45,34 @@ from .hooks import (
     request_converter_hook,
     response_converter_hook,
 )
+from .http2 import HTTP2Adapter
+from .multipart import MappedFile, MultipartEncoder
+from .pagination import (
+    CursorPagination,
+    LinkHeaderPagination,
+    OffsetPagination,
+    PageNumberPagination,
+    Pagination,
+)
+from .pipeline import Pipeline, RequestsTransport, Transport
 from .random import Randomer
 from .requests import Session, SharedSession, session
+from .retry import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+from .template import RequestTemplate
 
 __all__ = [
     "__version__",
     "dist_name",
+    "ASGIAdapter",
     "AttrsConverter",
+    "Cassette",
+    "CassetteAdapter",
+    "CassetteMissError",
+    "CassetteMode",
+    "CompactCookieJar",
     "DataclassConverter",
+    "ExchangeBuffer",
+    "exchange_buffer_hook",
     "convclass",
     "converter",
     "ConverterType",
@@ -55,10 +92,34 @@ __all__ = [
     "ResponseDebugLoggingHook",
     "ResponseHook",
     "ResponseInfoLoggingHook",
+    "CursorPagination",
+    "HarWriter",
+    "har_hook",
+    "HTTP2Adapter",
+    "MappedFile",
+    "MultipartEncoder",
+    "LinkHeaderPagination",
+    "OffsetPagination",
+    "PageNumberPagination",
+    "Pagination",
+    "Pipeline",
     "Randomer",
+    "CircuitBreaker",
+    "CompressionStats",
+    "PrepRequestCompressionHook",
+    "ResponseCompressionStatsHook",
+    "request_compression_hook",
+    "CircuitOpenError",
+    "RetryBudget",
+    "RetryPolicy",
+    "RequestTemplate",
+    "RequestsTransport",
     "session",
     "Session",
     "SharedSession",
+    "Transport",
+    "Urllib3Transport",
+    "WSGIAdapter",
     "request_converter_hook",
     "response_converter_hook",
 ]
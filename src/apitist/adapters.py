@@ -0,0 +1,300 @@
+import asyncio
+import threading
+from http.client import HTTPMessage, responses
+from io import BytesIO, StringIO
+from typing import IO, Awaitable, Callable, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+
+Headers = List[Tuple[str, str]]
+
+
+class _OriginalResponse:
+    """Minimal :class:`http.client.HTTPResponse` needed to extract cookies"""
+
+    def __init__(self, headers: Headers, method: str):
+        self.msg = HTTPMessage()
+        for key, value in headers:
+            self.msg[key] = value
+        self._method = method
+
+    def isclosed(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def build_response(
+    adapter: BaseAdapter,
+    request: PreparedRequest,
+    status: int,
+    headers: Headers,
+    content: Optional[bytes],
+    reason: str = None,
+    body: IO[bytes] = None,
+) -> Response:
+    """
+    Builds :class:`requests.Response` for response received without
+    :mod:`urllib3`, so that cookies, encoding and redirects are handled
+    by requests as usual.
+
+    Either decoded ``content`` or raw (not decoded) ``body`` stream
+    should be passed.
+    """
+    raw_headers = HTTPHeaderDict()
+    for key, value in headers:
+        raw_headers.add(key, value)
+    raw = HTTPResponse(
+        body=BytesIO(content) if body is None else body,
+        headers=raw_headers,
+        status=status,
+        reason=reason or responses.get(status),
+        preload_content=False,
+        decode_content=False,
+    )
+    raw._original_response = _OriginalResponse(headers, request.method)
+    response = HTTPAdapter.build_response(adapter, request, raw)
+    if body is None:
+        response._content = content
+    return response
+
+
+def _read_body(body) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, bytes):
+        return body
+    if hasattr(body, "read"):
+        return body.read()
+    return b"".join(
+        chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        for chunk in body
+    )
+
+
+class EventLoopThread:
+    """
+    Event loop running in its own daemon thread.
+
+    Coroutines can be run from any thread, including threads, where other
+    event loop is running. Thread is started on first use.
+
+    :param name: name of the thread
+    """
+
+    def __init__(self, name: str = "apitist-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name=self.name, daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def run(self, coro: Awaitable, timeout: float = None):
+        """Runs coroutine in the loop and waits for its result"""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError(
+                f"Can't wait for coroutine inside loop thread {self.name}"
+            )
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def close(self):
+        """Stops the loop and waits for its thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def _split_url(url: str):
+    parts = urlsplit(url)
+    default_port = 443 if parts.scheme == "https" else 80
+    return parts, parts.hostname, parts.port or default_port
+
+
+class WSGIAdapter(BaseAdapter):
+    """
+    Transport adapter dispatching requests directly to WSGI application,
+    without sockets and HTTP serialization.
+
+    :param app: WSGI application
+    :param script_name: (optional) path, where application is mounted
+    """
+
+    def __init__(self, app: Callable, script_name: str = ""):
+        super().__init__()
+        self.app = app
+        self.script_name = script_name.rstrip("/")
+
+    def get_environ(self, request: PreparedRequest, body: bytes) -> dict:
+        parts, host, port = _split_url(request.url)
+        path = unquote(parts.path) or "/"
+        if self.script_name and path.startswith(self.script_name):
+            path = path[len(self.script_name) :]
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "SCRIPT_NAME": self.script_name,
+            "PATH_INFO": path,
+            "QUERY_STRING": parts.query,
+            "SERVER_NAME": host,
+            "SERVER_PORT": str(port),
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": "127.0.0.1",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": parts.scheme,
+            "wsgi.input": BytesIO(body),
+            "wsgi.errors": StringIO(),
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for key, value in request.headers.items():
+            key = key.upper().replace("-", "_")
+            if key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[key] = value
+            else:
+                environ[f"HTTP_{key}"] = value
+        environ.setdefault("CONTENT_LENGTH", str(len(body)))
+        return environ
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        body = _read_body(request.body)
+        result = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and result:
+                raise exc_info[1].with_traceback(exc_info[2])
+            result["status"], result["headers"] = status, headers
+            return chunks.append
+
+        chunks: List[bytes] = []
+        app_iter: Iterable[bytes] = self.app(
+            self.get_environ(request, body), start_response
+        )
+        try:
+            chunks.extend(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+        code, _, reason = result["status"].partition(" ")
+        return build_response(
+            self,
+            request,
+            int(code),
+            result["headers"],
+            b"".join(chunks),
+            reason=reason,
+        )
+
+    def close(self):
+        pass
+
+
+class ASGIAdapter(BaseAdapter):
+    """
+    Transport adapter dispatching requests directly to ASGI application.
+
+    Application is called in the adapter's own event loop running in a
+    separate thread, so requests can be sent from many threads at once
+    and from code with running event loop. Lifespan events are not sent.
+
+    :param app: ASGI 3 application
+    :param root_path: (optional) path, where application is mounted
+    """
+
+    def __init__(self, app: Callable, root_path: str = ""):
+        super().__init__()
+        self.app = app
+        self.root_path = root_path.rstrip("/")
+        self._loop = EventLoopThread("apitist-asgi")
+
+    def get_scope(self, request: PreparedRequest) -> dict:
+        parts, host, port = _split_url(request.url)
+        path = unquote(parts.path) or "/"
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": parts.scheme,
+            "path": path,
+            "raw_path": (parts.path or "/").encode("ascii"),
+            "root_path": self.root_path,
+            "query_string": parts.query.encode("ascii"),
+            "headers": [
+                (k.lower().encode("latin-1"), v.encode("latin-1"))
+                for k, v in request.headers.items()
+            ],
+            "server": (host, port),
+            "client": ("127.0.0.1", 0),
+        }
+
+    async def _call(self, scope: dict, body: bytes) -> dict:
+        result = {"headers": [], "chunks": []}
+        messages = [
+            {"type": "http.request", "body": body, "more_body": False}
+        ]
+        # Client disconnects only after whole response is received
+        complete = asyncio.Event()
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                result["status"] = message["status"]
+                result["headers"] = [
+                    (k.decode("latin-1"), v.decode("latin-1"))
+                    for k, v in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                result["chunks"].append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    complete.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            complete.set()
+        return result
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        result = self._loop.run(
+            self._call(self.get_scope(request), _read_body(request.body))
+        )
+        return build_response(
+            self,
+            request,
+            result["status"],
+            result["headers"],
+            b"".join(result["chunks"]),
+        )
+
+    def close(self):
+        self._loop.close()
@@ -0,0 +1,230 @@
+import base64
+import hashlib
+import json
+import threading
+from enum import Enum
+from typing import Dict, List, Sequence, Tuple
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from .adapters import build_response
+from .logging import Logging
+
+MATCHERS = ("method", "url", "body", "name")
+
+# Body is stored already decoded
+_SKIPPED_HEADERS = frozenset(["content-encoding", "transfer-encoding"])
+
+
+class CassetteMode(Enum):
+    #: Replay recorded exchanges, send and record unknown requests
+    AUTO = "auto"
+    #: Send all requests and record them
+    RECORD = "record"
+    #: Replay recorded exchanges only, unknown requests raise an error
+    REPLAY = "replay"
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode for request missing in cassette"""
+
+
+def _body_hash(body) -> str:
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if not isinstance(body, bytes):
+        # Streamed bodies can't be hashed without consuming them
+        return "<stream>"
+    return hashlib.sha1(body).hexdigest()
+
+
+def _encode_body(content: bytes) -> Tuple[str, bool]:
+    try:
+        return content.decode("utf-8"), False
+    except UnicodeDecodeError:
+        return base64.b64encode(content).decode("ascii"), True
+
+
+class Cassette:
+    """
+    Storage of recorded request/response exchanges.
+
+    Cassette is stored in JSON Lines format - one exchange per line,
+    new exchanges are appended to the end of file. On load all exchanges
+    are indexed in memory by match key, so each lookup is a dict access.
+    Repeated requests with the same key are replayed in recorded order,
+    the last one is replayed for all further requests.
+
+    Streamed responses (``stream=True`` or session ``spool_threshold``)
+    are not recorded, as their body would be read into memory. They are
+    counted in :attr:`skipped`.
+
+    :param path: path to cassette file
+    :param mode: :class:`CassetteMode`
+    :param match_on: request parts to match exchanges by:
+        ``"method"``, ``"url"``, ``"body"`` (hash of request body)
+        and ``"name"`` (apitist request ``name``)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: CassetteMode = CassetteMode.AUTO,
+        match_on: Sequence[str] = ("method", "url"),
+    ):
+        unknown = set(match_on) - set(MATCHERS)
+        if unknown:
+            raise ValueError(
+                f"Unknown matchers {sorted(unknown)}, "
+                f"available are: {MATCHERS}"
+            )
+        self.path = path
+        self.mode = CassetteMode(mode)
+        self.match_on = tuple(match_on)
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._index: Dict[tuple, List[dict]] = {}
+        self._played: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if self.mode != CassetteMode.RECORD:
+            self.load()
+
+    def __len__(self):
+        return sum(len(v) for v in self._index.values())
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._add(json.loads(line))
+        except FileNotFoundError:
+            if self.mode == CassetteMode.REPLAY:
+                raise
+        Logging.logger.debug(f"Loaded {len(self)} exchanges from {self.path}")
+
+    def _add(self, exchange: dict):
+        key = self._key(exchange["request"])
+        self._index.setdefault(key, []).append(exchange)
+
+    def _key(self, request: dict) -> tuple:
+        return tuple(request[m] for m in self.match_on)
+
+    @staticmethod
+    def describe(request: PreparedRequest) -> dict:
+        return {
+            "method": request.method,
+            "url": request.url,
+            "body": _body_hash(request.body),
+            "name": getattr(request, "name", None),
+        }
+
+    def find(self, request: PreparedRequest):
+        """Returns recorded exchange for request or ``None``"""
+        key = self._key(self.describe(request))
+        with self._lock:
+            exchanges = self._index.get(key)
+            if not exchanges:
+                self.misses += 1
+                return None
+            played = self._played.get(key, 0)
+            self._played[key] = played + 1
+            self.hits += 1
+        return exchanges[min(played, len(exchanges) - 1)]
+
+    def record(self, request: PreparedRequest, response: Response):
+        raw_headers = getattr(response.raw, "headers", None)
+        headers = [
+            [k, v]
+            for k, v in (raw_headers or response.headers).items()
+            if k.lower() not in _SKIPPED_HEADERS
+        ]
+        body, is_b64 = _encode_body(response.content)
+        exchange = {
+            "request": self.describe(request),
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "url": response.url,
+                "headers": headers,
+                "body": body,
+                "b64": is_b64,
+            },
+        }
+        line = json.dumps(exchange, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                write_mode = "w" if self.mode == CassetteMode.RECORD else "a"
+                self._file = open(self.path, write_mode, encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._add(exchange)
+            key = self._key(exchange["request"])
+            self._played[key] = len(self._index[key])
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    Transport adapter replaying exchanges from :class:`Cassette`.
+
+    Requests missing in cassette are sent with ``adapter`` and recorded,
+    unless cassette is in :attr:`CassetteMode.REPLAY` mode.
+    """
+
+    def __init__(self, cassette: Cassette, adapter: BaseAdapter = None):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        cassette = self.cassette
+        if cassette.mode != CassetteMode.RECORD:
+            exchange = cassette.find(request)
+            if exchange is not None:
+                return self.build_response(request, exchange["response"])
+            if cassette.mode == CassetteMode.REPLAY:
+                raise CassetteMissError(
+                    f"Request {request.method} {request.url} "
+                    f"is not found in cassette {cassette.path}"
+                )
+        response = self.adapter.send(request, **kwargs)
+        if kwargs.get("stream"):
+            with cassette._lock:
+                cassette.skipped += 1
+            Logging.logger.debug(
+                f"Streamed response of {request.method} {request.url} "
+                f"is not recorded"
+            )
+        else:
+            cassette.record(request, response)
+        return response
+
+    def build_response(self, request: PreparedRequest, data: dict):
+        content = data["body"].encode("utf-8")
+        if data["b64"]:
+            content = base64.b64decode(content)
+        response = build_response(
+            self,
+            request,
+            data["status"],
+            data["headers"],
+            content,
+            reason=data["reason"],
+        )
+        response.url = data["url"]
+        return response
+
+    def close(self):
+        self.cassette.close()
+        self.adapter.close()
@@ -0,0 +1,172 @@
+import gzip
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Type
+
+from requests import PreparedRequest, Response
+
+from .requests import PreparedRequestHook, ResponseHook
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class CompressionStats:
+    """Compression statistics of request or response body"""
+
+    def __init__(
+        self,
+        encoding: str,
+        original_size: int,
+        compressed_size: int,
+        elapsed: float = None,
+    ):
+        self.encoding = encoding
+        self.original_size = original_size
+        self.compressed_size = compressed_size
+        self.elapsed = elapsed
+
+    @property
+    def ratio(self) -> float:
+        """Original size divided by compressed size"""
+        if not self.compressed_size:
+            return 1.0
+        return self.original_size / self.compressed_size
+
+    def __repr__(self) -> str:
+        elapsed = ""
+        if self.elapsed is not None:
+            elapsed = f" in {self.elapsed * 1000:.2f}ms"
+        return (
+            f"<CompressionStats {self.encoding}: "
+            f"{self.original_size} -> {self.compressed_size} bytes, "
+            f"ratio {self.ratio:.2f}{elapsed}>"
+        )
+
+
+def _gzip(level: int = 6):
+    return lambda data: gzip.compress(data, compresslevel=level)
+
+
+def _deflate(level: int = 6):
+    return lambda data: zlib.compress(data, level)
+
+
+def _brotli(level: int = 4):
+    return lambda data: brotli.compress(data, quality=level)
+
+
+def _zstd(level: int = 3):
+    # Compressors are not thread-safe, every thread gets its own one
+    local = threading.local()
+
+    def compress(data: bytes) -> bytes:
+        compressor = getattr(local, "compressor", None)
+        if compressor is None:
+            compressor = local.compressor = zstandard.ZstdCompressor(
+                level=level
+            )
+        return compressor.compress(data)
+
+    return compress
+
+
+COMPRESSORS: Dict[str, Callable[..., Callable[[bytes], bytes]]] = {
+    "gzip": _gzip,
+    "deflate": _deflate,
+}
+if brotli is not None:  # pragma: no cover
+    COMPRESSORS["br"] = _brotli
+if zstandard is not None:  # pragma: no cover
+    COMPRESSORS["zstd"] = _zstd
+
+
+def get_compressor(encoding: str, level: int = None):
+    if encoding not in COMPRESSORS:
+        raise ValueError(
+            f"Compression {encoding!r} is not available, "
+            f"supported are: {sorted(COMPRESSORS)}. "
+            f"Install `brotli` or `zstandard` to enable br and zstd."
+        )
+    factory = COMPRESSORS[encoding]
+    return factory() if level is None else factory(level)
+
+
+def request_compression_hook(
+    encoding: str = "gzip", threshold: int = 1024, level: int = None
+) -> Type[PreparedRequestHook]:
+    """
+    Creates prepared request hook, which compresses request bodies
+    larger than ``threshold`` bytes with given ``encoding``.
+
+    Compression statistics are available as ``request.compression``
+    (e.g. ``response.request.compression``). Streamed bodies and bodies
+    with ``Content-Encoding`` are not compressed.
+    """
+    compress = get_compressor(encoding, level)
+
+    class _CompressionHook(PreparedRequestHook):
+        def run(self, request: PreparedRequest) -> PreparedRequest:
+            body = request.body
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            if (
+                not isinstance(body, bytes)
+                or len(body) < threshold
+                or "Content-Encoding" in request.headers
+            ):
+                return request
+            start = time.perf_counter()
+            compressed = compress(body)
+            elapsed = time.perf_counter() - start
+            request.body = compressed
+            request.headers["Content-Encoding"] = encoding
+            request.headers["Content-Length"] = str(len(compressed))
+            request.compression = CompressionStats(
+                encoding, len(body), len(compressed), elapsed
+            )
+            return request
+
+    return _CompressionHook
+
+
+class ResponseCompressionStatsHook(ResponseHook):
+    """
+    Adds ``compression`` statistics to compressed responses.
+
+    Responses are decompressed by :mod:`urllib3` while they are read,
+    including streamed and spooled responses, so only sizes are reported.
+    """
+
+    def run(self, response: Response) -> Response:
+        encoding = response.headers.get("Content-Encoding")
+        tell = getattr(response.raw, "tell", None)
+        if not encoding or tell is None:
+            return response
+        spooled = getattr(response, "spooled_body", None)
+        if spooled is not None:
+            size = spooled.size
+        elif response._content is not False:
+            size = len(response.content)
+        else:
+            # Streamed response is not read yet
+            return response
+        wire_size = tell()
+        if wire_size:
+            response.compression = CompressionStats(
+                encoding, size, wire_size
+            )
+        return response
+
+
+PrepRequestCompressionHook: Type[
+    PreparedRequestHook
+] = request_compression_hook()
@@ -1,10 +1,13 @@
+import dataclasses
 from dataclasses import MISSING
 from enum import Enum
+from typing import Any, Callable, Dict, List, NamedTuple, Type
 
 import attr
 import cattr
 import convclasses
 import pendulum
+from convclasses.converters import _Modificator
 
 from apitist.utils import _subclass
 
@@ -25,16 +28,81 @@ def _unstructure_date_time(dt):
         return None
 
 
+class _Field(NamedTuple):
+    """Field of structured class, used by generated functions"""
+
+    # Attribute of instance
+    name: str
+    # Key in unstructured dict
+    key: str
+    # Argument of class constructor
+    arg: str
+    type: Any
+
+
+def _compile(cl: type, fn_name: str, lines: List[str], globs: dict):
+    """Compiles generated function for the given class"""
+    source = "\n".join(lines)
+    filename = f"<apitist generated {fn_name} {cl.__qualname__}>"
+    exec(compile(source, filename, "exec"), globs)
+    return globs[fn_name]
+
+
 class ConverterType(Enum):
     ATTRS = "attrs"
     DATACLASS = "dataclass"
 
 
 class _Converter:
-    """Converts between structured and unstructured data."""
+    """
+    Converts between structured and unstructured data.
+
+    With ``generated`` mode structure and unstructure functions are
+    compiled for each class on first use, so fields are not dispatched
+    at runtime. Functions are cached per class and recompiled after
+    registration of new hooks.
+    """
+
+    _generated = False
+
+    def _init_generated(self, generated: bool, is_structured):
+        self._generated = generated
+        self._structure_fns: Dict[type, Callable] = {}
+        self._unstructure_fns: Dict[type, Callable] = {}
+        if generated:
+            self.register_hooks_funcs(
+                is_structured,
+                self._structure_generated,
+                self._unstructure_generated,
+            )
+
+    def _fields(self, cl: type) -> List[_Field]:
+        raise NotImplementedError
+
+    def _clear_generated(self):
+        if self._generated:
+            self._structure_fns.clear()
+            self._unstructure_fns.clear()
 
     def set_dict_factory(self, dict_factory):
         self._dict_factory = dict_factory
+        self._clear_generated()
+
+    def register_structure_hook(self, cl, func):
+        super().register_structure_hook(cl, func)
+        self._clear_generated()
+
+    def register_unstructure_hook(self, cls, func):
+        super().register_unstructure_hook(cls, func)
+        self._clear_generated()
+
+    def register_structure_hook_func(self, check_func, func):
+        super().register_structure_hook_func(check_func, func)
+        self._clear_generated()
+
+    def register_unstructure_hook_func(self, check_func, func):
+        super().register_unstructure_hook_func(check_func, func)
+        self._clear_generated()
 
     def register_hooks(self, cls, structure, unstructure):
         """
@@ -85,6 +153,94 @@ class _Converter:
             return None
         return cl(obj)
 
+    def _structure_generated(self, obj, cl):
+        try:
+            fn = self._structure_fns[cl]
+        except KeyError:
+            fn = self._structure_fns[cl] = self.make_structure_fn(cl)
+        return fn(obj, cl)
+
+    def _unstructure_generated(self, obj):
+        cl = obj.__class__
+        try:
+            fn = self._unstructure_fns[cl]
+        except KeyError:
+            fn = self._unstructure_fns[cl] = self.make_unstructure_fn(cl)
+        return fn(obj)
+
+    def make_structure_fn(self, cl: Type) -> Callable[[Any, Type], Any]:
+        """
+        Generates function, which structures dict into instance of ``cl``.
+
+        Hooks of fields are dispatched by field types once, missing keys
+        are skipped as in classic converter.
+        """
+        dispatch = self._structure_func.dispatch
+        globs = {"cl": cl}
+        lines = ["def structure(obj, _):", "    res = {}"]
+        for i, field in enumerate(self._fields(cl)):
+            value = "v"
+            if field.type is not None:
+                globs[f"h{i}"] = dispatch(field.type)
+                globs[f"t{i}"] = field.type
+                value = f"h{i}(v, t{i})"
+            lines += [
+                "    try:",
+                f"        v = obj[{field.key!r}]",
+                "    except KeyError:",
+                "        pass",
+                "    else:",
+                f"        res[{field.arg!r}] = {value}",
+            ]
+        lines.append("    return cl(**res)")
+        return _compile(cl, "structure", lines, globs)
+
+    def make_unstructure_fn(self, cl: Type) -> Callable[[Any], Any]:
+        """
+        Generates function, which unstructures instance of ``cl`` into dict.
+
+        Hooks of fields with class types are dispatched once, values of
+        other classes (e.g. ``None`` or subclasses) are dispatched at
+        runtime as in classic converter.
+
+        With default dict factory fields set to omitted value
+        (:class:`attr.NOTHING` or :class:`dataclasses.MISSING`) are skipped
+        by generated code and plain :class:`dict` is returned. Other dict
+        factories receive all fields, as in classic converter.
+        """
+        dispatch = self._unstructure_func.dispatch
+        globs = {
+            "dispatch": dispatch,
+            "factory": self._dict_factory,
+            "omitted": self._omitted,
+        }
+        omitting = self._dict_factory is self._omitting_dict
+        if omitting:
+            lines = ["def unstructure(obj):", "    res = {}"]
+        else:
+            lines = ["def unstructure(obj):", "    res = factory()"]
+        for i, field in enumerate(self._fields(cl)):
+            value = "dispatch(v.__class__)(v)"
+            if isinstance(field.type, type):
+                handler = dispatch(field.type)
+                if handler == self._unstructure_identity:
+                    known = "v"
+                else:
+                    globs[f"h{i}"] = handler
+                    known = f"h{i}(v)"
+                globs[f"t{i}"] = field.type
+                value = f"{known} if v.__class__ is t{i} else {value}"
+            lines.append(f"    v = obj.{field.name}")
+            if omitting:
+                lines += [
+                    "    if v is not omitted:",
+                    f"        res[{field.key!r}] = {value}",
+                ]
+            else:
+                lines.append(f"    res[{field.key!r}] = {value}")
+        lines.append("    return res")
+        return _compile(cl, "unstructure", lines, globs)
+
 
 class NothingDict(dict):
     """
@@ -118,25 +274,52 @@ class MissingDict(dict):
 
 class AttrsConverter(_Converter, cattr.Converter):
     _converter_type = ConverterType.ATTRS
+    _omitted = attr.NOTHING
+    _omitting_dict = NothingDict
 
-    def __init__(self):
+    def __init__(self, generated: bool = False):
         super().__init__()
-        self.set_dict_factory(NothingDict)
+        self.set_dict_factory(self._omitting_dict)
+        self._init_generated(generated, attr.has)
+
+    def _fields(self, cl: type) -> List[_Field]:
+        # Private attributes are initialized without leading underscore
+        return [
+            _Field(
+                a.name,
+                a.name,
+                a.name[1:] if a.name[0] == "_" else a.name,
+                a.type,
+            )
+            for a in attr.fields(cl)
+        ]
 
 
 class DataclassConverter(_Converter, convclasses.Converter):
     _converter_type = ConverterType.DATACLASS
+    _omitted = MISSING
+    _omitting_dict = MissingDict
 
-    def __init__(self):
+    def __init__(self, generated: bool = False):
         super().__init__()
-        self.set_dict_factory(MissingDict)
+        self.set_dict_factory(self._omitting_dict)
+        self._init_generated(generated, dataclasses.is_dataclass)
+
+    def _fields(self, cl: type) -> List[_Field]:
+        return [
+            _Field(f.name, _Modificator(f).obj_name, f.name, f.type)
+            for f in dataclasses.fields(cl)
+        ]
 
 
-def Converter(converter_type: ConverterType = ConverterType.ATTRS):
+def Converter(
+    converter_type: ConverterType = ConverterType.ATTRS,
+    generated: bool = False,
+):
     if converter_type == ConverterType.ATTRS:
-        return AttrsConverter()
+        return AttrsConverter(generated)
     else:
-        return DataclassConverter()
+        return DataclassConverter(generated)
 
 
 converter = Converter()
@@ -0,0 +1,65 @@
+import time
+from http.cookiejar import eff_request_host
+from typing import Iterator, List
+
+from requests.cookies import RequestsCookieJar
+
+
+def _domain_candidates(host: str) -> Iterator[str]:
+    """Yields cookie domains, which may match request host"""
+    yield ""
+    labels = host.split(".")
+    for i in range(len(labels)):
+        domain = ".".join(labels[i:])
+        yield domain
+        yield "." + domain
+
+
+class CompactCookieJar(RequestsCookieJar):
+    """
+    Cookie jar for sessions with many cookies.
+
+    Cookies are already stored by domain and path, but usual jar checks
+    every stored domain against each request. This jar looks up only
+    domains, which may match request host, so cost of request does not
+    grow with amount of cookies for other hosts. Matching rules and
+    cookie policy are the same as for :class:`RequestsCookieJar`.
+
+    :class:`Session` created with ``compact_cookies=True`` also sends
+    requests without copying session cookies into temporary jar.
+    """
+
+    # Earliest expiration time of stored cookies, so that expired cookies
+    # are not searched for on every request
+    _next_expiry = 0.0
+
+    def set_cookie(self, cookie, *args, **kwargs):
+        super().set_cookie(cookie, *args, **kwargs)
+        if cookie.expires is not None:
+            self._next_expiry = min(self._next_expiry, cookie.expires)
+
+    def clear_expired_cookies(self):
+        if time.time() < self._next_expiry:
+            return
+        super().clear_expired_cookies()
+        self._next_expiry = min(
+            (c.expires for c in self if c.expires is not None),
+            default=float("inf"),
+        )
+
+    def _cookies_for_request(self, request) -> List:
+        req_host, erhn = eff_request_host(request)
+        domains = dict.fromkeys(_domain_candidates(req_host))
+        if erhn != req_host:
+            domains.update(dict.fromkeys(_domain_candidates(erhn)))
+        cookies = []
+        for domain in domains:
+            if domain in self._cookies:
+                cookies.extend(self._cookies_for_domain(domain, request))
+        return cookies
+
+    def copy(self) -> "CompactCookieJar":
+        new_cj = type(self)()
+        new_cj.set_policy(self.get_policy())
+        new_cj.update(self)
+        return new_cj
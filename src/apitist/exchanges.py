@@ -0,0 +1,125 @@
+import logging
+import weakref
+from collections import deque
+from typing import Iterator, NamedTuple, Optional, Type
+
+from requests import Response
+
+from .hooks import read_text_body
+from .logging import Logging
+from .requests import ResponseHook
+
+
+class Exchange(NamedTuple):
+    """Compact record of request and response"""
+
+    method: str
+    url: str
+    name: Optional[str]
+    status_code: int
+    elapsed: Optional[float]
+    request_body: Optional[str]
+    response_body: Optional[str]
+
+    def __str__(self) -> str:
+        name = f" [{self.name}]" if self.name else ""
+        elapsed = ""
+        if self.elapsed is not None:
+            elapsed = f" in {self.elapsed * 1000:.1f}ms"
+        return (
+            f"{self.method} {self.url}{name} -> {self.status_code}{elapsed}"
+            f"\n\trequest: {self.request_body}"
+            f"\n\tresponse: {self.response_body}"
+        )
+
+
+class ExchangeBuffer:
+    """
+    Keeps last ``size`` exchanges of the session with truncated bodies.
+
+    Bodies are kept as text decoded with charset of ``Content-Type``,
+    bodies, which can't be decoded, are base64 encoded.
+
+    Exchanges are dumped to log, when ``verify_response`` fails, and are
+    added to report of failed test by apitist pytest plugin.
+
+    :param size: amount of exchanges to keep
+    :param max_body_length: bodies are truncated to given length
+    """
+
+    _instances: "weakref.WeakSet[ExchangeBuffer]" = weakref.WeakSet()
+
+    def __init__(self, size: int = 50, max_body_length: int = 1000):
+        self.max_body_length = max_body_length
+        self._exchanges = deque(maxlen=size)
+        ExchangeBuffer._instances.add(self)
+
+    def __iter__(self) -> Iterator[Exchange]:
+        return iter(list(self._exchanges))
+
+    def __len__(self) -> int:
+        return len(self._exchanges)
+
+    def record(self, response: Response):
+        """Adds exchange of response, dropping the oldest one"""
+        request = response.request
+        limit = self.max_body_length
+        spooled = getattr(response, "spooled_body", None)
+        if response._content is False and spooled is None:
+            # Stream is not consumed by buffer
+            response_body = "<streamed body>"
+        else:
+            response_body = read_text_body(response, "content", limit)
+        elapsed = getattr(response, "elapsed", None)
+        self._exchanges.append(
+            Exchange(
+                request.method,
+                request.url,
+                getattr(response, "name", None),
+                response.status_code,
+                elapsed.total_seconds() if elapsed is not None else None,
+                read_text_body(request, "body", limit),
+                response_body,
+            )
+        )
+
+    def clear(self):
+        self._exchanges.clear()
+
+    def format(self) -> str:
+        exchanges = list(self)
+        return "\n".join(
+            [f"Last {len(exchanges)} exchanges:"]
+            + [str(exchange) for exchange in exchanges]
+        )
+
+    def dump(self, level: int = logging.ERROR):
+        """Logs kept exchanges"""
+        if self._exchanges:
+            Logging.logger.log(level, self.format())
+
+    @classmethod
+    def format_all(cls) -> str:
+        """Returns exchanges of all buffers, which are not empty"""
+        return "\n\n".join(b.format() for b in list(cls._instances) if b)
+
+    @classmethod
+    def clear_all(cls):
+        for buffer in list(cls._instances):
+            buffer.clear()
+
+
+def exchange_buffer_hook(buffer: ExchangeBuffer) -> Type[ResponseHook]:
+    """
+    Returns hook, which records exchanges into given buffer.
+
+    Add it after hooks, which modify response.
+    """
+
+    class _ExchangeBufferHook(ResponseHook):
+        def run(self, response: Response) -> Response:
+            buffer.record(response)
+            response.exchange_buffer = buffer
+            return response
+
+    return _ExchangeBufferHook
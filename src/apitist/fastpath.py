@@ -0,0 +1,257 @@
+from datetime import timedelta
+from time import perf_counter
+
+import urllib3
+from requests import PreparedRequest, Request, Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import (
+    ConnectionError,
+    ConnectTimeout,
+    ReadTimeout,
+    SSLError,
+    TooManyRedirects,
+)
+from requests.sessions import merge_setting
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, get_encoding_from_headers
+from urllib3.exceptions import (
+    ConnectTimeoutError,
+    HTTPError,
+    MaxRetryError,
+    ReadTimeoutError,
+    ResponseError,
+)
+from urllib3.exceptions import SSLError as _SSLError
+
+from .pipeline import RequestsTransport, Transport
+
+_SIMPLE_DATA = (str, bytes, dict, list, tuple)
+# Methods, which redirects are followed by urllib3 as by requests
+_REDIRECT_METHODS = ("GET", "HEAD")
+
+
+class Urllib3Transport(Transport):
+    """
+    Transport sending simple requests straight through
+    :class:`urllib3.PoolManager`, skipping most of :mod:`requests`
+    machinery. Request and response hooks, prepared request hooks and
+    structuring work as usual.
+
+    Request is simple, if it has no files, streamed body, auth, cookies or
+    :mod:`requests` hooks, it is ``GET`` or ``HEAD`` request or redirects
+    are not followed, session has no auth, cookies, :mod:`requests`
+    hooks, proxies, client certificate, custom adapter for the URL, retry
+    policy, circuit breaker or spooling, and TLS verification is not
+    changed. Other requests are sent with
+    ``fallback`` transport, :class:`RequestsTransport` by default.
+
+    Limitations of simple requests:
+
+    - cookies set by responses are not stored in session,
+    - proxies, CA bundle and ``.netrc`` from environment are ignored,
+    - redirects are followed by :mod:`urllib3`, ``response.history``
+      is empty.
+
+    :param fallback: (optional) transport for requests, which are not
+        simple.
+    :param pool_kwargs: (optional) parameters for
+        :class:`urllib3.PoolManager`, e.g. ``maxsize``.
+    """
+
+    def __init__(self, fallback: Transport = None, **pool_kwargs):
+        self.fallback = fallback or RequestsTransport()
+        pool_kwargs.setdefault("cert_reqs", "CERT_REQUIRED")
+        pool_kwargs.setdefault("ca_certs", DEFAULT_CA_BUNDLE_PATH)
+        self.pool = urllib3.PoolManager(**pool_kwargs)
+
+    def is_simple(self, session, request: Request, options: dict) -> bool:
+        """Checks whether request can be sent with fast path"""
+        data = request.data
+        return not (
+            request.files
+            or request.auth
+            or request.cookies
+            or any(request.hooks.values())
+            or (data and not isinstance(data, _SIMPLE_DATA))
+            or any(session.hooks.values())
+            or (
+                # urllib3 keeps method and body on 302 and 303 redirects
+                options.get("allow_redirects", True)
+                and request.method.upper() not in _REDIRECT_METHODS
+            )
+            or session.auth
+            or session.cookies
+            or session.proxies
+            or session.cert
+            or session.verify is not True
+            or session.retry_policy is not None
+            or session.circuit_breaker is not None
+            or session.spool_threshold is not None
+            or options.get("proxies")
+            or options.get("cert")
+            or options.get("verify") not in (None, True)
+            or type(session.get_adapter(request.url)) is not HTTPAdapter
+        )
+
+    def prepare(self, session, request: Request) -> PreparedRequest:
+        params = request.params
+        if session.params:
+            params = merge_setting(params, session.params)
+        headers = session.headers.copy()
+        for key, value in (request.headers or {}).items():
+            if value is None:
+                headers.pop(key, None)
+            else:
+                headers[key] = value
+
+        prep = PreparedRequest()
+        prep.prepare_method(request.method)
+        prep.prepare_url(request.url, params)
+        prep.prepare_headers(headers)
+        prep.prepare_body(request.data, None, request.json)
+        setattr(prep, "name", getattr(request, "name", None))
+        return session.pipeline.run_hooks(session.prep_request_hooks, prep)
+
+    @staticmethod
+    def _get_timeout(timeout) -> urllib3.Timeout:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return urllib3.Timeout(connect=connect, read=read)
+        return urllib3.Timeout(connect=timeout, read=timeout)
+
+    def send(
+        self,
+        session,
+        request: Request,
+        timeout=None,
+        allow_redirects: bool = True,
+        proxies=None,
+        stream=None,
+        verify=None,
+        cert=None,
+    ) -> Response:
+        options = {"proxies": proxies, "verify": verify, "cert": cert}
+        if not self.is_simple(
+            session, request, dict(options, allow_redirects=allow_redirects)
+        ):
+            return self.fallback.send(
+                session,
+                request,
+                timeout=timeout,
+                allow_redirects=allow_redirects,
+                stream=stream,
+                **options,
+            )
+
+        return self._urlopen(
+            session,
+            self.prepare(session, request),
+            timeout,
+            allow_redirects,
+            stream,
+        )
+
+    @property
+    def sends_prepared(self) -> bool:
+        return self.fallback.sends_prepared
+
+    def is_simple_prepared(
+        self, session, prep: PreparedRequest, send_kwargs: dict
+    ) -> bool:
+        """Checks whether request of template can be sent with fast path"""
+        body = prep.body
+        return not (
+            (body is not None and not isinstance(body, (str, bytes)))
+            or any(prep.hooks.values())
+            or (
+                send_kwargs.get("allow_redirects", True)
+                and prep.method not in _REDIRECT_METHODS
+            )
+            or session.cookies
+            or session.retry_policy is not None
+            or session.circuit_breaker is not None
+            or session.spool_threshold is not None
+            or send_kwargs.get("proxies")
+            or send_kwargs.get("cert")
+            or session.verify is not True
+            or (
+                # CA bundle may be merged from environment
+                prep.url.startswith("https:")
+                and send_kwargs.get("verify") not in (None, True)
+            )
+            or type(session.get_adapter(prep.url)) is not HTTPAdapter
+        )
+
+    def send_prepared(
+        self, session, prep: PreparedRequest, send_kwargs: dict
+    ) -> Response:
+        if not self.is_simple_prepared(session, prep, send_kwargs):
+            return self.fallback.send_prepared(session, prep, send_kwargs)
+        return self._urlopen(
+            session,
+            prep,
+            send_kwargs.get("timeout"),
+            send_kwargs.get("allow_redirects", True),
+            send_kwargs.get("stream"),
+        )
+
+    def _urlopen(
+        self,
+        session,
+        prep: PreparedRequest,
+        timeout,
+        allow_redirects: bool,
+        stream,
+    ) -> Response:
+        retries = urllib3.Retry(
+            total=None,
+            connect=0,
+            read=0,
+            status=0,
+            other=0,
+            redirect=session.max_redirects if allow_redirects else False,
+        )
+        start = perf_counter()
+        try:
+            resp = self.pool.urlopen(
+                prep.method,
+                prep.url,
+                body=prep.body,
+                headers=prep.headers,
+                redirect=allow_redirects,
+                retries=retries,
+                timeout=self._get_timeout(timeout),
+                preload_content=False,
+                decode_content=False,
+            )
+        except MaxRetryError as e:
+            if isinstance(e.reason, ConnectTimeoutError):
+                raise ConnectTimeout(e, request=prep)
+            if isinstance(e.reason, ResponseError):
+                raise TooManyRedirects(e, request=prep)
+            if isinstance(e.reason, _SSLError):
+                raise SSLError(e, request=prep)
+            raise ConnectionError(e, request=prep)
+        except ReadTimeoutError as e:
+            raise ReadTimeout(e, request=prep)
+        except _SSLError as e:
+            raise SSLError(e, request=prep)
+        except HTTPError as e:
+            raise ConnectionError(e, request=prep)
+
+        response = Response()
+        response.status_code = resp.status
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = resp
+        response.reason = resp.reason
+        response.url = getattr(resp, "url", None) or prep.url
+        response.request = prep
+        response.elapsed = timedelta(seconds=perf_counter() - start)
+        if not (stream if stream is not None else session.stream):
+            response.content
+        return response
+
+    def close(self):
+        self.pool.clear()
+        self.fallback.close()
@@ -0,0 +1,194 @@
+import gzip
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Type
+from urllib.parse import parse_qsl, urlsplit
+
+from requests import PreparedRequest, Response
+
+from .hooks import body_charset, decode_body
+from .requests import ResponseHook
+
+HAR_VERSION = "1.2"
+
+
+def _headers(headers) -> List[dict]:
+    return [{"name": k, "value": v} for k, v in headers.items()]
+
+
+def _http_version(response: Response) -> str:
+    version = getattr(response, "http_version", None)
+    if version:
+        return version
+    version = getattr(response.raw, "version", None)
+    if not isinstance(version, int):
+        return "HTTP/1.1"
+    return f"HTTP/{version // 10}.{version % 10}"
+
+
+class HarWriter:
+    """
+    Writes exchanges to HAR file as soon as they are recorded.
+
+    Only the current entry is kept in memory, so file can contain any
+    amount of exchanges. File is a valid HAR only after :meth:`close`.
+    Each entry also contains apitist request name as ``_name``.
+
+    :param path: path to HAR file
+    :param max_body_length: bodies are truncated to given amount of bytes,
+        ``None`` means full bodies
+    :param compress: write gzip compressed file
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_body_length: Optional[int] = 10000,
+        compress: bool = False,
+    ):
+        self.path = path
+        self.max_body_length = max_body_length
+        self.entries = 0
+        self._lock = threading.Lock()
+        if compress:
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+        creator = {"name": "apitist", "version": self._version()}
+        self._file.write(
+            f'{{"log": {{"version": "{HAR_VERSION}", '
+            f'"creator": {json.dumps(creator)}, "entries": ['
+        )
+
+    @staticmethod
+    def _version() -> str:
+        from apitist import __version__
+
+        return __version__
+
+    def __enter__(self) -> "HarWriter":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _truncate(self, body: bytes, headers, size: int = None) -> dict:
+        size = len(body) if size is None else size
+        limit = self.max_body_length
+        if limit is not None:
+            body = body[:limit]
+        text, encoding = decode_body(body, headers)
+        content = {"size": size, "text": text}
+        if encoding:
+            content["encoding"] = encoding
+        if len(body) < size:
+            content["comment"] = f"truncated, {size - len(body)} more bytes"
+        return content
+
+    def _request_body(self, request: PreparedRequest) -> Optional[dict]:
+        body = request.body
+        if body is None:
+            return None
+        headers = request.headers
+        if isinstance(body, str):
+            body = body.encode(body_charset(headers), "replace")
+        if not isinstance(body, bytes):
+            return {"size": -1, "text": "<streamed body>"}
+        return self._truncate(body, headers)
+
+    def _response_body(self, response: Response) -> dict:
+        headers = response.headers
+        spooled = getattr(response, "spooled_body", None)
+        if spooled is not None:
+            limit = self.max_body_length
+            if limit is None:
+                return self._truncate(spooled.read(), headers)
+            # Only beginning of large response body is read
+            head = next(spooled.iter_chunks(limit + 1), b"")
+            return self._truncate(head, headers, spooled.size)
+        if response._content is False:
+            # Stream is not consumed by writer
+            return {"size": -1, "text": "<streamed body>"}
+        return self._truncate(response.content or b"", headers)
+
+    def entry(self, response: Response) -> dict:
+        """Returns HAR entry of response"""
+        request = response.request
+        elapsed = getattr(response, "elapsed", None) or timedelta(0)
+        started = datetime.now(timezone.utc) - elapsed
+        wait = elapsed.total_seconds() * 1000
+        http_version = _http_version(response)
+        request_body = self._request_body(request)
+        request_entry = {
+            "method": request.method,
+            "url": request.url,
+            "httpVersion": http_version,
+            "cookies": [],
+            "headers": _headers(request.headers),
+            "queryString": [
+                {"name": k, "value": v}
+                for k, v in parse_qsl(
+                    urlsplit(request.url).query, keep_blank_values=True
+                )
+            ],
+            "headersSize": -1,
+            "bodySize": request_body["size"] if request_body else 0,
+        }
+        if request_body is not None:
+            request_entry["postData"] = {
+                "mimeType": request.headers.get("Content-Type", ""),
+                **request_body,
+            }
+        content = self._response_body(response)
+        return {
+            "startedDateTime": started.isoformat(),
+            "time": wait,
+            "_name": getattr(response, "name", None),
+            "request": request_entry,
+            "response": {
+                "status": response.status_code,
+                "statusText": response.reason or "",
+                "httpVersion": http_version,
+                "cookies": [],
+                "headers": _headers(response.headers),
+                "content": {
+                    "mimeType": response.headers.get("Content-Type", ""),
+                    **content,
+                },
+                "redirectURL": response.headers.get("Location", ""),
+                "headersSize": -1,
+                "bodySize": content["size"],
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": wait, "receive": 0},
+        }
+
+    def write(self, response: Response):
+        """Appends entry of response to file"""
+        data = json.dumps(self.entry(response))
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"HAR file {self.path} is already closed")
+            self._file.write(f",\n{data}" if self.entries else f"\n{data}")
+            self.entries += 1
+
+    def close(self):
+        """Finishes HAR file"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write("\n]}}\n")
+            self._file.close()
+            self._file = None
+
+
+def har_hook(writer: HarWriter) -> Type[ResponseHook]:
+    """Returns hook, which writes all responses to given HAR writer"""
+
+    class _HarHook(ResponseHook):
+        def run(self, response: Response) -> Response:
+            writer.write(response)
+            return response
+
+    return _HarHook
@@ -1,36 +1,235 @@
+import base64
+import codecs
 import dataclasses
 import logging
-import types
-from typing import Type
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Optional, Tuple, Type
 
-import attr
 from requests import PreparedRequest, Request, Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
 
-from apitist.utils import is_attrs_class
+from apitist.utils import (  # noqa: F401
+    is_attrs_class,
+    throw_response_missmatch,
+)
 
 from .constructor import convclass, converter
-from .logging import Logging
+from .logging import Logging, LogSampler
 from .requests import PreparedRequestHook, RequestHook, ResponseHook
 
 
+def loggable_body(body):
+    """Returns placeholder instead of streamed request body"""
+    if body is None or isinstance(body, (str, bytes)):
+        return body
+    if hasattr(body, "read") or hasattr(body, "__next__"):
+        return f"<streamed body {body!r}>"
+    return body
+
+
+def truncate_body(body, limit: Optional[int], size: int = None):
+    """Shortens body to ``limit`` characters (or bytes)"""
+    if limit is None or body is None:
+        return body
+    if not isinstance(body, (str, bytes)):
+        body = str(body)
+    size = len(body) if size is None else size
+    if size <= limit:
+        return body
+    return f"{body[:limit]}... [{size - limit} more]"
+
+
+def body_charset(headers) -> str:
+    """Returns charset of body from ``Content-Type``, UTF-8 by default"""
+    if not isinstance(headers, CaseInsensitiveDict):
+        headers = CaseInsensitiveDict(headers)
+    charset = get_encoding_from_headers(headers) or "utf-8"
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return "utf-8"
+
+
+def decode_body(body: bytes, headers=None) -> Tuple[str, Optional[str]]:
+    """
+    Returns text of body decoded with its charset and ``None``, or base64
+    of body and ``"base64"``, if body can't be decoded
+    """
+    charset = body_charset(headers)
+    try:
+        return body.decode(charset), None
+    except UnicodeDecodeError as e:
+        # Multibyte character may be cut by truncation
+        if e.reason == "unexpected end of data":
+            return body[: e.start].decode(charset), None
+    return base64.b64encode(body).decode("ascii"), "base64"
+
+
+def read_body(data, attribute: str, limit: Optional[int]):
+    """Returns loggable body of request or response shortened to limit"""
+    spooled = getattr(data, "spooled_body", None)
+    if spooled is not None and limit is not None:
+        # Only beginning of large response body is read
+        head = next(spooled.iter_chunks(limit + 1), b"")
+        return truncate_body(head, limit, spooled.size)
+    body = loggable_body(getattr(data, attribute, None))
+    return truncate_body(body, limit)
+
+
+def read_text_body(data, attribute: str, limit: Optional[int]):
+    """
+    Returns body of request or response as text shortened to limit,
+    bodies, which can't be decoded, are base64 encoded
+    """
+    spooled = getattr(data, "spooled_body", None)
+    size = None
+    if spooled is not None and limit is not None:
+        body, size = next(spooled.iter_chunks(limit + 1), b""), spooled.size
+    else:
+        body = loggable_body(getattr(data, attribute, None))
+    if isinstance(body, bytes):
+        size = len(body) if size is None else size
+        body = body[:limit] if limit is not None else body
+        text, encoding = decode_body(body, getattr(data, "headers", None))
+        body = f"base64:{text}" if encoding else text
+        if limit is not None and size > limit:
+            return f"{body}... [{size - limit} more]"
+        return body
+    return truncate_body(body, limit, size)
+
+
+_formatter = Formatter()
+
+
+@lru_cache(maxsize=None)
+def compile_formatter(formatter: str) -> Tuple[str, str, bool]:
+    """
+    Returns formatter, formatter with request name instead of URL
+    and whether formatter uses body
+    """
+    fields = [field for _, field, _, _ in Formatter().parse(formatter)]
+    uses_body = any(
+        field == "body" or field.startswith(("body.", "body["))
+        for field in fields
+        if field
+    )
+    return (
+        formatter,
+        formatter.replace("data.url", "data.name", 1),
+        uses_body,
+    )
+
+
+@lru_cache(maxsize=None)
+def compile_snapshot(formatter: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Returns positional template and names of fields of formatter,
+    so that values can be taken now and formatted later
+    """
+    template, fields = [], []
+    for literal, field, spec, conversion in Formatter().parse(formatter):
+        template.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        template.append(f"{{{len(fields)}")
+        if conversion:
+            template.append(f"!{conversion}")
+        if spec:
+            template.append(f":{spec}")
+        template.append("}")
+        fields.append(field)
+    return "".join(template), tuple(fields)
+
+
+class _FrozenValue:
+    """String representations of mutable value, taken at logging time"""
+
+    __slots__ = ("_str", "_repr")
+
+    def __init__(self, value):
+        self._str = str(value)
+        self._repr = repr(value)
+
+    def __str__(self):
+        return self._str
+
+    def __repr__(self):
+        return self._repr
+
+    def __format__(self, spec):
+        return format(self._str, spec)
+
+
+_IMMUTABLE = (str, bytes, int, float, type(None))
+
+
+def freeze_value(value) -> Any:
+    """Returns value, which is safe to format in another thread"""
+    if isinstance(value, _IMMUTABLE):
+        return value
+    return _FrozenValue(value)
+
+
 class BaseLogging:
     formatter = None
     logging_level = logging.NOTSET
+    # Attribute of logged object, which is available as ``{body}``
+    body_attribute = "body"
+    # Longer bodies are truncated in log records
+    max_body_length: Optional[int] = None
+    # Emits only part of records, e.g. errors or 1 of N records
+    sampler: Optional[LogSampler] = None
 
     def get_formatter(self, data):
-        formatter = self.formatter
-        if getattr(data, "name"):
-            formatter = self.formatter.replace("data.url", "data.name", 1)
+        formatter, name_formatter, _ = compile_formatter(self.formatter)
+        if getattr(data, "name", None):
+            return name_formatter
         return formatter
 
-    def log(self, data):
-        Logging.logger.log(
-            self.logging_level, self.get_formatter(data).format(data=data)
+    def get_body(self, data):
+        return read_body(data, self.body_attribute, self.max_body_length)
+
+    def is_enabled(self) -> bool:
+        return Logging.logger.isEnabledFor(self.logging_level)
+
+    def format(self, data) -> str:
+        formatter = self.get_formatter(data)
+        body = None
+        if compile_formatter(self.formatter)[2]:
+            body = self.get_body(data)
+        return formatter.format(data=data, body=body)
+
+    def snapshot(self, data) -> Tuple[str, Tuple]:
+        """Returns template and immutable values for background logging"""
+        template, fields = compile_snapshot(self.get_formatter(data))
+        body = None
+        if compile_formatter(self.formatter)[2]:
+            body = self.get_body(data)
+        kwargs = {"data": data, "body": body}
+        get_field = _formatter.get_field
+        return (
+            template,
+            tuple(freeze_value(get_field(f, (), kwargs)[0]) for f in fields),
         )
 
+    def log(self, data):
+        # Nothing is formatted, if level is disabled
+        if not self.is_enabled():
+            return
+        if self.sampler is not None and not self.sampler.allow(data):
+            return
+        background = Logging.background
+        if background is not None:
+            background.put(self.logging_level, *self.snapshot(data))
+            return
+        Logging.logger.log(self.logging_level, self.format(data))
+
 
 class RequestDebugLoggingHook(RequestHook, BaseLogging):
-    formatter = "Request {data.method} {data.url} {data.data}"
+    formatter = "Request {data.method} {data.url} {body}"
+    body_attribute = "data"
     logging_level = logging.DEBUG
 
     def run(self, request: Request) -> Request:
@@ -39,7 +238,8 @@ class RequestDebugLoggingHook(RequestHook, BaseLogging):
 
 
 class RequestInfoLoggingHook(RequestHook, BaseLogging):
-    formatter = "Request {data.method} {data.url} {data.data}"
+    formatter = "Request {data.method} {data.url} {body}"
+    body_attribute = "data"
     logging_level = logging.INFO
 
     def run(self, request: Request) -> Request:
@@ -48,7 +248,7 @@ class RequestInfoLoggingHook(RequestHook, BaseLogging):
 
 
 class PrepRequestDebugLoggingHook(PreparedRequestHook, BaseLogging):
-    formatter = "Request {data.method} {data.url} {data.body}"
+    formatter = "Request {data.method} {data.url} {body}"
     logging_level = logging.DEBUG
 
     def run(self, request: PreparedRequest) -> PreparedRequest:
@@ -57,7 +257,7 @@ class PrepRequestDebugLoggingHook(PreparedRequestHook, BaseLogging):
 
 
 class PrepRequestInfoLoggingHook(PreparedRequestHook, BaseLogging):
-    formatter = "Request {data.method} {data.url} {data.body}"
+    formatter = "Request {data.method} {data.url} {body}"
     logging_level = logging.INFO
 
     def run(self, request: PreparedRequest) -> PreparedRequest:
@@ -68,8 +268,9 @@ class PrepRequestInfoLoggingHook(PreparedRequestHook, BaseLogging):
 class ResponseDebugLoggingHook(ResponseHook, BaseLogging):
     formatter = (
         "Response {data.status_code} {data.request.method} "
-        "{data.url} {data.content}"
+        "{data.url} {body}"
     )
+    body_attribute = "content"
     logging_level = logging.DEBUG
 
     def run(self, response: Response) -> Response:
@@ -80,8 +281,9 @@ class ResponseDebugLoggingHook(ResponseHook, BaseLogging):
 class ResponseInfoLoggingHook(ResponseHook, BaseLogging):
     formatter = (
         "Response {data.status_code} {data.request.method} "
-        "{data.url} {data.content}"
+        "{data.url} {body}"
     )
+    body_attribute = "content"
     logging_level = logging.INFO
 
     def run(self, response: Response) -> Response:
@@ -112,35 +314,11 @@ RequestDataclassConverterHook: Type[RequestHook] = request_converter_hook(
 RequestConverterHook = RequestAttrsConverterHook
 
 
-def throw_response_missmatch(fields, res: Response, exp):
-    raise TypeError(
-        f"Got miss-matched parameters in dicts. "
-        f"Info about first level:"
-        f"\n\tExpect: {sorted(fields)}"
-        f"\n\tActual: {sorted(dict(res.json()).keys())}"
-        f"\n\nOriginal exception: {exp}"
-    )
-
-
 def response_converter_hook(conv) -> Type[ResponseHook]:
     class _ResponseHook(ResponseHook):
         def run(self, response: Response) -> Response:
-            def func(self, t: Type) -> Response:
-                try:
-                    self.data = conv.structure(self.json(), t)
-                except (TypeError, ValueError) as e:
-                    if is_attrs_class(t):
-                        fields = attr.fields_dict(t)
-                        throw_response_missmatch(fields, self, e)
-                    elif dataclasses.is_dataclass(t):
-                        fields = dataclasses.fields(t)
-                        throw_response_missmatch(
-                            [f.name for f in fields], self, e
-                        )
-                    raise e
-                return self
-
-            response.structure = types.MethodType(func, response)
+            # Used by ApitistResponse.structure
+            response.converter = conv
             return response
 
     return _ResponseHook
@@ -0,0 +1,214 @@
+import asyncio
+import os
+import ssl
+import threading
+from functools import partial
+from io import BytesIO
+from typing import Callable, Dict, Tuple
+
+from requests import PreparedRequest, Response
+from requests.adapters import DEFAULT_CA_BUNDLE_PATH, BaseAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+
+from .adapters import EventLoopThread, build_response
+from .multipart import CHUNK_SIZE
+
+
+async def _next_chunk(chunks):
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _read_chunks(read: Callable):
+    """Reads chunks of sync body in executor, not to block the loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, read)
+        if not chunk:
+            return
+        yield chunk
+
+
+class _StreamReader:
+    """File-like object reading raw body of streamed httpx response"""
+
+    def __init__(self, response, loop: EventLoopThread):
+        self._response = response
+        self._loop = loop
+        self._chunks = response.aiter_raw()
+        self._buffer = b""
+
+    @property
+    def closed(self) -> bool:
+        return self._response.is_closed
+
+    def read(self, size: int = -1) -> bytes:
+        while size is None or size < 0 or len(self._buffer) < size:
+            chunk = self._loop.run(_next_chunk(self._chunks))
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size is None or size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def close(self):
+        if not self._response.is_closed:
+            self._loop.run(self._response.aclose())
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Transport adapter sending requests with HTTP/2 using :mod:`httpx`.
+
+    Plain ``http://`` URLs are sent with HTTP/2 prior knowledge (h2c).
+
+    Requests are sent by :class:`httpx.AsyncClient` in the adapter's own
+    event loop thread, so concurrent requests from many threads to the
+    same host are multiplexed over a single connection.
+
+    Requires ``httpx`` with HTTP/2 support::
+
+        pip install 'httpx[http2]'
+
+    Proxies are not supported by this adapter.
+
+    :param client_kwargs: (optional) parameters for :class:`httpx.Client`
+    """
+
+    def __init__(self, **client_kwargs):
+        super().__init__()
+        try:
+            import httpx
+        except ModuleNotFoundError:
+            raise ImportError(
+                "Please pre-install httpx:"
+                "\n\tpip install -e 'apitist[http2]'"
+                "\n\tor"
+                "\n\tpip install 'httpx[http2]'"
+            )
+        self._httpx = httpx
+        self._client_kwargs = client_kwargs
+        self._clients: Dict[Tuple, "httpx.AsyncClient"] = {}
+        self._loop = EventLoopThread("apitist-http2")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _create_ssl_context(verify, cert) -> ssl.SSLContext:
+        if verify is False:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        else:
+            # CA bundle path, as accepted by requests
+            ca = DEFAULT_CA_BUNDLE_PATH if verify is True else verify
+            context = (
+                ssl.create_default_context(capath=ca)
+                if os.path.isdir(ca)
+                else ssl.create_default_context(cafile=ca)
+            )
+        if cert:
+            if isinstance(cert, str):
+                context.load_cert_chain(cert)
+            else:
+                context.load_cert_chain(*cert)
+        return context
+
+    def get_client(self, verify=True, cert=None):
+        """Returns client shared by all threads for given TLS settings"""
+        key = (verify, cert if not isinstance(cert, list) else tuple(cert))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._httpx.AsyncClient(
+                    http1=False,
+                    http2=True,
+                    verify=self._create_ssl_context(*key),
+                    **self._client_kwargs,
+                )
+                self._clients[key] = client
+        return client
+
+    def _get_timeout(self, timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return self._httpx.Timeout(timeout)
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> Response:
+        client = self.get_client(verify, cert)
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        elif hasattr(body, "read"):
+            body = _read_chunks(partial(body.read, CHUNK_SIZE))
+        elif body is not None and not isinstance(body, bytes):
+            body = _read_chunks(partial(next, iter(body), None))
+        http_request = client.build_request(
+            request.method,
+            request.url,
+            headers=list(request.headers.items()),
+            content=body,
+            timeout=self._get_timeout(timeout),
+        )
+        http_response, content = self._run(
+            self._send(client, http_request, stream), request
+        )
+        if stream:
+            body = _StreamReader(http_response, self._loop)
+        else:
+            body = BytesIO(content)
+        # Body is decoded by urllib3 as for usual responses
+        response = build_response(
+            self,
+            request,
+            http_response.status_code,
+            http_response.headers.multi_items(),
+            None,
+            reason=http_response.reason_phrase,
+            body=body,
+        )
+        response.http_version = http_response.http_version
+        return response
+
+    @staticmethod
+    async def _send(client, http_request, stream: bool):
+        http_response = await client.send(http_request, stream=True)
+        if stream:
+            return http_response, None
+        try:
+            content = b"".join([c async for c in http_response.aiter_raw()])
+        finally:
+            await http_response.aclose()
+        return http_response, content
+
+    def _run(self, coro, request: PreparedRequest):
+        httpx = self._httpx
+        try:
+            return self._loop.run(coro)
+        except httpx.ConnectTimeout as e:
+            raise ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise ConnectionError(e, request=request)
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            self._loop.run(client.aclose())
+        self._loop.close()
@@ -1,10 +1,173 @@
 import logging
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+
+class BackgroundLogger:
+    """
+    Formats and emits records of logging hooks in a worker thread.
+
+    Hooks put snapshots of logged objects (format template and immutable
+    values) into bounded queue. If queue is full, record is dropped and
+    counted in :attr:`dropped`, or, with ``block=True``, caller waits
+    for free space.
+
+    :param max_queue: maximum amount of pending records
+    :param block: wait instead of dropping records, if queue is full
+    """
+
+    def __init__(self, max_queue: int = 10000, block: bool = False):
+        self.block = block
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="apitist-logging", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, level: int, template: str, values: Tuple) -> bool:
+        """Enqueues record, returns False if it was dropped"""
+        try:
+            self._queue.put((level, template, values), block=self.block)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                level, template, values = record
+                Logging.logger.log(level, template.format(*values))
+            except Exception:
+                Logging.logger.exception("Unable to log record")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Waits until all enqueued records are emitted"""
+        self._queue.join()
+
+    def close(self):
+        """Emits pending records and stops worker thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class LogSampler:
+    """
+    Decides, which records of logging hook are emitted.
+
+    Response filters (``errors_only`` and ``slow_threshold``) are checked
+    first: if any of them is set, only matching responses are logged.
+    Then every ``every``-th record is taken and at most ``rate_limit``
+    records per second are emitted for each request ``name`` (unnamed
+    requests share one limit). Suppressed records are counted by reason
+    in :attr:`suppressed`.
+
+    :param every: log 1 of ``every`` records
+    :param errors_only: log only responses with 4xx and 5xx statuses
+    :param slow_threshold: log only responses slower than given seconds
+    :param rate_limit: maximum amount of records per second per name,
+        may be below 1, e.g. ``0.1`` is one record per 10 seconds
+    """
+
+    def __init__(
+        self,
+        every: int = 1,
+        errors_only: bool = False,
+        slow_threshold: float = None,
+        rate_limit: float = None,
+    ):
+        self.every = every
+        self.errors_only = errors_only
+        self.slow_threshold = slow_threshold
+        self.rate_limit = rate_limit
+        self.suppressed: Counter = Counter()
+        self._seen = 0
+        self._buckets: Dict[Optional[str], Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _is_interesting(self, data) -> bool:
+        status = getattr(data, "status_code", None)
+        if status is None:
+            # Requests are not filtered
+            return True
+        if self.errors_only and status >= 400:
+            return True
+        elapsed = getattr(data, "elapsed", None)
+        if self.slow_threshold is not None and elapsed is not None:
+            return elapsed.total_seconds() >= self.slow_threshold
+        return not self.errors_only and self.slow_threshold is None
+
+    def _take_token(self, name: Optional[str]) -> bool:
+        now = time.monotonic()
+        # Bucket holds at least one token, so rates below 1/s work
+        capacity = max(1, self.rate_limit)
+        tokens, last = self._buckets.get(name, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * self.rate_limit)
+        allowed = tokens >= 1
+        self._buckets[name] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    def allow(self, data) -> bool:
+        """Returns whether record about data should be emitted"""
+        interesting = self._is_interesting(data)
+        with self._lock:
+            if not interesting:
+                reason = "filtered"
+            else:
+                self._seen += 1
+                if (self._seen - 1) % self.every:
+                    reason = "sampled"
+                elif self.rate_limit is not None and not self._take_token(
+                    getattr(data, "name", None)
+                ):
+                    reason = "rate_limited"
+                else:
+                    return True
+            self.suppressed[reason] += 1
+        return False
+
+    @property
+    def total_suppressed(self) -> int:
+        return sum(self.suppressed.values())
 
 
 class Logging:
 
     LOG_LEVEL = logging.INFO
     logger = None
+    # Logging hooks emit records in background, if set
+    background: Optional[BackgroundLogger] = None
+
+    @staticmethod
+    def start_background(
+        max_queue: int = 10000, block: bool = False
+    ) -> BackgroundLogger:
+        """Moves formatting and emitting of hook records to worker thread"""
+        Logging.stop_background()
+        Logging.background = BackgroundLogger(max_queue, block)
+        return Logging.background
+
+    @staticmethod
+    def stop_background():
+        """Emits pending records and returns to synchronous logging"""
+        background, Logging.background = Logging.background, None
+        if background is not None:
+            background.close()
+
+    @staticmethod
+    def flush():
+        """Waits until records, logged in background, are emitted"""
+        if Logging.background is not None:
+            Logging.background.flush()
 
     @staticmethod
     def set_logging_level(value):
@@ -0,0 +1,252 @@
+import io
+import mmap
+import os
+import uuid
+from io import BytesIO
+from typing import Any, Iterator, List, Optional
+
+from requests import Request
+from requests.utils import guess_filename, super_len, to_key_val_list
+from urllib3.fields import RequestField
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MappedFile:
+    """
+    Read-only memory-mapped file, which can be used as request body
+    or as a file in ``files``. File content is read straight from the page
+    cache, without copying whole file into process memory.
+    """
+
+    def __init__(self, path: str):
+        self.name = path
+        self._file = open(path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        # Empty files can't be mapped
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._size
+            else None
+        )
+        self._position = 0
+
+    @property
+    def len(self) -> int:
+        """File size"""
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        if self._map is None:
+            return b""
+        end = self._size
+        if size is not None and size >= 0:
+            end = self._position + size
+        data = self._map[self._position : end]
+        self._position += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._size
+        self._position = min(max(offset, 0), self._size)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def __iter__(self) -> Iterator[bytes]:
+        # Iterable, as usual files, so that requests treats it as stream
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<MappedFile {self.name!r}: {self._size} bytes>"
+
+
+class MultipartEncoder:
+    """
+    Streaming ``multipart/form-data`` request body.
+
+    Accepts the same ``data`` and ``files`` as :meth:`Session.request`,
+    but reads files by chunks while request is sent, instead of building
+    the whole body in memory.
+
+    If sizes of all files are known, ``Content-Length`` is sent, otherwise
+    body is sent with chunked transfer encoding.
+
+    Body can be rewound to the beginning (e.g. for retries), if all files
+    are seekable.
+    """
+
+    def __init__(
+        self,
+        data=None,
+        files=None,
+        boundary: str = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.chunk_size = chunk_size
+        self._parts: List[Any] = []
+        # Start positions of parts, None if part is not seekable
+        self._starts: List[Optional[int]] = []
+        self._index = 0
+        self._position = 0
+        self._length: Optional[int] = 0
+        for field in self._iter_fields(data, files):
+            self._add_part(field)
+        self._add_bytes(f"--{self.boundary}--\r\n".encode("latin-1"))
+
+    @staticmethod
+    def _iter_fields(data, files) -> Iterator[RequestField]:
+        for name, values in to_key_val_list(data or {}):
+            if isinstance(values, (str, bytes)) or not hasattr(
+                values, "__iter__"
+            ):
+                values = [values]
+            for value in values:
+                if value is None:
+                    continue
+                if not isinstance(value, bytes):
+                    value = str(value).encode("utf-8")
+                yield RequestField(name=name, data=value)
+
+        for name, value in to_key_val_list(files or {}):
+            content_type, headers = None, None
+            if isinstance(value, (tuple, list)):
+                if len(value) == 2:
+                    filename, fileobj = value
+                elif len(value) == 3:
+                    filename, fileobj, content_type = value
+                else:
+                    filename, fileobj, content_type, headers = value
+            else:
+                filename, fileobj = guess_filename(value) or name, value
+            if isinstance(fileobj, str):
+                fileobj = fileobj.encode("utf-8")
+            field = RequestField(
+                name=name, data=fileobj, filename=filename, headers=headers
+            )
+            field.make_multipart(content_type=content_type)
+            yield field
+
+    def _add_bytes(self, data: bytes):
+        self._parts.append(BytesIO(data))
+        self._starts.append(0)
+        if self._length is not None:
+            self._length += len(data)
+
+    def _add_part(self, field: RequestField):
+        if not field.headers.get("Content-Disposition"):
+            field.make_multipart()
+        self._add_bytes(f"--{self.boundary}\r\n".encode("latin-1"))
+        self._add_bytes(field.render_headers().encode("latin-1"))
+        data = field.data
+        if isinstance(data, bytes):
+            self._add_bytes(data)
+        else:
+            length = super_len(data)
+            self._parts.append(data)
+            self._starts.append(self._get_start(data))
+            # Zero length may also mean that length is unknown
+            if self._length is not None and length:
+                self._length += length
+            else:
+                self._length = None
+        self._add_bytes(b"\r\n")
+
+    @staticmethod
+    def _get_start(fileobj) -> Optional[int]:
+        if not hasattr(fileobj, "seek") or not hasattr(fileobj, "tell"):
+            return None
+        try:
+            return fileobj.tell()
+        except OSError:
+            return None
+
+    @property
+    def len(self) -> Optional[int]:
+        """Total body length or ``None`` if it is unknown"""
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        left = size if size is not None and size >= 0 else None
+        while self._index < len(self._parts) and (left is None or left > 0):
+            part = self._parts[self._index]
+            chunk = part.read(-1 if left is None else left)
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                self._index += 1
+                continue
+            chunks.append(chunk)
+            if left is not None:
+                left -= len(chunk)
+        data = b"".join(chunks)
+        self._position += len(data)
+        return data
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Only rewinding to the beginning is supported"""
+        if offset != 0 or whence != os.SEEK_SET:
+            raise io.UnsupportedOperation(
+                "MultipartEncoder can only be rewound to the beginning"
+            )
+        if None in self._starts:
+            raise io.UnsupportedOperation(
+                "MultipartEncoder with not seekable files can't be rewound"
+            )
+        for part, start in zip(self._parts, self._starts):
+            part.seek(start)
+        self._index = self._position = 0
+        return 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def __repr__(self) -> str:
+        if self._length is None:
+            return "<MultipartEncoder: chunked>"
+        return f"<MultipartEncoder: {self._length} bytes>"
+
+
+def stream_request_files(request: Request) -> Request:
+    """
+    Replaces ``files`` and ``data`` of the request with
+    :class:`MultipartEncoder` body
+    """
+    if not request.files:
+        return request
+    encoder = MultipartEncoder(request.data, request.files)
+    request.data, request.files = encoder, None
+    # Headers may be a dict of the caller
+    request.headers = dict(request.headers or {})
+    request.headers["Content-Type"] = encoder.content_type
+    return request
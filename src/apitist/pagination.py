@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from requests import Response
+
+from .logging import Logging
+
+
+class Pagination(ABC):
+    """
+    Base pagination strategy.
+
+    Strategy modifies request parameters for every next page and extracts
+    items from received responses.
+
+    :param items_key: key (or dotted path) of items list in json response
+        or attribute of structured ``response.data``. If ``None`` - whole
+        response is used as a list of items.
+    """
+
+    def __init__(self, items_key: str = None):
+        self.items_key = items_key
+
+    def first_page(self, request_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns request parameters for the first page"""
+        return request_kwargs
+
+    @abstractmethod
+    def next_page(
+        self,
+        response: Response,
+        items: List[Any],
+        request_kwargs: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns request parameters for the next page
+        or ``None`` if it was the last one
+        """
+
+    def get_items(self, response: Response) -> List[Any]:
+        return _get_path(_response_data(response), self.items_key) or []
+
+    @staticmethod
+    def _with_params(request_kwargs: Dict[str, Any], **params):
+        kwargs = dict(request_kwargs)
+        kwargs["params"] = dict(kwargs.get("params") or {}, **params)
+        return kwargs
+
+
+class PageNumberPagination(Pagination):
+    """
+    Pagination by page number: ``?page=1``, ``?page=2`` and so on.
+
+    Iteration stops on empty page or page smaller than ``page_size``.
+    """
+
+    def __init__(
+        self,
+        page_param: str = "page",
+        start: int = 1,
+        page_size: int = None,
+        page_size_param: str = None,
+        items_key: str = None,
+    ):
+        super().__init__(items_key)
+        self.page_param = page_param
+        self.start = start
+        self.page_size = page_size
+        self.page_size_param = page_size_param
+
+    def first_page(self, request_kwargs):
+        params = {self.page_param: self.start}
+        if self.page_size_param and self.page_size:
+            params[self.page_size_param] = self.page_size
+        return self._with_params(request_kwargs, **params)
+
+    def next_page(self, response, items, request_kwargs):
+        if not items:
+            return None
+        if self.page_size and len(items) < self.page_size:
+            return None
+        page = request_kwargs["params"][self.page_param]
+        return self._with_params(request_kwargs, **{self.page_param: page + 1})
+
+
+class OffsetPagination(Pagination):
+    """
+    Pagination by offset and limit: ``?offset=0&limit=100``,
+    ``?offset=100&limit=100`` and so on.
+
+    Iteration stops on page smaller than ``limit``.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        offset_param: str = "offset",
+        limit_param: str = "limit",
+        start: int = 0,
+        items_key: str = None,
+    ):
+        super().__init__(items_key)
+        self.limit = limit
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+        self.start = start
+
+    def first_page(self, request_kwargs):
+        return self._with_params(
+            request_kwargs,
+            **{self.offset_param: self.start, self.limit_param: self.limit},
+        )
+
+    def next_page(self, response, items, request_kwargs):
+        if len(items) < self.limit:
+            return None
+        offset = request_kwargs["params"][self.offset_param]
+        return self._with_params(
+            request_kwargs, **{self.offset_param: offset + len(items)}
+        )
+
+
+class CursorPagination(Pagination):
+    """
+    Pagination by cursor returned in response body.
+
+    :param cursor_key: key (or dotted path) of the next cursor in
+        json response or attribute of structured ``response.data``
+    :param cursor_param: query parameter to pass cursor with
+    """
+
+    def __init__(
+        self,
+        cursor_key: str = "next_cursor",
+        cursor_param: str = "cursor",
+        items_key: str = None,
+    ):
+        super().__init__(items_key)
+        self.cursor_key = cursor_key
+        self.cursor_param = cursor_param
+
+    def next_page(self, response, items, request_kwargs):
+        cursor = _get_path(_response_data(response), self.cursor_key)
+        if not cursor or not items:
+            return None
+        return self._with_params(
+            request_kwargs, **{self.cursor_param: cursor}
+        )
+
+
+class LinkHeaderPagination(Pagination):
+    """Pagination by ``Link`` header (RFC 8288), e.g. as in GitHub API"""
+
+    def __init__(self, rel: str = "next", items_key: str = None):
+        super().__init__(items_key)
+        self.rel = rel
+
+    def next_page(self, response, items, request_kwargs):
+        link = response.links.get(self.rel)
+        if not link:
+            return None
+        kwargs = dict(request_kwargs)
+        kwargs["url"] = link["url"]
+        # Next link already contains all query parameters
+        kwargs["params"] = None
+        return kwargs
+
+
+def _response_data(response: Response):
+    """
+    Returns structured ``response.data`` or json body, content of
+    structured response may be already released
+    """
+    data = getattr(response, "data", None)
+    if data is None:
+        data = response.json()
+    return data
+
+
+def _get_path(data, path: Optional[str]):
+    if not path:
+        return data
+    for key in path.split("."):
+        if data is None:
+            return None
+        if isinstance(data, dict):
+            data = data.get(key)
+        else:
+            data = getattr(data, key, None)
+    return data
+
+
+def paginate(
+    session,
+    method: str,
+    url: str,
+    pagination: Pagination,
+    prefetch: bool = True,
+    max_pages: int = None,
+    **kwargs,
+) -> Iterator[Any]:
+    """
+    Lazily iterates over items of all pages.
+
+    If ``prefetch`` is set, the next page is requested in the background
+    thread while items of the current page are consumed.
+    """
+    request_kwargs = pagination.first_page(dict(kwargs, url=url))
+
+    def fetch(req_kwargs):
+        req_kwargs = dict(req_kwargs)
+        return session.request(method, req_kwargs.pop("url"), **req_kwargs)
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    future = None
+    try:
+        pages = 0
+        response = fetch(request_kwargs)
+        while True:
+            pages += 1
+            items = pagination.get_items(response)
+            next_kwargs = None
+            if max_pages is None or pages < max_pages:
+                next_kwargs = pagination.next_page(
+                    response, items, request_kwargs
+                )
+            if next_kwargs is not None and executor is not None:
+                Logging.logger.debug(f"Prefetching page {pages + 1}")
+                future = executor.submit(fetch, next_kwargs)
+            yield from items
+            if next_kwargs is None:
+                return
+            if future is not None:
+                response, future = future.result(), None
+            else:
+                response = fetch(next_kwargs)
+            request_kwargs = next_kwargs
+    finally:
+        if future is not None:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,383 @@
+import re
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple, Type, Union
+from urllib.parse import urlparse
+
+from requests import HTTPError, PreparedRequest, Request, Response
+
+from .logging import Logging
+from .multipart import stream_request_files
+
+
+class HookIndex:
+    """
+    Hooks sorted by priority with precomputed filters.
+
+    Hooks are selected by request method and name once per pair, so that
+    per request only URL patterns of remaining hooks are checked.
+    """
+
+    # Limit of cached method and name pairs
+    MAX_ROUTES = 1024
+
+    def __init__(self, hooks: List[Type]):
+        self.source = list(hooks)
+        self.hooks = sorted(hooks, key=lambda h: getattr(h, "priority", 0))
+        self.conditional = any(
+            getattr(h, attr, None) is not None
+            for h in hooks
+            for attr in ("match_url", "match_methods", "match_names")
+        )
+        self.background = any(
+            getattr(h, "run_in_background", False) for h in hooks
+        )
+        self._routes: Dict[Tuple, List[Tuple[Type, re.Pattern]]] = {}
+
+    def _route(self, method: str, name: str) -> List[Tuple]:
+        route = self._routes.get((method, name))
+        if route is None:
+            route = []
+            for hook in self.hooks:
+                methods = getattr(hook, "match_methods", None)
+                names = getattr(hook, "match_names", None)
+                if methods is not None and method not in methods:
+                    continue
+                if names is not None and name not in names:
+                    continue
+                pattern = getattr(hook, "match_url", None)
+                if pattern is not None:
+                    pattern = re.compile(pattern)
+                route.append((hook, pattern))
+            if len(self._routes) < self.MAX_ROUTES:
+                self._routes[(method, name)] = route
+        return route
+
+    def select(
+        self, data: Union[Request, PreparedRequest, Response]
+    ) -> Sequence[Type]:
+        """Returns hooks, which should run for data"""
+        if not self.conditional:
+            return self.hooks
+        request = data.request if isinstance(data, Response) else data
+        route = self._route(request.method, getattr(data, "name", None))
+        return [
+            hook
+            for hook, pattern in route
+            if pattern is None or pattern.search(request.url)
+        ]
+
+
+class BackgroundHooks:
+    """
+    Runs response hooks marked with ``run_in_background`` in worker pool.
+
+    At most ``max_pending`` responses wait for their hooks, further
+    responses block until some of them are processed. Exceptions of
+    hooks are logged and counted in :attr:`errors`.
+
+    Hooks get the same response, which is returned to caller, so they
+    are not run for streamed (``stream=True``) and spooled responses,
+    which body is read by caller. Such responses are counted in
+    :attr:`skipped`.
+
+    :param workers: amount of worker threads
+    :param max_pending: maximum amount of responses waiting for hooks
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 1000):
+        self.workers = workers
+        self.errors = 0
+        self.skipped = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _run(self, hooks: List[Type], response: Response):
+        try:
+            for hook in hooks:
+                try:
+                    response = hook().run(response)
+                except Exception:
+                    with self._lock:
+                        self.errors += 1
+                    Logging.logger.exception(
+                        f"Background hook {hook.__name__} failed"
+                    )
+        finally:
+            self._slots.release()
+
+    def submit(self, hooks: List[Type], response: Response):
+        """Schedules hooks, which run one after another for response"""
+        if (
+            getattr(response, "_content", None) is False
+            or getattr(response, "spooled_body", None) is not None
+        ):
+            # Caller and hooks would share position of body
+            with self._lock:
+                self.skipped += 1
+            Logging.logger.debug(
+                "Background hooks are skipped for streamed response"
+            )
+            return
+        self._slots.acquire()
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix="apitist-hooks"
+                    )
+                self._executor.submit(self._run, hooks, response)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def drain(self):
+        """Waits until all scheduled hooks are finished"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # Workers are started again on the next submit
+            executor.shutdown(wait=True)
+
+
+class Pipeline:
+    """
+    Transport independent steps of :meth:`Session.request`: URL
+    resolution, request and response hooks and structuring.
+
+    Pipeline performs no I/O: :meth:`build_request` returns
+    :class:`Request`, which is sent by session :class:`Transport`,
+    and received :class:`Response` is passed to :meth:`process_response`.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._indexes: Dict[int, HookIndex] = {}
+
+    def hook_index(self, hooks: List[Type]) -> HookIndex:
+        """Returns index of hooks list, rebuilt if list is changed"""
+        index = self._indexes.get(id(hooks))
+        if index is None or index.source != hooks:
+            index = self._indexes[id(hooks)] = HookIndex(hooks)
+        return index
+
+    def run_hooks(
+        self,
+        hooks: List[Type],
+        data: Union[Request, PreparedRequest, Response],
+    ):
+        if not hooks:
+            return data
+        return self._run(self.hook_index(hooks).select(data), data)
+
+    @staticmethod
+    def _run(hooks: Sequence[Type], data):
+        for hook in hooks:
+            data = hook().run(data)
+        return data
+
+    def resolve_url(self, url: str) -> str:
+        parsed_url = urlparse(url)
+        if parsed_url.scheme and parsed_url.hostname:
+            return url
+        return "/".join([self.session.base_url.rstrip("/"), url.lstrip("/")])
+
+    def build_request(
+        self,
+        method: str,
+        url: str,
+        params=None,
+        data=None,
+        headers=None,
+        cookies=None,
+        files=None,
+        auth=None,
+        hooks=None,
+        json=None,
+        name: str = None,
+    ) -> Request:
+        """Creates request and runs request hooks"""
+        session = self.session
+        result_url = self.resolve_url(url)
+        req = Request(
+            method=method.upper(),
+            url=result_url,
+            headers=headers,
+            files=files,
+            data=data or {},
+            json=json,
+            params=params or {},
+            auth=auth,
+            cookies=cookies,
+            hooks=hooks,
+        )
+        setattr(req, "name", name)
+        req = self.run_hooks(session.request_hooks, req)
+        if session.stream_uploads:
+            req = stream_request_files(req)
+        return req
+
+    def process_response(
+        self,
+        response: Response,
+        name: str = None,
+        structure_type=None,
+        structure_err_type=None,
+    ):
+        """Runs response hooks and structures response"""
+        resp = self.session.response_class(response)
+        setattr(resp, "name", name)
+        resp = self.run_response_hooks(resp)
+        if self.session.release_content and not (
+            # Background hooks may read content after structuring
+            self.session.response_hooks
+            and self.hook_index(self.session.response_hooks).background
+        ):
+            resp.release_content_after_structure = True
+        self.structure(
+            resp,
+            structure_type,
+            structure_err_type,
+            self.session.lazy_structure,
+        )
+        return resp
+
+    def run_response_hooks(self, response: Response) -> Response:
+        """Runs blocking hooks, schedules background hooks"""
+        hooks = self.session.response_hooks
+        if not hooks:
+            return response
+        index = self.hook_index(hooks)
+        selected = index.select(response)
+        if not index.background:
+            return self._run(selected, response)
+        blocking, background = [], []
+        for hook in selected:
+            if getattr(hook, "run_in_background", False):
+                background.append(hook)
+            else:
+                blocking.append(hook)
+        response = self._run(blocking, response)
+        if background:
+            self.session.background_hooks.submit(background, response)
+        return response
+
+    @staticmethod
+    def structure(
+        response: Response,
+        structure_type,
+        structure_err_type,
+        lazy: bool = False,
+    ):
+        """
+        Structures response body with ``structure_type``, or with
+        ``structure_err_type`` for 4xx and 5xx statuses. If ``lazy``,
+        body is structured on first access to ``response.data``.
+        """
+        # Response converter hooks of previous versions set structure
+        custom = "structure" in vars(response)
+        if getattr(response, "converter", None) is None and not custom:
+            return response
+
+        try:
+            response.raise_for_status()
+            t = structure_type
+        except HTTPError:
+            t = structure_err_type
+        if t is None:
+            return response
+        if lazy and not custom:
+            response._lazy_structure_type = t
+            return response
+
+        try:
+            json = response.json()
+        except ValueError:
+            json = None
+
+        if not json:
+            return response
+        if custom:
+            return response.structure(t)
+        return response._structure(json, t)
+
+
+class Transport(ABC):
+    """
+    Sends requests built by :class:`Pipeline`.
+
+    Transport is responsible for everything between request hooks and
+    response hooks: merging session settings, preparing request, running
+    prepared request hooks and network I/O. Returned response should
+    be a :class:`requests.Response` with unread body if ``stream`` is set.
+    """
+
+    @abstractmethod
+    def send(
+        self,
+        session,
+        request: Request,
+        timeout=None,
+        allow_redirects: bool = True,
+        proxies=None,
+        stream=None,
+        verify=None,
+        cert=None,
+    ) -> Response:
+        ...
+
+    #: Transport can send requests prepared by :class:`RequestTemplate`,
+    #: otherwise templates are sent as usual requests with :meth:`send`
+    sends_prepared = False
+
+    def send_prepared(
+        self, session, prep: PreparedRequest, send_kwargs: dict
+    ) -> Response:
+        """
+        Sends request prepared by :class:`RequestTemplate`, prepared
+        request hooks are already executed. ``send_kwargs`` are arguments
+        of :meth:`requests.Session.send` with merged environment settings.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases resources of transport"""
+
+
+class RequestsTransport(Transport):
+    """
+    Default transport, which sends requests with :mod:`requests` machinery:
+    session settings, mounted adapters, retry policy, circuit breaker
+    and response spooling.
+    """
+
+    sends_prepared = True
+
+    def send(
+        self,
+        session,
+        request: Request,
+        timeout=None,
+        allow_redirects: bool = True,
+        proxies=None,
+        stream=None,
+        verify=None,
+        cert=None,
+    ) -> Response:
+        prep = session.prepare_request(request)
+        setattr(prep, "name", getattr(request, "name", None))
+        prep = session.pipeline.run_hooks(session.prep_request_hooks, prep)
+
+        settings = session.merge_environment_settings(
+            prep.url, proxies or {}, stream, verify, cert
+        )
+        send_kwargs = {"timeout": timeout, "allow_redirects": allow_redirects}
+        send_kwargs.update(settings)
+        return self.send_prepared(session, prep, send_kwargs)
+
+    def send_prepared(
+        self, session, prep: PreparedRequest, send_kwargs: dict
+    ) -> Response:
+        return session._send_prepared(prep, send_kwargs)
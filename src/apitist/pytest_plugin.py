@@ -0,0 +1,22 @@
+"""
+Pytest plugin adding recent exchanges of :class:`ExchangeBuffer`
+to report of failed test.
+"""
+import pytest
+
+from .exchanges import ExchangeBuffer
+
+
+def pytest_runtest_setup(item):
+    # Only exchanges of the current test are reported
+    ExchangeBuffer.clear_all()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call" and report.failed:
+        exchanges = ExchangeBuffer.format_all()
+        if exchanges:
+            report.sections.append(("apitist exchanges", exchanges))
@@ -1,17 +1,95 @@
+import dataclasses
+import hashlib
 import inspect
+import time
 from abc import ABC
-from typing import List, Set, Type, TypeVar, Union
-from urllib.parse import urlparse
-
-from requests import HTTPError, PreparedRequest, Request, Response
+from http.cookiejar import CookieJar
+from typing import (
+    Any,
+    Collection,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Type,
+    TypeVar,
+    Union,
+)
+from urllib.parse import urlsplit
+
+import attr
+from requests import PreparedRequest, Request, Response
 from requests import Session as OldSession
-from requests.cookies import cookiejar_from_dict, merge_cookies
-
+from requests.cookies import (
+    RequestsCookieJar,
+    cookiejar_from_dict,
+    merge_cookies,
+)
+from requests.exceptions import UnrewindableBodyError
+from requests.sessions import merge_hooks, merge_setting
+from requests.structures import CaseInsensitiveDict
+from requests.utils import (
+    get_netrc_auth,
+    rewind_body,
+    stream_decode_response_unicode,
+)
+
+from apitist.adapters import ASGIAdapter, WSGIAdapter
+from apitist.cassette import Cassette, CassetteAdapter, CassetteMode
+from apitist.cookies import CompactCookieJar
+from apitist.fastpath import Urllib3Transport
+from apitist.http2 import HTTP2Adapter
 from apitist.logging import Logging
+from apitist.pagination import Pagination, paginate
+from apitist.pipeline import (
+    BackgroundHooks,
+    Pipeline,
+    RequestsTransport,
+    Transport,
+)
+from apitist.retry import CircuitBreaker, RetryPolicy
+from apitist.spool import SpooledBody, spool_response
+from apitist.template import RequestTemplate
+from apitist.utils import is_attrs_class, throw_response_missmatch
 
 
 class SessionHook(ABC):
-    pass
+    # Hook runs only for requests matching all given filters
+    #: Regular expression searched in request URL
+    match_url: Optional[str] = None
+    #: Request methods, e.g. ``{"GET", "POST"}``
+    match_methods: Optional[Collection[str]] = None
+    #: Request names (``name`` parameter of request)
+    match_names: Optional[Collection[str]] = None
+    #: Hooks with lower priority run first, equal ones in order of adding
+    priority: int = 0
+    #: Response hook runs in session worker pool, its result is ignored
+    run_in_background: bool = False
+
+    @classmethod
+    def matching(
+        cls,
+        url: str = None,
+        methods: Union[str, Collection[str]] = None,
+        names: Union[str, Collection[str]] = None,
+        priority: int = None,
+    ) -> Type["SessionHook"]:
+        """Returns subclass of hook, which runs only for matching requests"""
+        attrs = {}
+        if url is not None:
+            attrs["match_url"] = url
+        if methods is not None:
+            if isinstance(methods, str):
+                methods = [methods]
+            attrs["match_methods"] = frozenset(m.upper() for m in methods)
+        if names is not None:
+            if isinstance(names, str):
+                names = [names]
+            attrs["match_names"] = frozenset(names)
+        if priority is not None:
+            attrs["priority"] = priority
+        return type(cls.__name__, (cls,), attrs)
 
 
 class RequestHook(SessionHook):
@@ -37,12 +115,95 @@ class ResponseCoverterHook(SessionHook):
 DataType = TypeVar("DataType")
 
 
+class _LazyData:
+    """``data`` of response, which is structured on first access"""
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        t = instance.__dict__.get("_lazy_structure_type")
+        if t is not None:
+            try:
+                json = instance.json()
+            except ValueError:
+                json = None
+            if json:
+                # Type is kept if structuring fails, so error is raised
+                # again on every access
+                instance._structure(json, t)
+            instance.__dict__.pop("_lazy_structure_type", None)
+        try:
+            return instance.__dict__["data"]
+        except KeyError:
+            raise AttributeError(
+                f"{owner.__name__!r} object has no attribute 'data'"
+            )
+
+
 class ApitistResponse(Response):
-    data: DataType
+    # Structured response body, set by structure.
+    # Instance attribute overrides descriptor.
+    data: DataType = _LazyData()
+    spooled_body: Optional[SpooledBody] = None
+    # Set by exchange_buffer_hook, dumped if response is not verified
+    exchange_buffer = None
+    # Converter used by structure, set by response converter hooks
+    converter = None
+    # Content is released after successful structuring, if set
+    release_content_after_structure = False
+    # Size and SHA-1 of released content
+    content_size: Optional[int] = None
+    content_digest: Optional[str] = None
 
     def __init__(self, response: Response):
         self.__dict__ = response.__dict__
 
+    @property
+    def content(self) -> bytes:
+        if self.spooled_body is not None:
+            return self.spooled_body.read()
+        if self.content_digest is not None:
+            raise RuntimeError(
+                f"Content of response was released after structuring "
+                f"({self.describe_content()})"
+            )
+        return super().content
+
+    @property
+    def content_released(self) -> bool:
+        return self.content_digest is not None
+
+    def describe_content(self) -> str:
+        if self.content_released:
+            return (
+                f"<released {self.content_size} bytes, "
+                f"sha1 {self.content_digest}>"
+            )
+        return str(self.content)
+
+    def release_content(self):
+        """Drops content from memory keeping its size and digest"""
+        content = self._content
+        if self.spooled_body is not None or not isinstance(content, bytes):
+            # Spooled body is not kept in memory, stream is not read
+            return
+        self.content_size = len(content)
+        self.content_digest = hashlib.sha1(content).hexdigest()
+        self._content = None
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        if self.spooled_body is None:
+            return super().iter_content(chunk_size, decode_unicode)
+        chunks = self.spooled_body.iter_chunks(chunk_size)
+        if decode_unicode:
+            chunks = stream_decode_response_unicode(chunks, self)
+        return chunks
+
+    def close(self):
+        if self.spooled_body is not None:
+            self.spooled_body.close()
+        super().close()
+
     def verify_response(
         self, ok_status: Union[int, List[int]] = 200
     ) -> "ApitistResponse":
@@ -50,10 +211,12 @@ class ApitistResponse(Response):
         if isinstance(ok_status, int):
             ok_status = [ok_status]
         if self.status_code not in ok_status:
+            if self.exchange_buffer is not None:
+                self.exchange_buffer.dump()
             raise ValueError(
                 f"Verified response: function {func} failed: "
                 f"server responded {self.status_code} "
-                f"with data: {self.content}"
+                f"with data: {self.describe_content()}"
             )
         else:
             Logging.logger.info(
@@ -65,22 +228,78 @@ class ApitistResponse(Response):
         return self.verify_response(ok_status=ok_status)
 
     def structure(self, t: Type[DataType]) -> "ApitistResponse":
-        ...
+        """Structures JSON body into ``data`` with response converter"""
+        if self.converter is None:
+            return self
+        return self._structure(self.json(), t)
+
+    def _structure(self, json, t: Type[DataType]) -> "ApitistResponse":
+        try:
+            self.data = self.converter.structure(json, t)
+        except (TypeError, ValueError) as e:
+            if is_attrs_class(t):
+                fields = attr.fields_dict(t)
+                throw_response_missmatch(fields, self, e)
+            elif dataclasses.is_dataclass(t):
+                fields = dataclasses.fields(t)
+                throw_response_missmatch([f.name for f in fields], self, e)
+            raise e
+        if self.release_content_after_structure:
+            self.release_content()
+        return self
 
 
 T = TypeVar("T")
 
 
 class Session(OldSession):
+    response_class = ApitistResponse
+
     def __init__(
-        self, base_url: str = None, structure_err_type: Type[T] = None
+        self,
+        base_url: str = None,
+        structure_err_type: Type[T] = None,
+        retry_policy: RetryPolicy = None,
+        circuit_breaker: CircuitBreaker = None,
+        cache_environment: bool = False,
+        stream_uploads: bool = False,
+        spool_threshold: int = None,
+        spool_directory: str = None,
+        lazy_structure: bool = False,
+        release_content: bool = False,
+        transport: Transport = None,
+        fast_path: bool = False,
+        compact_cookies: bool = False,
+        background_workers: int = 2,
+        max_background_pending: int = 1000,
     ):
         super().__init__()
+        if compact_cookies:
+            self.cookies = CompactCookieJar()
         self.request_hooks = []
         self.prep_request_hooks = []
         self.response_hooks = []
         self.base_url = base_url
         self.structure_err_type = structure_err_type
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.cache_environment = cache_environment
+        self.stream_uploads = stream_uploads
+        self.spool_threshold = spool_threshold
+        self.spool_directory = spool_directory
+        self.lazy_structure = lazy_structure
+        self.release_content = release_content
+        if transport is None:
+            transport = (
+                Urllib3Transport() if fast_path else RequestsTransport()
+            )
+        self.transport = transport
+        self.pipeline = Pipeline(self)
+        self.background_hooks = BackgroundHooks(
+            background_workers, max_background_pending
+        )
+        self._environment_cache = {}
+        self._netrc_cache = {}
 
     def _add_hook(
         self,
@@ -118,39 +337,159 @@ class Session(OldSession):
         elif issubclass(hook, ResponseHook):
             self.add_response_hook(hook)
 
-    def _run_hooks(
-        self,
-        array: List[
-            Type[Union[RequestHook, PreparedRequestHook, ResponseHook]]
-        ],
-        data: Union[Request, PreparedRequest, Response, ApitistResponse],
-    ):
-        for hook in array:
-            data = hook().run(data)
-        return data
+    def _send_prepared(
+        self, prep: PreparedRequest, send_kwargs: dict
+    ) -> Response:
+        spool = self.spool_threshold is not None and not send_kwargs["stream"]
+        if spool:
+            send_kwargs = dict(send_kwargs, stream=True)
+        resp = self._send(prep, **send_kwargs)
+        if spool:
+            spool_response(resp, self.spool_threshold, self.spool_directory)
+        return resp
 
-    def _structure_response(
-        self, response: Response, structure_type, structure_err_type
-    ) -> Union[ApitistResponse, Response]:
-        if not getattr(response, "structure", None):
-            return response
+    def refresh_environment(self):
+        """Drops cached proxies, CA bundle and ``.netrc`` settings"""
+        self._environment_cache.clear()
+        self._netrc_cache.clear()
 
+    def merge_environment_settings(self, url, proxies, stream, verify, cert):
+        if not self.cache_environment:
+            return super().merge_environment_settings(
+                url, proxies, stream, verify, cert
+            )
+        parts = urlsplit(url)
+        key = (
+            parts.scheme,
+            parts.netloc,
+            tuple(sorted((proxies or {}).items())),
+            stream,
+            verify,
+            cert,
+            tuple(sorted(self.proxies.items())),
+            self.stream,
+            self.verify,
+            self.cert,
+            self.trust_env,
+        )
         try:
-            json = response.json()
-        except ValueError:
-            json = None
+            settings = self._environment_cache.get(key)
+        except TypeError:
+            # Unhashable settings are not cached
+            return super().merge_environment_settings(
+                url, proxies, stream, verify, cert
+            )
+        if settings is None:
+            settings = super().merge_environment_settings(
+                url, dict(proxies or {}), stream, verify, cert
+            )
+            self._environment_cache[key] = settings
+        return dict(settings)
+
+    def _get_netrc_auth(self, url: str):
+        """Returns ``.netrc`` credentials, cached per host if enabled"""
+        if not self.cache_environment:
+            return get_netrc_auth(url)
+        netloc = urlsplit(url).netloc
+        # Missing credentials (None) are cached as well
+        if netloc not in self._netrc_cache:
+            self._netrc_cache[netloc] = get_netrc_auth(url)
+        return self._netrc_cache[netloc]
+
+    def prepare_request(self, request: Request) -> PreparedRequest:
+        cookies = self.cookies
+        if request.cookies or not isinstance(cookies, CompactCookieJar):
+            request_cookies = request.cookies or {}
+            if not isinstance(request_cookies, CookieJar):
+                request_cookies = cookiejar_from_dict(request_cookies)
+            cookies = merge_cookies(
+                merge_cookies(RequestsCookieJar(), self.cookies),
+                request_cookies,
+            )
+        # Otherwise session cookies are used as is, without copying
+
+        auth = request.auth
+        if self.trust_env and not auth and not self.auth:
+            auth = self._get_netrc_auth(request.url)
+
+        p = PreparedRequest()
+        p.prepare(
+            method=request.method.upper(),
+            url=request.url,
+            files=request.files,
+            data=request.data,
+            json=request.json,
+            headers=merge_setting(
+                request.headers, self.headers, dict_class=CaseInsensitiveDict
+            ),
+            params=merge_setting(request.params, self.params),
+            auth=merge_setting(auth, self.auth),
+            cookies=cookies,
+            hooks=merge_hooks(request.hooks, self.hooks),
+        )
+        return p
 
-        if not json:
-            return response
+    def _prepare_retry(
+        self, attempt: int, request: PreparedRequest, **kwargs
+    ) -> bool:
+        """
+        Checks, whether request should be retried, and rewinds its body.
 
-        try:
-            response.raise_for_status()
-            if structure_type is not None:
-                response = response.structure(structure_type)
-        except HTTPError:
-            if structure_err_type is not None:
-                response = response.structure(structure_err_type)
-        return response
+        Requests with streamed bodies, which can't be rewound, are not
+        retried.
+        """
+        policy = self.retry_policy
+        if policy is None:
+            return False
+        body = request.body
+        streamed = body is not None and not isinstance(body, (bytes, str))
+        if streamed and not isinstance(request._body_position, int):
+            return False
+        if not policy.should_retry(attempt, request, **kwargs):
+            return False
+        if streamed:
+            try:
+                rewind_body(request)
+            except UnrewindableBodyError:
+                return False
+        return True
+
+    def _send(self, request: PreparedRequest, **kwargs) -> Response:
+        """Sends request according to retry policy and circuit breaker"""
+        policy, breaker = self.retry_policy, self.circuit_breaker
+        if policy is None and breaker is None:
+            return self.send(request, **kwargs)
+
+        key = breaker.get_key(request) if breaker is not None else None
+        if policy is not None and policy.budget is not None:
+            policy.budget.deposit()
+        attempt = 0
+        while True:
+            if breaker is not None:
+                breaker.before_request(key)
+            try:
+                resp = self.send(request, **kwargs)
+            except Exception as e:
+                if breaker is not None:
+                    breaker.record_failure(key)
+                if not self._prepare_retry(attempt, request, exception=e):
+                    raise
+                Logging.logger.debug(f"Retrying {request.url} after {e!r}")
+            else:
+                if breaker is not None:
+                    if breaker.is_failure(resp):
+                        breaker.record_failure(key)
+                    else:
+                        breaker.record_success(key)
+                if not self._prepare_retry(attempt, request, response=resp):
+                    return resp
+                Logging.logger.debug(
+                    f"Retrying {request.url} after "
+                    f"status {resp.status_code}"
+                )
+                resp.close()
+            attempt += 1
+            time.sleep(policy.get_backoff(attempt))
 
     def request(
         self,
@@ -217,47 +556,156 @@ class Session(OldSession):
         :rtype: requests.Response
         """
         # Create the Request.
-        parsed_url = urlparse(url)
-        if parsed_url.scheme and parsed_url.hostname:
-            result_url = url
-        else:
-            result_url = "/".join([self.base_url.rstrip("/"), url.lstrip("/")])
-        req = Request(
-            method=method.upper(),
-            url=result_url,
+        req = self.pipeline.build_request(
+            method,
+            url,
+            params=params,
+            data=data,
             headers=headers,
+            cookies=cookies,
             files=files,
-            data=data or {},
-            json=json,
-            params=params or {},
             auth=auth,
-            cookies=cookies,
             hooks=hooks,
-        )
-        setattr(req, "name", name)
-        req = self._run_hooks(self.request_hooks, req)
-        prep = self.prepare_request(req)
-        setattr(prep, "name", name)
-        prep = self._run_hooks(self.prep_request_hooks, prep)
-
-        proxies = proxies or {}
-
-        settings = self.merge_environment_settings(
-            prep.url, proxies, stream, verify, cert
+            json=json,
+            name=name,
         )
 
         # Send the request.
-        send_kwargs = {"timeout": timeout, "allow_redirects": allow_redirects}
-        send_kwargs.update(settings)
-        resp = ApitistResponse(self.send(prep, **send_kwargs))
-        setattr(resp, "name", name)
-        resp = self._run_hooks(self.response_hooks, resp)
-
-        self._structure_response(
-            resp, structure_type, structure_err_type or self.structure_err_type
+        resp = self.transport.send(
+            self,
+            req,
+            timeout=timeout,
+            allow_redirects=allow_redirects,
+            proxies=proxies,
+            stream=stream,
+            verify=verify,
+            cert=cert,
+        )
+        return self.pipeline.process_response(
+            resp,
+            name,
+            structure_type,
+            structure_err_type or self.structure_err_type,
         )
 
-        return resp
+    def close(self):
+        # Background hooks may still read responses
+        self.background_hooks.drain()
+        super().close()
+        self.transport.close()
+        # Records of this session, logged in background, are emitted
+        Logging.flush()
+
+    def template(self, method: str, url: str, **kwargs) -> RequestTemplate:
+        """Pre-builds request for repeated calls of the same endpoint.
+
+        Session headers, cookies, auth and environment settings are merged
+        only once, per call only URL placeholders, query parameters and
+        body are prepared::
+
+            get_user = session.template("GET", "/users/{id}")
+            get_user(id=1)
+            get_user(id=2, params={"fields": "name"})
+
+        :param method: method for the new :class:`Request` object.
+        :param url: URL with :meth:`str.format` placeholders.
+        :param kwargs: (optional) ``params``, ``headers``, ``cookies``,
+            ``auth``, send options, ``structure_type``,
+            ``structure_err_type`` and ``name`` as in :meth:`request`.
+        :rtype: RequestTemplate
+        """
+        return RequestTemplate(self, method, url, **kwargs)
+
+    def _mount_app(self, adapter, url: str = None):
+        prefix = url or self.base_url
+        if not prefix:
+            raise ValueError("Either `url` or session `base_url` is required")
+        self.mount(prefix, adapter)
+        return adapter
+
+    def mount_wsgi(self, app, url: str = None) -> WSGIAdapter:
+        """Dispatches requests to ``url`` directly to WSGI application.
+
+        :param app: WSGI application.
+        :param url: (optional) URL prefix to mount application to,
+            defaults to session ``base_url``.
+        :rtype: WSGIAdapter
+        """
+        return self._mount_app(WSGIAdapter(app), url)
+
+    def mount_asgi(self, app, url: str = None) -> ASGIAdapter:
+        """Dispatches requests to ``url`` directly to ASGI application.
+
+        :param app: ASGI application.
+        :param url: (optional) URL prefix to mount application to,
+            defaults to session ``base_url``.
+        :rtype: ASGIAdapter
+        """
+        return self._mount_app(ASGIAdapter(app), url)
+
+    def mount_http2(self, url: str = "https://", **client_kwargs):
+        """Sends requests to ``url`` with HTTP/2, requires ``httpx``.
+
+        :param url: (optional) URL prefix, all HTTPS requests by default.
+        :param client_kwargs: (optional) parameters for
+            :class:`httpx.Client`, e.g. ``limits``.
+        :rtype: HTTP2Adapter
+        """
+        adapter = HTTP2Adapter(**client_kwargs)
+        self.mount(url, adapter)
+        return adapter
+
+    def use_cassette(
+        self,
+        path: str,
+        mode: CassetteMode = CassetteMode.AUTO,
+        match_on: Sequence[str] = ("method", "url"),
+    ) -> Cassette:
+        """Records and replays all requests of the session with cassette.
+
+        :param path: path to cassette file.
+        :param mode: (optional) :class:`CassetteMode`, by default
+            recorded requests are replayed and new ones are recorded.
+        :param match_on: (optional) request parts to match exchanges by:
+            ``"method"``, ``"url"``, ``"body"`` and ``"name"``.
+        :rtype: Cassette
+        """
+        cassette = Cassette(path, mode=mode, match_on=match_on)
+        for prefix in ("https://", "http://"):
+            adapter = self.get_adapter(prefix)
+            self.mount(prefix, CassetteAdapter(cassette, adapter))
+        return cassette
+
+    def paginate(
+        self,
+        method: str,
+        url: str,
+        pagination: Pagination,
+        prefetch: bool = True,
+        max_pages: int = None,
+        **kwargs,
+    ) -> Iterator[Any]:
+        """Lazily iterates over items of all pages of listing endpoint.
+
+        :param method: method for the new :class:`Request` object.
+        :param url: URL for the first page.
+        :param pagination: pagination strategy, e.g.
+            :class:`PageNumberPagination`
+        :param prefetch: (optional) request next page in the background
+            thread, while items of the current page are consumed.
+        :param max_pages: (optional) maximum amount of pages to request.
+        :param kwargs: (optional) parameters passed to :meth:`request`,
+            use ``structure_type`` to get structured items.
+        """
+        return paginate(
+            self,
+            method,
+            url,
+            pagination,
+            prefetch=prefetch,
+            max_pages=max_pages,
+            **kwargs,
+        )
 
 
 class SharedSession:
@@ -267,8 +715,9 @@ class SharedSession:
     all registered session objects
     """
 
-    def __init__(self, *sessions: OldSession):
-        self._shared_state = {"cookies": cookiejar_from_dict({})}
+    def __init__(self, *sessions: OldSession, compact_cookies: bool = False):
+        cookies = CompactCookieJar() if compact_cookies else None
+        self._shared_state = {"cookies": cookiejar_from_dict({}, cookies)}
         self._sessions: Set[OldSession] = set()
 
         class SharedSessionHook(ResponseHook):
@@ -295,6 +744,8 @@ class SharedSession:
 
     def synchronize_sessions(self):
         for s in self._sessions:
+            if s.cookies is self._shared_state["cookies"]:
+                continue
             self._shared_state["cookies"] = merge_cookies(
                 self._shared_state["cookies"], s.cookies
             )
@@ -306,10 +757,10 @@ class SharedSession:
                 s.add_hook(self._hook)
 
 
-def session(base_url: str = None):
+def session(base_url: str = None, **kwargs):
     """
     Returns a :class:`Session` for context-management.
 
     :rtype: Session
     """
-    return Session(base_url=base_url)
+    return Session(base_url=base_url, **kwargs)
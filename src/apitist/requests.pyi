@@ -1,15 +1,37 @@
 from abc import ABC
-from typing import Union, Text, MutableMapping, Any, Iterable, Tuple, Optional, IO, Callable, List, TypeVar, Type
+from typing import Collection, Union, Text, MutableMapping, Any, Iterable, Tuple, Optional, IO, Callable, List, TypeVar, Type, Iterator, Sequence
 
 from requests import Request, Response, PreparedRequest
 from requests import Session as OldSession
 from requests import auth as _auth
 from requests.cookies import RequestsCookieJar
 
+from apitist.adapters import ASGIAdapter, WSGIAdapter
+from apitist.cassette import Cassette, CassetteMode
+from apitist.exchanges import ExchangeBuffer
+from apitist.http2 import HTTP2Adapter
+from apitist.pagination import Pagination
+from apitist.pipeline import BackgroundHooks, Pipeline, Transport
+from apitist.retry import CircuitBreaker, RetryPolicy
+from apitist.spool import SpooledBody
+from apitist.template import RequestTemplate
+
 DataType = TypeVar("DataType")
 
 class SessionHook(ABC):
-    pass
+    match_url: Optional[str]
+    match_methods: Optional[Collection[str]]
+    match_names: Optional[Collection[str]]
+    priority: int
+    run_in_background: bool
+    @classmethod
+    def matching(
+        cls,
+        url: Optional[str] = ...,
+        methods: Union[str, Collection[str], None] = ...,
+        names: Union[str, Collection[str], None] = ...,
+        priority: Optional[int] = ...,
+    ) -> Type["SessionHook"]: ...
 
 
 class RequestHook(SessionHook):
@@ -29,6 +51,16 @@ class ResponseHook(SessionHook):
 
 class ApitistResponse(Response):
     data: DataType
+    spooled_body: Optional[SpooledBody]
+    exchange_buffer: Optional[ExchangeBuffer]
+    converter: Any
+    release_content_after_structure: bool
+    content_size: Optional[int]
+    content_digest: Optional[str]
+    @property
+    def content_released(self) -> bool: ...
+    def describe_content(self) -> str: ...
+    def release_content(self) -> None: ...
     def __init__(self, response: Response): ...
     def verify_response(self, ok_status: Union[int, List[int]] = 200) -> "ApitistResponse": ...
     def vr(self, ok_status: Union[int, List[int]] = 200) -> "ApitistResponse": ...
@@ -44,12 +76,25 @@ R = TypeVar("R")
 
 
 class Session(OldSession):
+    response_class: Type[ApitistResponse]
     request_hooks: List[RequestHook]
     prep_request_hooks: List[PreparedRequestHook]
     response_hooks: List[ResponseHook]
     structure_err_type: Type[T]
     base_url: str
-    def __init__(self, base_url: str = None): ...
+    retry_policy: Optional[RetryPolicy]
+    circuit_breaker: Optional[CircuitBreaker]
+    cache_environment: bool
+    stream_uploads: bool
+    spool_threshold: Optional[int]
+    spool_directory: Optional[str]
+    lazy_structure: bool
+    release_content: bool
+    transport: Transport
+    pipeline: Pipeline
+    background_hooks: BackgroundHooks
+    def __init__(self, base_url: str = None, structure_err_type: Type[T] = None, retry_policy: RetryPolicy = None, circuit_breaker: CircuitBreaker = None, cache_environment: bool = False, stream_uploads: bool = False, spool_threshold: int = None, spool_directory: str = None, lazy_structure: bool = False, release_content: bool = False, transport: Transport = None, fast_path: bool = False, compact_cookies: bool = False, background_workers: int = 2, max_background_pending: int = 1000): ...
+    def refresh_environment(self): ...
     def add_request_hook(self, hook: Type[RequestHook]): ...
     def add_prep_request_hook(self, hook: Type[PreparedRequestHook]): ...
     def add_response_hook(self, hook: Type[ResponseHook]): ...
@@ -74,6 +119,13 @@ class Session(OldSession):
                 structure_err_type: Optional[T] = ...,
                 name: str = ...,
                 ) -> ApitistResponse: ...
+    def close(self): ...
+    def template(self, method: str, url: str, **kwargs) -> RequestTemplate: ...
+    def mount_wsgi(self, app: Callable, url: str = None) -> WSGIAdapter: ...
+    def mount_asgi(self, app: Callable, url: str = None) -> ASGIAdapter: ...
+    def mount_http2(self, url: str = ..., **client_kwargs) -> HTTP2Adapter: ...
+    def use_cassette(self, path: str, mode: CassetteMode = ..., match_on: Sequence[str] = ...) -> Cassette: ...
+    def paginate(self, method: str, url: Union[Text, bytes], pagination: Pagination, prefetch: bool = ..., max_pages: Optional[int] = ..., **kwargs) -> Iterator[Any]: ...
     def get(self, url: Union[Text, bytes], **kwargs) -> ApitistResponse: ...
     def options(self, url: Union[Text, bytes], **kwargs) -> ApitistResponse: ...
     def head(self, url: Union[Text, bytes], **kwargs) -> ApitistResponse: ...
@@ -84,9 +136,9 @@ class Session(OldSession):
 
 
 class SharedSession:
-    def __init__(self, *sessions: OldSession): ...
+    def __init__(self, *sessions: OldSession, compact_cookies: bool = False): ...
     def add_sessions(self, *sessions: OldSession): ...
     def validate_sessions(self): ...
     def synchronize_sessions(self): ...
 
-def session(base_url: str = None) -> Session: ...
+def session(base_url: str = None, **kwargs) -> Session: ...
@@ -0,0 +1,232 @@
+import random
+import threading
+import time
+from typing import Callable, Collection, Dict, Optional, Type, Union
+from urllib.parse import urlparse
+
+from requests import PreparedRequest, Response
+from requests.exceptions import ConnectionError, RequestException, Timeout
+
+from .logging import Logging
+
+IDEMPOTENT_METHODS = frozenset(
+    ["DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"]
+)
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of sending a request while its circuit is open"""
+
+    def __init__(self, key: str, retry_after: float, *args, **kwargs):
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit for {key} is open, "
+            f"next attempt in {retry_after:.2f} seconds",
+            *args,
+            **kwargs,
+        )
+
+
+class RetryBudget:
+    """
+    Limits amount of retries made by session.
+
+    Every request deposits ``ratio`` tokens into the budget and every retry
+    withdraws one token, so retries can not exceed ``ratio`` of total
+    requests (plus ``min_retries`` to make first retries possible).
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._requests = 0
+        self._retries = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._requests += 1
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            allowed = self.min_retries + self._requests * self.ratio
+            if self._retries >= allowed:
+                return False
+            self._retries += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Describes when and how failed requests should be retried.
+
+    :param total: maximum amount of retries for one request
+    :param statuses: response status codes which should be retried
+    :param exceptions: exception classes which should be retried
+    :param methods: HTTP methods allowed to be retried,
+        ``None`` allows all methods
+    :param backoff_factor: base delay in seconds, delay before
+        ``n``-th retry is ``backoff_factor * 2 ** (n - 1)``
+    :param backoff_max: maximum delay between retries
+    :param jitter: use "full jitter" - random delay between 0
+        and calculated backoff
+    :param budget: (optional) :class:`RetryBudget` shared between requests
+    """
+
+    def __init__(
+        self,
+        total: int = 3,
+        statuses: Collection[int] = (502, 503, 504),
+        exceptions: Collection[Type[Exception]] = (ConnectionError, Timeout),
+        methods: Optional[Collection[str]] = IDEMPOTENT_METHODS,
+        backoff_factor: float = 0.1,
+        backoff_max: float = 10.0,
+        jitter: bool = True,
+        budget: RetryBudget = None,
+    ):
+        self.total = total
+        self.statuses = frozenset(statuses)
+        self.exceptions = tuple(exceptions)
+        self.methods = (
+            frozenset(m.upper() for m in methods)
+            if methods is not None
+            else None
+        )
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.budget = budget
+
+    def is_method_retryable(self, method: str) -> bool:
+        return self.methods is None or method.upper() in self.methods
+
+    def should_retry(
+        self,
+        attempt: int,
+        request: PreparedRequest,
+        response: Response = None,
+        exception: Exception = None,
+    ) -> bool:
+        if attempt >= self.total:
+            return False
+        if not self.is_method_retryable(request.method):
+            return False
+        if exception is not None:
+            if not isinstance(exception, self.exceptions):
+                return False
+        elif response is None or response.status_code not in self.statuses:
+            return False
+        if self.budget is not None and not self.budget.withdraw():
+            Logging.logger.debug("Retry budget is exhausted")
+            return False
+        return True
+
+    def get_backoff(self, attempt: int) -> float:
+        """Returns delay in seconds before retry number ``attempt``"""
+        if attempt <= 0 or self.backoff_factor <= 0:
+            return 0
+        backoff = min(
+            self.backoff_max, self.backoff_factor * 2 ** (attempt - 1)
+        )
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        return backoff
+
+
+class _CircuitState:
+    def __init__(self):
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_progress = False
+
+
+class CircuitBreaker:
+    """
+    Fails fast for endpoints which keep failing.
+
+    After ``failure_threshold`` consecutive failures circuit for the key
+    becomes open and every request raises :class:`CircuitOpenError` without
+    touching network. After ``recovery_timeout`` seconds a single trial
+    request is allowed (half-open state): success closes the circuit,
+    failure opens it again.
+
+    :param failure_threshold: consecutive failures to open the circuit
+    :param recovery_timeout: seconds to wait before trial request
+    :param key: ``"host"``, ``"name"`` (request ``name`` with fallback
+        to host) or callable, which takes prepared request and returns key
+    :param failure_statuses: response statuses counted as failures,
+        by default all 5xx statuses
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        key: Union[str, Callable[[PreparedRequest], str]] = "host",
+        failure_statuses: Collection[int] = None,
+    ):
+        if not callable(key) and key not in ("host", "name"):
+            raise ValueError(
+                "Circuit breaker key should be 'host', 'name' or callable"
+            )
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.key = key
+        self.failure_statuses = (
+            frozenset(failure_statuses)
+            if failure_statuses is not None
+            else None
+        )
+        self._states: Dict[str, _CircuitState] = {}
+        self._lock = threading.Lock()
+
+    def get_key(self, request: PreparedRequest) -> str:
+        if callable(self.key):
+            return self.key(request)
+        if self.key == "name" and getattr(request, "name", None):
+            return request.name
+        return urlparse(request.url).netloc
+
+    def is_failure(self, response: Response) -> bool:
+        if self.failure_statuses is None:
+            return response.status_code >= 500
+        return response.status_code in self.failure_statuses
+
+    def before_request(self, key: str):
+        """Raises :class:`CircuitOpenError` if request can't be sent"""
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or state.opened_at is None:
+                return
+            left = state.opened_at + self.recovery_timeout - time.monotonic()
+            if left > 0 or state.trial_in_progress:
+                raise CircuitOpenError(key, max(left, 0))
+            state.trial_in_progress = True
+            Logging.logger.debug(f"Circuit for {key} is half-open")
+
+    def record_success(self, key: str):
+        with self._lock:
+            state = self._states.pop(key, None)
+        if state is not None and state.opened_at is not None:
+            Logging.logger.info(f"Circuit for {key} is closed")
+
+    def record_failure(self, key: str):
+        with self._lock:
+            state = self._states.setdefault(key, _CircuitState())
+            state.failures += 1
+            state.trial_in_progress = False
+            if (
+                state.opened_at is not None
+                or state.failures >= self.failure_threshold
+            ):
+                state.opened_at = time.monotonic()
+                Logging.logger.warning(f"Circuit for {key} is open")
+
+    def is_open(self, key: str) -> bool:
+        state = self._states.get(key)
+        return state is not None and state.opened_at is not None
+
+    def reset(self):
+        with self._lock:
+            self._states.clear()
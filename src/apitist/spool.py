@@ -0,0 +1,74 @@
+import tempfile
+from typing import Iterator
+
+from requests import Response
+
+CHUNK_SIZE = 64 * 1024
+
+
+class SpooledBody:
+    """
+    Response body stored in temporary file.
+
+    Body is kept in memory until it exceeds ``threshold`` bytes,
+    then it is moved to temporary file in ``directory``.
+    """
+
+    def __init__(self, threshold: int, directory: str = None):
+        self.size = 0
+        self._file = tempfile.SpooledTemporaryFile(
+            max_size=threshold, dir=directory
+        )
+
+    @property
+    def on_disk(self) -> bool:
+        return getattr(self._file, "_rolled", False)
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def read(self) -> bytes:
+        """Reads whole body, result is not cached"""
+        self._file.seek(0)
+        return self._file.read()
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        self._file.seek(0)
+        while True:
+            chunk = self._file.read(chunk_size or CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        self._file.close()
+
+    def __repr__(self) -> str:
+        place = "disk" if self.on_disk else "memory"
+        return f"<SpooledBody: {self.size} bytes in {place}>"
+
+
+def spool_response(
+    response: Response, threshold: int, directory: str = None
+) -> Response:
+    """
+    Reads body of streamed response. Bodies up to ``threshold`` bytes are
+    loaded into memory as usual, larger ones are written to temporary file
+    and available as ``response.spooled_body``.
+    """
+    if response._content is not False:
+        return response
+    body = SpooledBody(threshold, directory)
+    for chunk in response.iter_content(CHUNK_SIZE):
+        body.write(chunk)
+    if body.size <= threshold:
+        response._content = body.read()
+        body.close()
+    else:
+        response.spooled_body = body
+    return response
@@ -0,0 +1,209 @@
+from typing import Any, Mapping
+
+from requests import PreparedRequest, Request
+from requests.auth import HTTPBasicAuth
+from requests.sessions import merge_setting
+
+from .multipart import MultipartEncoder
+
+# Headers which depend on body and are recalculated on every call
+_BODY_HEADERS = ("Content-Length", "Transfer-Encoding")
+
+
+class RequestTemplate:
+    """
+    Pre-built request for repeated calls of the same endpoint.
+
+    Session headers, cookies, auth and environment settings are merged
+    once, when template is created, on every call only URL, query
+    parameters and body are prepared. All registered session hooks
+    are still executed.
+
+    URL may contain :meth:`str.format` placeholders, which are filled with
+    call arguments, e.g. ``session.template("GET", "/users/{id}")(id=1)``.
+    URL scheme and host should not contain placeholders.
+
+    Session cookies are merged on template creation, use :meth:`refresh`
+    to pick up cookies received afterwards.
+
+    Prepared request is sent with session transport. Transports, which
+    can't send prepared requests, get usual requests built from template.
+    """
+
+    def __init__(
+        self,
+        session,
+        method: str,
+        url: str,
+        params: Mapping[str, Any] = None,
+        headers: Mapping[str, str] = None,
+        cookies=None,
+        auth=None,
+        timeout=None,
+        allow_redirects: bool = True,
+        proxies=None,
+        stream=None,
+        verify=None,
+        cert=None,
+        structure_type=None,
+        structure_err_type=None,
+        name: str = None,
+    ):
+        self.session = session
+        self.method = method.upper()
+        self.url = session.pipeline.resolve_url(url)
+        self.params = dict(params or {})
+        self.headers = headers
+        self.cookies = cookies
+        self.auth = auth
+        self.structure_type = structure_type
+        self.structure_err_type = structure_err_type
+        self.name = name
+        self._send_options = {
+            "timeout": timeout,
+            "allow_redirects": allow_redirects,
+            "proxies": proxies,
+            "stream": stream,
+            "verify": verify,
+            "cert": cert,
+        }
+        self.refresh()
+
+    def refresh(self):
+        """Merges session settings into template again"""
+        session = self.session
+        prep = session.prepare_request(
+            Request(
+                method=self.method,
+                url=self.url,
+                headers=self.headers,
+                auth=self.auth,
+                cookies=self.cookies,
+            )
+        )
+        for header in _BODY_HEADERS:
+            prep.headers.pop(header, None)
+        self._prepared = prep
+        # Static auth is already applied to headers
+        auth = self.auth or session.auth
+        if auth is None or isinstance(auth, (tuple, list, HTTPBasicAuth)):
+            auth = None
+        self._auth = auth
+
+        options = dict(self._send_options)
+        settings = session.merge_environment_settings(
+            prep.url,
+            options.pop("proxies") or {},
+            options.pop("stream"),
+            options.pop("verify"),
+            options.pop("cert"),
+        )
+        options.update(settings)
+        self._send_kwargs = options
+
+    def prepare(
+        self,
+        *args,
+        params: Mapping[str, Any] = None,
+        data=None,
+        json=None,
+        files=None,
+        headers: Mapping[str, str] = None,
+        **kwargs,
+    ) -> PreparedRequest:
+        """Prepares request, filling URL placeholders with arguments"""
+        session = self.session
+        url = self.url.format(*args, **kwargs) if args or kwargs else self.url
+        params = dict(self.params, **params) if params else self.params
+        if session.request_hooks:
+            req = Request(
+                method=self.method,
+                url=url,
+                headers=headers,
+                files=files,
+                data=data or {},
+                json=json,
+                params=params,
+            )
+            setattr(req, "name", self.name)
+            req = session.pipeline.run_hooks(session.request_hooks, req)
+            url, params, headers = req.url, req.params, req.headers
+            data, json, files = req.data, req.json, req.files
+        if files and session.stream_uploads:
+            data, files = MultipartEncoder(data, files), None
+            headers = dict(headers or {})
+            headers["Content-Type"] = data.content_type
+
+        cached = self._prepared
+        prep = PreparedRequest()
+        prep.method = self.method
+        prep.headers = cached.headers.copy()
+        if headers:
+            prep.headers.update(headers)
+        prep._cookies = cached._cookies
+        prep.hooks = {event: list(h) for event, h in cached.hooks.items()}
+        if session.params:
+            params = merge_setting(params, session.params)
+        prep.prepare_url(url, params)
+        prep.prepare_body(data, files, json)
+        if self._auth is not None:
+            prep.prepare_auth(self._auth, url)
+        setattr(prep, "name", self.name)
+        return session.pipeline.run_hooks(
+            session.prep_request_hooks, prep
+        )
+
+    def __call__(self, *args, **kwargs):
+        """
+        Sends request, positional and unknown keyword arguments are used
+        to fill URL placeholders, ``params``, ``data``, ``json``, ``files``
+        and ``headers`` are passed to request.
+
+        :rtype: ApitistResponse
+        """
+        session = self.session
+        transport = session.transport
+        if not transport.sends_prepared:
+            return self._request(*args, **kwargs)
+        resp = transport.send_prepared(
+            session, self.prepare(*args, **kwargs), self._send_kwargs
+        )
+        return session.pipeline.process_response(
+            resp,
+            self.name,
+            self.structure_type,
+            self.structure_err_type or session.structure_err_type,
+        )
+
+    def _request(
+        self,
+        *args,
+        params: Mapping[str, Any] = None,
+        data=None,
+        json=None,
+        files=None,
+        headers: Mapping[str, str] = None,
+        **kwargs,
+    ):
+        """Sends template as usual request, used by custom transports"""
+        url = self.url.format(*args, **kwargs) if args or kwargs else self.url
+        if headers:
+            headers = dict(self.headers or {}, **headers)
+        return self.session.request(
+            self.method,
+            url,
+            params=dict(self.params, **params) if params else self.params,
+            data=data,
+            headers=headers or self.headers,
+            cookies=self.cookies,
+            files=files,
+            auth=self.auth,
+            json=json,
+            structure_type=self.structure_type,
+            structure_err_type=self.structure_err_type,
+            name=self.name,
+            **self._send_options,
+        )
+
+    def __repr__(self) -> str:
+        return f"<RequestTemplate [{self.method} {self.url}]>"
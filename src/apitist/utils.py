@@ -10,6 +10,16 @@ def is_attrs_class(cls):
     return getattr(cls, "__attrs_attrs__", None) is not None
 
 
+def throw_response_missmatch(fields, res, exp):
+    raise TypeError(
+        f"Got miss-matched parameters in dicts. "
+        f"Info about first level:"
+        f"\n\tExpect: {sorted(fields)}"
+        f"\n\tActual: {sorted(dict(res.json()).keys())}"
+        f"\n\nOriginal exception: {exp}"
+    )
+
+
 def has_args(cls):
     return getattr(cls, "__args__", None) is not None
 
@@ -2,6 +2,7 @@ import logging
 
 import pytest
 
+import requests_mock
 from testfixtures import LogCapture
 
 from apitist.constructor import Converter, ConverterType
@@ -20,6 +21,21 @@ def session():
     return Session()
 
 
+@pytest.fixture
+def mock():
+    """Mocked transport, responses of test are registered on it"""
+    with requests_mock.Mocker() as m:
+        yield m
+
+
+@pytest.fixture
+def s(mock):
+    """Session sending requests to ``mock``"""
+    s = Session()
+    yield s
+    s.close()
+
+
 @pytest.fixture
 def randomer():
     return Randomer()
@@ -0,0 +1,173 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+
+from apitist import ResponseDataclassConverterHook
+from apitist import decorators as deco
+from apitist import session
+
+HOST = "http://testserver/api"
+
+
+@dataclass
+class Echo:
+    method: str
+    path: str
+    query: str
+    body: str
+
+
+def wsgi_app(environ, start_response):
+    body = environ["wsgi.input"].read(int(environ["CONTENT_LENGTH"] or 0))
+    data = {
+        "method": environ["REQUEST_METHOD"],
+        "path": environ["PATH_INFO"],
+        "query": environ["QUERY_STRING"],
+        "body": body.decode(),
+    }
+    status = "404 Not Found" if data["path"].endswith("missing") else "200 OK"
+    start_response(
+        status,
+        [
+            ("Content-Type", "application/json"),
+            ("Set-Cookie", "first=1"),
+            ("Set-Cookie", "second=2"),
+        ],
+    )
+    return [json.dumps(data).encode()]
+
+
+async def asgi_app(scope, receive, send):
+    message = await receive()
+    data = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "query": scope["query_string"].decode(),
+        "body": message["body"].decode(),
+    }
+    status = 404 if data["path"].endswith("missing") else 200
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"set-cookie", b"first=1"),
+                (b"set-cookie", b"second=2"),
+            ],
+        }
+    )
+    await send(
+        {"type": "http.response.body", "body": json.dumps(data).encode()}
+    )
+
+
+async def streaming_app(scope, receive, send):
+    """Streams response while listening for disconnect, as Starlette"""
+    await receive()
+
+    async def stream():
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": []}
+        )
+        for chunk in (b"first", b"second"):
+            await asyncio.sleep(0.01)
+            message = {"type": "http.response.body", "body": chunk}
+            await send(dict(message, more_body=True))
+        await send({"type": "http.response.body", "body": b""})
+
+    async def disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    tasks = [
+        asyncio.ensure_future(stream()),
+        asyncio.ensure_future(disconnect()),
+    ]
+    _, pending = await asyncio.wait(
+        tasks, return_when=asyncio.FIRST_COMPLETED
+    )
+    for task in pending:
+        task.cancel()
+
+
+class ExampleClient:
+    def __init__(self, hostname):
+        self.session = session(hostname)
+        self.session.add_hook(ResponseDataclassConverterHook)
+
+    @deco.post("/users/{}", structure_type=Echo)
+    def post_user(self, id, body):
+        return {"data": body, "params": {"q": "1"}}
+
+
+@pytest.fixture(params=["wsgi", "asgi"])
+def client(request):
+    client = ExampleClient(HOST)
+    if request.param == "wsgi":
+        client.session.mount_wsgi(wsgi_app)
+    else:
+        client.session.mount_asgi(asgi_app)
+    yield client
+    client.session.close()
+
+
+class TestAdapters:
+    def test_app_request(self, client):
+        res = client.post_user(1, "hello")
+        assert res.status_code == 200
+        assert res.data == Echo("POST", "/api/users/1", "q=1", "hello")
+
+    def test_app_cookies(self, client):
+        client.post_user(1, "hello")
+        assert client.session.cookies["first"] == "1"
+        assert client.session.cookies["second"] == "2"
+
+    def test_app_status(self, client):
+        res = client.session.get("/missing")
+        assert res.status_code == 404
+        with pytest.raises(ValueError):
+            res.vr()
+
+    def test_mount_without_url(self):
+        with pytest.raises(ValueError):
+            session().mount_wsgi(wsgi_app)
+
+
+@pytest.fixture
+def asgi():
+    s = session(HOST)
+    s.mount_asgi(asgi_app)
+    yield s
+    s.close()
+
+
+class TestASGIAdapter:
+    def test_concurrent_requests(self, asgi):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(lambda i: asgi.get(f"/items/{i}").json(), range(50))
+            )
+        assert [r["path"] for r in results] == [
+            f"/api/items/{i}" for i in range(50)
+        ]
+
+    def test_inside_running_loop(self, asgi):
+        async def main():
+            return asgi.get("/items").json()
+
+        assert asyncio.run(main())["path"] == "/api/items"
+
+    def test_closed_adapter_restarts(self, asgi):
+        asgi.get("/items")
+        asgi.close()
+        assert asgi.get("/items").status_code == 200
+
+    def test_streaming_app_listening_for_disconnect(self):
+        s = session(HOST)
+        s.mount_asgi(streaming_app)
+        assert s.get("/stream").content == b"firstsecond"
+        s.close()
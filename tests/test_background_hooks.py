@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from apitist import ResponseHook
+from apitist.pipeline import BackgroundHooks
+
+URL = "http://testserver/items"
+
+
+class Slow(ResponseHook):
+    run_in_background = True
+    done = []
+
+    def run(self, response):
+        time.sleep(0.05)
+        self.done.append(threading.current_thread().name)
+        return response
+
+
+class Gated(ResponseHook):
+    run_in_background = True
+    event = threading.Event()
+    done = []
+
+    def run(self, response):
+        self.event.wait(5)
+        self.done.append(threading.current_thread().name)
+        return response
+
+
+class Blocking(ResponseHook):
+    def run(self, response):
+        response.blocking = True
+        return response
+
+
+class Failing(ResponseHook):
+    run_in_background = True
+
+    def run(self, response):
+        raise RuntimeError("failed")
+
+
+@pytest.fixture(autouse=True)
+def items(mock):
+    Slow.done = []
+    mock.get(URL, json={"key": "value"})
+
+
+class TestBackgroundHooks:
+    def test_request_does_not_wait(self, s):
+        Gated.event = threading.Event()
+        Gated.done = []
+        s.add_hooks(Gated, Blocking)
+        res = s.get(URL)
+        assert not Gated.event.is_set()
+        assert res.blocking
+        assert not Gated.done
+        Gated.event.set()
+        s.close()
+        assert len(Gated.done) == 1
+        assert Gated.done[0].startswith("apitist-hooks")
+
+    def test_drained_on_close(self, s):
+        s.add_hook(Slow)
+        for _ in range(6):
+            s.get(URL)
+        s.close()
+        assert len(Slow.done) == 6
+        # Session can be used after close
+        s.get(URL)
+        s.close()
+        assert len(Slow.done) == 7
+
+    def test_errors_are_logged(self, s, capture):
+        s.add_hooks(Failing, Slow)
+        s.get(URL)
+        s.close()
+        assert s.background_hooks.errors == 1
+        assert "Background hook Failing failed" in str(capture)
+        assert len(Slow.done) == 1
+
+    def test_streamed_response_skipped(self, s):
+        s.add_hook(Slow)
+        res = s.get(URL, stream=True)
+        assert res.json() == {"key": "value"}
+        s.close()
+        assert not Slow.done
+        assert s.background_hooks.skipped == 1
+
+    def test_conditional(self, s):
+        s.add_hook(Slow.matching(methods=["POST"]))
+        s.get(URL)
+        s.close()
+        assert not Slow.done
+
+
+def test_bounded_pending():
+    hooks = BackgroundHooks(workers=1, max_pending=1)
+    event = threading.Event()
+
+    class Wait(ResponseHook):
+        def run(self, response):
+            event.wait(5)
+            return response
+
+    hooks.submit([Wait], None)
+    blocked = threading.Thread(target=hooks.submit, args=([Wait], None))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+    event.set()
+    blocked.join(5)
+    hooks.drain()
+    assert not blocked.is_alive()
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+import requests_mock
+
+from apitist import session
+from apitist.cassette import Cassette, CassetteMissError, CassetteMode
+
+HOST = "https://example.com"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cassette.jsonl")
+
+
+@pytest.fixture
+def mock_adapter():
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        "GET",
+        f"{HOST}/get",
+        json={"hello": "world"},
+        headers={"Set-Cookie": "token=abc"},
+    )
+    adapter.register_uri(
+        "POST", f"{HOST}/post", [{"text": "first"}, {"text": "second"}]
+    )
+    adapter.register_uri("GET", f"{HOST}/binary", content=b"\xff\x00")
+    return adapter
+
+
+def mocked_session(adapter):
+    s = session(HOST)
+    s.mount("https://", adapter)
+    return s
+
+
+def record(path, adapter, **kwargs):
+    s = mocked_session(adapter)
+    s.use_cassette(path, mode=CassetteMode.RECORD, **kwargs)
+    s.get("/get", name="Get hello")
+    s.post("/post", data="1")
+    s.post("/post", data="2")
+    s.get("/binary")
+    s.close()
+
+
+class TestCassette:
+    def test_record(self, path, mock_adapter):
+        record(path, mock_adapter)
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == 4
+        assert lines[0]["request"]["name"] == "Get hello"
+        assert lines[0]["response"]["status"] == 200
+
+    def test_replay(self, path, mock_adapter):
+        record(path, mock_adapter)
+        s = session(HOST)
+        cassette = s.use_cassette(path, mode=CassetteMode.REPLAY)
+        res = s.get("/get", name="Replayed")
+        assert res.json() == {"hello": "world"}
+        assert res.name == "Replayed"
+        assert s.cookies["token"] == "abc"
+        assert s.post("/post").text == "first"
+        assert s.post("/post").text == "second"
+        assert s.post("/post").text == "second"
+        assert s.get("/binary").content == b"\xff\x00"
+        assert cassette.hits == 5
+        with pytest.raises(CassetteMissError):
+            s.get("/unknown")
+
+    def test_replay_match_body(self, path, mock_adapter):
+        record(path, mock_adapter, match_on=("method", "url", "body"))
+        s = session(HOST)
+        s.use_cassette(
+            path, mode=CassetteMode.REPLAY, match_on=("method", "url", "body")
+        )
+        assert s.post("/post", data="2").text == "second"
+        assert s.post("/post", data="1").text == "first"
+
+    def test_auto_mode(self, path, mock_adapter):
+        s = mocked_session(mock_adapter)
+        cassette = s.use_cassette(path)
+        s.get("/get")
+        s.get("/get")
+        assert mock_adapter.call_count == 1
+        assert cassette.hits == 1
+        assert len(Cassette(path)) == 1
+
+    @pytest.mark.parametrize(
+        "kwargs,request_kwargs",
+        [({}, {"stream": True}), ({"spool_threshold": 1}, {})],
+    )
+    def test_streamed_not_recorded(
+        self, path, mock_adapter, kwargs, request_kwargs
+    ):
+        s = session(HOST, **kwargs)
+        s.mount("https://", mock_adapter)
+        cassette = s.use_cassette(path, mode=CassetteMode.RECORD)
+        res = s.get("/get", **request_kwargs)
+        assert res.json() == {"hello": "world"}
+        s.close()
+        assert cassette.skipped == 1
+        assert len(Cassette(path)) == 0
+
+    def test_replay_missing_file(self, path):
+        with pytest.raises(FileNotFoundError):
+            Cassette(path, mode=CassetteMode.REPLAY)
+
+    def test_unknown_matcher(self, path):
+        with pytest.raises(ValueError):
+            Cassette(path, match_on=("headers",))
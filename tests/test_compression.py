@@ -0,0 +1,82 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+import requests_mock
+
+from apitist import session
+from apitist.compression import (
+    PrepRequestCompressionHook,
+    ResponseCompressionStatsHook,
+    request_compression_hook,
+)
+
+HOST = "https://example.com"
+PAYLOAD = {"items": [{"id": i, "name": "name"} for i in range(100)]}
+
+
+class TestCompression:
+    @pytest.mark.parametrize(
+        "encoding,decompress",
+        [("gzip", gzip.decompress), ("deflate", zlib.decompress)],
+    )
+    def test_request_compression(self, encoding, decompress):
+        s = session(HOST)
+        s.add_hook(request_compression_hook(encoding, threshold=100))
+        with requests_mock.Mocker() as m:
+            m.post(f"{HOST}/post", text="ok")
+            res = s.post("/post", json=PAYLOAD)
+            req = m.request_history[0]
+        assert req.headers["Content-Encoding"] == encoding
+        assert json.loads(decompress(req.body)) == PAYLOAD
+        assert req.headers["Content-Length"] == str(len(req.body))
+        stats = res.request.compression
+        assert stats.encoding == encoding
+        assert stats.ratio > 1
+        assert stats.elapsed >= 0
+
+    def test_request_compression_threshold(self):
+        s = session(HOST)
+        s.add_hook(PrepRequestCompressionHook)
+        with requests_mock.Mocker() as m:
+            m.post(f"{HOST}/post", text="ok")
+            res = s.post("/post", json={"id": 1})
+            req = m.request_history[0]
+        assert "Content-Encoding" not in req.headers
+        assert not hasattr(res.request, "compression")
+
+    def test_unknown_compression(self):
+        with pytest.raises(ValueError):
+            request_compression_hook("lzma")
+
+    def test_response_compression_stats(self):
+        body = json.dumps(PAYLOAD).encode()
+        s = session(HOST)
+        s.add_hook(ResponseCompressionStatsHook)
+        with requests_mock.Mocker() as m:
+            m.get(
+                f"{HOST}/get",
+                content=gzip.compress(body),
+                headers={"Content-Encoding": "gzip"},
+            )
+            res = s.get("/get")
+        assert res.json() == PAYLOAD
+        assert res.compression.original_size == len(body)
+        assert res.compression.compressed_size == len(gzip.compress(body))
+
+    def test_response_compression_stats_spooled(self):
+        body = json.dumps(PAYLOAD).encode()
+        s = session(HOST, spool_threshold=100)
+        s.add_hook(ResponseCompressionStatsHook)
+        with requests_mock.Mocker() as m:
+            m.get(
+                f"{HOST}/get",
+                content=gzip.compress(body),
+                headers={"Content-Encoding": "gzip"},
+            )
+            res = s.get("/get")
+        assert res.spooled_body is not None
+        assert res.json() == PAYLOAD
+        assert res.compression.original_size == len(body)
@@ -1,5 +1,5 @@
 from dataclasses import MISSING, dataclass, field
-from typing import List
+from typing import List, Optional
 
 import pytest
 
@@ -7,6 +7,7 @@ import attr
 import pendulum
 
 from apitist.constructor import (
+    Converter,
     ConverterType,
     MissingDict,
     NothingDict,
@@ -124,6 +125,154 @@ class TestConstructor:
         assert converter._structure_call(value, str) == result
 
 
+@attr.s
+class Child:
+    name: TypeStr = attr.ib()
+    _token: str = attr.ib(default=None)
+
+
+@attr.s
+class DerivedChild(Child):
+    extra: int = attr.ib(default=0)
+
+
+@attr.s
+class Parent:
+    id: int = attr.ib()
+    created: pendulum.DateTime = attr.ib()
+    child: Optional[Child] = attr.ib(default=None)
+    children: List[Child] = attr.ib(factory=list)
+    first: Child = attr.ib(default=None)
+    raw = attr.ib(default=None)
+
+
+@dataclass
+class DataclassChild:
+    name: TypeStr
+    token: str = None
+
+
+@dataclass
+class DataclassParent:
+    id: int
+    created: pendulum.DateTime
+    child: Optional[DataclassChild] = None
+    children: List[DataclassChild] = field(default_factory=list)
+    first: DataclassChild = None
+
+
+PARENT = {
+    "id": 1,
+    "created": "2019-03-06T14:58:10+00:00",
+    "child": {"name": "child", "_token": "secret"},
+    "children": [{"name": "second", "_token": None}],
+    "first": {"name": "first", "_token": None},
+    "raw": {"any": "value"},
+}
+DATACLASS_PARENT = {
+    "id": 1,
+    "created": "2019-03-06T14:58:10+00:00",
+    "child": {"name": "child", "token": "secret"},
+    "children": [{"name": "second", "token": None}],
+    "first": {"name": "first", "token": None},
+}
+
+
+@pytest.fixture(params=[ConverterType.ATTRS, ConverterType.DATACLASS])
+def generated(request):
+    classic = Converter(request.param)
+    classic.register_additional_hooks()
+    conv = Converter(request.param, generated=True)
+    conv.register_additional_hooks()
+    if request.param == ConverterType.ATTRS:
+        return classic, conv, Parent, PARENT
+    return classic, conv, DataclassParent, DATACLASS_PARENT
+
+
+class TestGeneratedConverter:
+    def test_same_as_classic(self, generated):
+        classic, conv, t, data = generated
+        structured = conv.structure(data, t)
+        assert structured == classic.structure(data, t)
+        assert isinstance(structured.child.name, TypeStr)
+        assert isinstance(structured.created, pendulum.DateTime)
+        assert conv.unstructure(structured) == data
+        assert conv.unstructure(structured) == classic.unstructure(structured)
+
+    def test_cached_per_type(self, generated):
+        _, conv, t, data = generated
+        conv.unstructure(conv.structure(data, t))
+        structure_fn = conv._structure_fns[t]
+        unstructure_fn = conv._unstructure_fns[t]
+        conv.unstructure(conv.structure(data, t))
+        assert conv._structure_fns[t] is structure_fn
+        assert conv._unstructure_fns[t] is unstructure_fn
+
+    def test_recompiled_after_hook_registration(self, generated):
+        _, conv, t, data = generated
+        conv.structure(data, t)
+        conv.register_hooks(
+            TypeStr, lambda obj, _: TypeStr(obj.upper()), lambda obj: obj
+        )
+        assert not conv._structure_fns
+        assert conv.structure(data, t).child.name == "CHILD"
+
+    def test_missing_keys_are_skipped(self, generated):
+        _, conv, t, _ = generated
+        structured = conv.structure(
+            {"id": "2", "created": "2019-03-06T14:58:10"}, t
+        )
+        assert structured.id == 2
+        assert structured.child is None
+        with pytest.raises(TypeError):
+            conv.structure({"id": 2}, t)
+
+    def test_nothing_is_omitted(self):
+        conv = Converter(generated=True)
+        conv.register_additional_hooks()
+        child = Child(TypeStr("child"), attr.NOTHING)
+        unstructured = conv.unstructure(Parent(1, None, first=child))
+        assert unstructured["first"] == {"name": "child"}
+        assert type(unstructured) is dict
+        assert type(unstructured["first"]) is dict
+
+    def test_missing_is_omitted(self):
+        conv = Converter(ConverterType.DATACLASS, generated=True)
+        child = DataclassChild(TypeStr("child"), MISSING)
+        assert conv.unstructure(child) == {"name": "child"}
+        assert type(conv.unstructure(child)) is dict
+
+    def test_custom_dict_factory(self):
+        class OrderedNothingDict(NothingDict):
+            pass
+
+        conv = Converter(generated=True)
+        conv.set_dict_factory(OrderedNothingDict)
+        unstructured = conv.unstructure(Child("child", attr.NOTHING))
+        assert isinstance(unstructured, OrderedNothingDict)
+        assert unstructured == {"name": "child"}
+
+    def test_plain_dict_factory_keeps_nothing(self):
+        child = Child("child", attr.NOTHING)
+        results = []
+        for generated in (False, True):
+            conv = Converter(generated=generated)
+            conv.set_dict_factory(dict)
+            results.append(conv.unstructure(child))
+        assert results[0] == results[1]
+        assert results[1]["_token"] is attr.NOTHING
+
+    def test_subclass_dispatched_at_runtime(self):
+        conv = Converter(generated=True)
+        conv.register_additional_hooks()
+        parent = Parent(1, None, first=DerivedChild(TypeStr("child")))
+        assert conv.unstructure(parent)["first"] == {
+            "name": "child",
+            "_token": None,
+            "extra": 0,
+        }
+
+
 class TestToType:
     def test_attrs(self):
         @transform
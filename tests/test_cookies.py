@@ -0,0 +1,117 @@
+import time
+
+import pytest
+from requests import Request
+from requests.cookies import (
+    RequestsCookieJar,
+    create_cookie,
+    get_cookie_header,
+)
+
+from apitist import CompactCookieJar, session
+from apitist.requests import SharedSession
+
+COOKIES = [
+    {"name": "any", "value": "1"},
+    {"name": "host", "value": "2", "domain": "example.com"},
+    {"name": "dot", "value": "3", "domain": ".example.com"},
+    {"name": "sub", "value": "4", "domain": "api.example.com"},
+    {"name": "other", "value": "5", "domain": "other.com"},
+    {"name": "path", "value": "6", "domain": "example.com", "path": "/v1"},
+    {"name": "secure", "value": "7", "domain": "example.com", "secure": True},
+    {
+        "name": "expired",
+        "value": "8",
+        "domain": "example.com",
+        "expires": int(time.time()) - 10,
+    },
+    {"name": "local", "value": "9", "domain": "localhost.local"},
+]
+
+
+def fill(jar):
+    for cookie in COOKIES:
+        jar.set_cookie(create_cookie(**cookie))
+    return jar
+
+
+def header(jar, url):
+    prep = Request("GET", url).prepare()
+    return sorted((get_cookie_header(jar, prep) or "").split("; "))
+
+
+class TestCompactCookieJar:
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "http://example.com/",
+            "https://example.com/v1/items",
+            "http://example.com/v10",
+            "http://api.example.com/",
+            "http://deep.api.example.com/",
+            "http://other.com/",
+            "http://notexample.com/",
+            "http://localhost:8080/",
+            "http://127.0.0.1/",
+        ],
+    )
+    def test_same_cookies_as_requests_jar(self, url):
+        assert header(fill(CompactCookieJar()), url) == header(
+            fill(RequestsCookieJar()), url
+        )
+
+    def test_clear_expired_cookies(self):
+        jar = CompactCookieJar()
+        jar.clear_expired_cookies()
+        now = int(time.time())
+        jar.set_cookie(create_cookie("later", "1", expires=now + 1000))
+        jar.clear_expired_cookies()
+        jar.set_cookie(create_cookie("gone", "2", expires=now - 10))
+        jar.clear_expired_cookies()
+        assert list(jar.keys()) == ["later"]
+
+    def test_copy(self):
+        jar = fill(CompactCookieJar())
+        copy = jar.copy()
+        assert isinstance(copy, CompactCookieJar)
+        assert len(copy) == len(jar)
+
+
+def cookie_app(environ, start_response):
+    start_response(
+        "200 OK",
+        [("Set-Cookie", "session=3; Path=/")],
+    )
+    return [environ.get("HTTP_COOKIE", "").encode()]
+
+
+@pytest.fixture
+def compact():
+    s = session("http://example.com", compact_cookies=True)
+    s.mount_wsgi(cookie_app)
+    return s
+
+
+class TestCompactCookiesSession:
+    def test_cookies_sent_and_stored(self, compact):
+        assert isinstance(compact.cookies, CompactCookieJar)
+        compact.cookies.set("token", "1", domain="example.com")
+        compact.cookies.set("foreign", "2", domain="other.com")
+        res = compact.get("/login")
+        assert res.text == "token=1"
+        assert res.request._cookies is compact.cookies
+        assert compact.cookies["session"] == "3"
+
+    def test_request_cookies(self, compact):
+        compact.cookies.set("token", "1")
+        res = compact.get("/", cookies={"extra": "2"})
+        assert sorted(res.text.split("; ")) == ["extra=2", "token=1"]
+        assert "extra" not in compact.cookies
+
+    def test_shared_session(self, compact):
+        second = session("http://example.com", compact_cookies=True)
+        SharedSession(compact, second, compact_cookies=True)
+        compact.get("/")
+        assert isinstance(second.cookies, CompactCookieJar)
+        assert second.cookies is compact.cookies
+        assert second.cookies["session"] == "3"
@@ -0,0 +1,99 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from testfixtures import LogCapture
+
+from apitist import ExchangeBuffer, exchange_buffer_hook
+from apitist import pytest_plugin
+
+URL = "http://testserver/items"
+
+
+@pytest.fixture
+def buffer():
+    return ExchangeBuffer(size=2, max_body_length=5)
+
+
+@pytest.fixture
+def s(s, mock, buffer):
+    mock.get(URL, content=b"0123456789")
+    mock.post(URL, status_code=500, text="error")
+    s.add_hook(exchange_buffer_hook(buffer))
+    return s
+
+
+class TestExchangeBuffer:
+    def test_last_exchanges_kept(self, s, buffer):
+        s.get(URL, name="First")
+        s.get(URL, params={"page": 2})
+        s.post(URL, data="x" * 10, name="Create")
+        assert [(e.method, e.name, e.status_code) for e in buffer] == [
+            ("GET", None, 200),
+            ("POST", "Create", 500),
+        ]
+        exchange = list(buffer)[1]
+        assert exchange.request_body == "xxxxx... [5 more]"
+        assert exchange.response_body == "error"
+        assert list(buffer)[0].response_body == "01234... [5 more]"
+
+    @pytest.mark.parametrize(
+        "body,expected",
+        [
+            ("xé", "xé"),
+            ("xé".encode(), "xé"),
+            (b"\xff\xfe", "base64://4="),
+        ],
+    )
+    def test_bodies_are_text(self, s, buffer, body, expected):
+        s.post(URL, data=body)
+        assert list(buffer)[0].request_body == expected
+
+    def test_streamed_response_is_not_consumed(self, s, buffer):
+        res = s.get(URL, stream=True)
+        assert list(buffer)[0].response_body == "<streamed body>"
+        assert res.content == b"0123456789"
+
+    def test_dump_on_failed_verification(self, s):
+        s.get(URL, name="Get items")
+        res = s.post(URL)
+        with LogCapture("apitist", level=logging.ERROR) as capture:
+            with pytest.raises(ValueError):
+                res.verify_response()
+        message = capture.records[0].getMessage()
+        assert message.startswith("Last 2 exchanges:\nGET ")
+        assert "[Get items] -> 200" in message
+        assert f"POST {URL} -> 500" in message
+
+    def test_nothing_dumped_on_success(self, s):
+        with LogCapture("apitist", level=logging.ERROR) as capture:
+            s.get(URL).verify_response()
+        assert not capture.records
+
+    def test_format_and_clear_all(self, s, buffer):
+        empty = ExchangeBuffer()
+        ExchangeBuffer.clear_all()
+        s.get(URL)
+        assert ExchangeBuffer.format_all() == buffer.format()
+        ExchangeBuffer.clear_all()
+        assert not len(buffer) and not len(empty)
+        assert ExchangeBuffer.format_all() == ""
+
+
+@pytest.mark.parametrize(
+    "when,outcome,reported",
+    [("call", "failed", True), ("call", "passed", False)],
+)
+def test_pytest_plugin(s, buffer, when, outcome, reported):
+    pytest_plugin.pytest_runtest_setup(None)
+    s.get(URL)
+    report = SimpleNamespace(
+        when=when, failed=outcome == "failed", sections=[]
+    )
+    hook = pytest_plugin.pytest_runtest_makereport(None, None)
+    next(hook)
+    with pytest.raises(StopIteration):
+        hook.send(SimpleNamespace(get_result=lambda: report))
+    assert bool(report.sections) is reported
+    if reported:
+        assert report.sections[0] == ("apitist exchanges", buffer.format())
@@ -0,0 +1,111 @@
+import gzip
+import json
+
+import pytest
+
+from apitist import HarWriter, har_hook, session
+from apitist.hooks import decode_body
+
+URL = "http://testserver/items"
+
+
+@pytest.fixture
+def mock(mock):
+    mock.get(URL, json={"items": [1, 2, 3]})
+    mock.post(URL, content=b"\xff\xfe" + b"x" * 100, status_code=201)
+    return mock
+
+
+def record(writer):
+    s = session()
+    s.add_hook(har_hook(writer))
+    s.get(URL, params={"page": 1}, name="Items")
+    s.post(URL, json={"name": "value"})
+    writer.close()
+
+
+class TestHarWriter:
+    def test_entries(self, tmp_path, mock):
+        path = tmp_path / "traffic.har"
+        record(HarWriter(str(path)))
+        log = json.loads(path.read_text())["log"]
+        assert log["version"] == "1.2"
+        assert log["creator"]["name"] == "apitist"
+        get, post = log["entries"]
+        assert get["_name"] == "Items"
+        assert get["request"]["method"] == "GET"
+        assert get["request"]["queryString"] == [
+            {"name": "page", "value": "1"}
+        ]
+        assert "postData" not in get["request"]
+        assert json.loads(get["response"]["content"]["text"]) == {
+            "items": [1, 2, 3]
+        }
+        assert get["time"] >= 0
+        assert post["_name"] is None
+        assert post["request"]["postData"] == {
+            "mimeType": "application/json",
+            "size": 17,
+            "text": '{"name": "value"}',
+        }
+        assert post["response"]["status"] == 201
+        assert post["response"]["content"]["encoding"] == "base64"
+
+    def test_truncated_and_compressed(self, tmp_path, mock):
+        path = tmp_path / "traffic.har.gz"
+        with HarWriter(str(path), max_body_length=10, compress=True) as w:
+            record(w)
+        with gzip.open(str(path), "rt") as f:
+            log = json.load(f)["log"]
+        content = log["entries"][0]["response"]["content"]
+        assert content["text"] == '{"items": '
+        assert content["size"] == 20
+        assert content["comment"] == "truncated, 10 more bytes"
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / "empty.har"
+        HarWriter(str(path)).close()
+        assert json.loads(path.read_text())["log"]["entries"] == []
+
+    def test_closed(self, tmp_path, mock):
+        writer = HarWriter(str(tmp_path / "closed.har"))
+        writer.close()
+        with pytest.raises(ValueError):
+            record(writer)
+
+    def test_streamed_response_is_not_consumed(self, tmp_path, mock):
+        path = tmp_path / "stream.har"
+        writer = HarWriter(str(path))
+        s = session()
+        s.add_hook(har_hook(writer))
+        res = s.get(URL, stream=True)
+        writer.close()
+        entry = json.loads(path.read_text())["log"]["entries"][0]
+        assert entry["response"]["content"]["text"] == "<streamed body>"
+        assert res.json() == {"items": [1, 2, 3]}
+
+
+@pytest.mark.parametrize(
+    "body,content_type,expected",
+    [
+        (b"text", None, ("text", None)),
+        ("привет".encode()[:5], None, ("пр", None)),
+        (b"\xff\xfe\x00", None, ("//4A", "base64")),
+        ("é".encode("latin-1"), "text/plain; charset=latin-1", ("é", None)),
+        (b"text", "text/plain; charset=unknown", ("text", None)),
+    ],
+)
+def test_decode_body(body, content_type, expected):
+    headers = {"Content-Type": content_type} if content_type else {}
+    assert decode_body(body, headers) == expected
+
+
+@pytest.mark.parametrize("body", ['{"a": "é"}', b'{"a": "\xc3\xa9"}'])
+def test_request_body_text(tmp_path, mock, body):
+    path = tmp_path / "out.har"
+    with HarWriter(str(path)) as writer:
+        s = session()
+        s.add_hook(har_hook(writer))
+        s.post(URL, data=body, headers={"Content-Type": "application/json"})
+    entry = json.loads(path.read_text())["log"]["entries"][0]
+    assert entry["request"]["postData"]["text"] == '{"a": "é"}'
@@ -0,0 +1,101 @@
+import pytest
+import requests_mock
+
+from apitist import RequestHook, ResponseHook
+from apitist.pipeline import HookIndex
+
+BASE = "http://testserver"
+
+calls = []
+
+
+class Record(ResponseHook):
+    def run(self, response):
+        calls.append(type(self).__name__)
+        return response
+
+
+class UsersHook(Record):
+    match_url = r"/users(/\d+)?$"
+
+
+class PostHook(Record):
+    match_methods = frozenset(["POST"])
+
+
+class NamedHook(Record):
+    match_names = frozenset(["Login"])
+
+
+@pytest.fixture
+def s(s, mock):
+    calls.clear()
+    mock.register_uri(requests_mock.ANY, requests_mock.ANY, text="ok")
+    s.base_url = BASE
+    return s
+
+
+class TestHookDispatch:
+    @pytest.mark.parametrize(
+        "method,url,name,expected",
+        [
+            ("GET", "/users", None, ["UsersHook"]),
+            ("GET", "/users/1", None, ["UsersHook"]),
+            ("GET", "/users/1/items", None, []),
+            ("POST", "/users", None, ["UsersHook", "PostHook"]),
+            ("POST", "/login", "Login", ["PostHook", "NamedHook"]),
+            ("GET", "/login", "Other", []),
+        ],
+    )
+    def test_filters(self, s, method, url, name, expected):
+        s.add_hooks(UsersHook, PostHook, NamedHook)
+        s.request(method, url, name=name)
+        assert calls == expected
+
+    def test_matching(self, s):
+        hook = Record.matching(url="/items", methods="get", names=["A"])
+        assert hook.match_methods == {"GET"}
+        assert hook.match_names == {"A"}
+        assert issubclass(hook, Record)
+        s.add_hook(hook)
+        s.get("/items", name="A")
+        s.get("/items", name="B")
+        s.post("/items", name="A")
+        assert calls == ["Record"]
+
+    def test_priority(self, s):
+        s.add_hooks(
+            UsersHook.matching(priority=10),
+            PostHook.matching(methods=["GET"]),
+            Record.matching(priority=-1),
+        )
+        s.get("/users")
+        assert calls == ["Record", "PostHook", "UsersHook"]
+
+    def test_request_hooks(self, s):
+        class Header(RequestHook):
+            match_url = "/secure"
+
+            def run(self, request):
+                request.headers["X-Secure"] = "1"
+                return request
+
+        s.add_hook(Header)
+        assert s.get("/secure").request.headers["X-Secure"] == "1"
+        assert "X-Secure" not in s.get("/public").request.headers
+
+    def test_index_rebuilt_on_change(self, s):
+        s.add_hook(UsersHook)
+        s.get("/users")
+        index = s.pipeline.hook_index(s.response_hooks)
+        assert s.pipeline.hook_index(s.response_hooks) is index
+        s.response_hooks.append(PostHook)
+        s.post("/users")
+        assert s.pipeline.hook_index(s.response_hooks) is not index
+        assert calls == ["UsersHook", "UsersHook", "PostHook"]
+
+
+def test_unconditional_hooks_are_not_filtered():
+    index = HookIndex([Record, Record])
+    assert not index.conditional
+    assert index.select(None) is index.hooks
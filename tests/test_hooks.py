@@ -29,7 +29,7 @@ from apitist.hooks import (
     ResponseHook,
     ResponseInfoLoggingHook,
 )
-from apitist.requests import Session, session
+from apitist.requests import ApitistResponse, Session, session
 
 
 @attr.s
@@ -371,3 +371,158 @@ class TestHooks:
         session.add_hook(ResponseAttrsConverterHook)
         with pytest.raises((ValueError, TypeError)):
             session.post("http://httpbin.org/post", structure_type=Session)
+
+
+@pytest.fixture
+def mocked(session, mock):
+    mock.get("http://testserver/data", json={"test": "value"})
+    mock.get("http://testserver/error", status_code=404, json={"test": "e"})
+    mock.get("http://testserver/empty", text="")
+    return session
+
+
+class TestResponseStructure:
+    def test_structure_is_class_method(self, mocked):
+        mocked.add_hook(ResponseAttrsConverterHook)
+        res = mocked.get("http://testserver/data")
+        assert "structure" not in vars(res)
+        assert res.converter is not None
+        assert res.structure(ExampleData).data == ExampleData("value")
+
+    def test_structure_without_converter(self, mocked):
+        res = mocked.get(
+            "http://testserver/data", structure_type=ExampleDataclass
+        )
+        assert res.converter is None
+        assert res.structure(ExampleDataclass) is res
+        assert getattr(res, "data", None) is None
+
+    def test_structure_missmatch(self, mocked):
+        mocked.add_hook(ResponseDataclassConverterHook)
+        with pytest.raises(TypeError, match="miss-matched"):
+            mocked.get(
+                "http://testserver/data",
+                structure_type=ExampleResponseDataclass,
+            )
+
+    def test_response_class_converter(self, mocked):
+        class Response(ApitistResponse):
+            converter = DataclassConverter()
+
+        mocked.response_class = Response
+        res = mocked.get(
+            "http://testserver/data", structure_type=ExampleDataclass
+        )
+        assert res.data == ExampleDataclass("value")
+
+
+class TestLazyStructure:
+    @pytest.fixture
+    def lazy(self, mocked):
+        mocked.lazy_structure = True
+        mocked.add_hook(ResponseDataclassConverterHook)
+        return mocked
+
+    def test_structured_on_access(self, lazy, monkeypatch):
+        res = lazy.get(
+            "http://testserver/data", structure_type=ExampleDataclass
+        )
+        assert "data" not in vars(res)
+        assert res.data == ExampleDataclass("value")
+        monkeypatch.setattr(res.converter, "structure", pytest.fail)
+        assert res.data is res.data
+
+    def test_not_parsed_if_not_accessed(self, lazy, monkeypatch):
+        monkeypatch.setattr(ApitistResponse, "json", pytest.fail)
+        res = lazy.get(
+            "http://testserver/data", structure_type=ExampleDataclass
+        )
+        assert res.status_code == 200
+
+    def test_error_type(self, lazy):
+        res = lazy.get(
+            "http://testserver/error",
+            structure_type=ExampleResponseDataclass,
+            structure_err_type=ExampleDataclass,
+        )
+        assert res.data == ExampleDataclass("e")
+
+    def test_errors_raised_on_access(self, lazy):
+        res = lazy.get(
+            "http://testserver/data", structure_type=ExampleResponseDataclass
+        )
+        for _ in range(2):
+            with pytest.raises(TypeError, match="miss-matched"):
+                res.data
+
+    @pytest.mark.parametrize(
+        "url,kwargs",
+        [
+            ("http://testserver/empty", {"structure_type": ExampleDataclass}),
+            ("http://testserver/error", {"structure_type": ExampleDataclass}),
+            ("http://testserver/data", {}),
+        ],
+    )
+    def test_no_data(self, lazy, url, kwargs):
+        res = lazy.get(url, **kwargs)
+        assert getattr(res, "data", None) is None
+        with pytest.raises(AttributeError):
+            res.data
+
+
+class TestReleaseContent:
+    @pytest.fixture
+    def release(self, mocked):
+        mocked.release_content = True
+        mocked.add_hook(ResponseDataclassConverterHook)
+        return mocked
+
+    def test_released_after_structure(self, release):
+        res = release.get(
+            "http://testserver/data", structure_type=ExampleDataclass
+        )
+        assert res.data == ExampleDataclass("value")
+        assert res.content_released
+        assert res.content_size == 17
+        assert res.content_digest == (
+            "4e0b1f3b9b1e08306ab4e388a65847c73a902097"
+        )
+        with pytest.raises(RuntimeError, match="released after"):
+            res.json()
+
+    def test_lazy(self, release):
+        release.lazy_structure = True
+        res = release.get(
+            "http://testserver/data", structure_type=ExampleDataclass
+        )
+        assert not res.content_released
+        assert res.data == ExampleDataclass("value")
+        assert res.content_released
+
+    def test_kept_if_not_structured(self, release):
+        res = release.get("http://testserver/data")
+        assert not res.content_released
+        assert res.json() == {"test": "value"}
+
+    def test_verify_response(self, release):
+        res = release.get(
+            "http://testserver/error",
+            structure_type=ExampleResponseDataclass,
+            structure_err_type=ExampleDataclass,
+        )
+        with pytest.raises(ValueError, match="<released 13 bytes, sha1 "):
+            res.verify_response()
+
+    def test_kept_for_background_hooks(self, release):
+        class Background(ResponseHook):
+            run_in_background = True
+
+            def run(self, response):
+                return response
+
+        release.add_hook(Background)
+        res = release.get(
+            "http://testserver/data", structure_type=ExampleDataclass
+        )
+        release.close()
+        assert not res.content_released
@@ -0,0 +1,159 @@
+import gzip
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from apitist import ResponseDataclassConverterHook, session
+from test_adapters import Echo
+
+h2 = pytest.importorskip("h2")
+pytest.importorskip("httpx")
+
+import h2.config  # noqa: E402
+import h2.connection  # noqa: E402
+import h2.events  # noqa: E402
+
+
+class H2CServer:
+    """Minimal HTTP/2 cleartext (prior knowledge) echo server"""
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        self.streams = 0
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(
+                target=self.handle, args=(conn,), daemon=True
+            ).start()
+
+    def handle(self, sock):
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+        requests, bodies = {}, {}
+        while True:
+            data = sock.recv(65535)
+            if not data:
+                sock.close()
+                return
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    requests[event.stream_id] = dict(event.headers)
+                    bodies[event.stream_id] = b""
+                elif isinstance(event, h2.events.DataReceived):
+                    bodies[event.stream_id] += event.data
+                    conn.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id
+                    )
+                elif isinstance(event, h2.events.StreamEnded):
+                    self.respond(
+                        conn,
+                        event.stream_id,
+                        requests.pop(event.stream_id),
+                        bodies.pop(event.stream_id),
+                    )
+            sock.sendall(conn.data_to_send())
+
+    def respond(self, conn, stream_id, headers, body):
+        self.streams += 1
+        path = headers[b":path"].decode()
+        path, _, query = path.partition("?")
+        data = json.dumps(
+            {
+                "method": headers[b":method"].decode(),
+                "path": path,
+                "query": query,
+                "body": body.decode(),
+            }
+        ).encode()
+        response_headers = [
+            (":status", "200"),
+            ("content-type", "application/json"),
+            ("set-cookie", "h2=1"),
+        ]
+        if path == "/gzip":
+            data = gzip.compress(data)
+            response_headers.append(("content-encoding", "gzip"))
+        response_headers.append(("content-length", str(len(data))))
+        conn.send_headers(stream_id, response_headers)
+        conn.send_data(stream_id, data, end_stream=True)
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = H2CServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def s(server):
+    s = session(f"http://127.0.0.1:{server.port}")
+    s.mount_http2("http://")
+    s.add_hook(ResponseDataclassConverterHook)
+    yield s
+    s.close()
+
+
+class TestHTTP2:
+    def test_http2_request(self, s):
+        res = s.post(
+            "/echo", data="hello", params={"q": "1"}, structure_type=Echo
+        )
+        assert res.status_code == 200
+        assert res.http_version == "HTTP/2"
+        assert res.data == Echo("POST", "/echo", "q=1", "hello")
+        assert s.cookies["h2"] == "1"
+
+    def test_http2_file_body(self, s, tmp_path):
+        path = tmp_path / "body.txt"
+        path.write_text("x" * 10000)
+        with open(path, "rb") as f:
+            res = s.put("/upload", data=f)
+        assert res.json()["body"] == "x" * 10000
+
+    @pytest.mark.parametrize("stream", [True, False])
+    def test_http2_gzip(self, s, stream):
+        res = s.get("/gzip", stream=stream)
+        assert res.headers["Content-Encoding"] == "gzip"
+        assert res.json()["path"] == "/gzip"
+
+    def test_http2_multiplexed(self, s, server):
+        connections = server.connections
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(lambda i: s.get(f"/item/{i}").json(), range(50))
+            )
+        assert [r["path"] for r in results] == [
+            f"/item/{i}" for i in range(50)
+        ]
+        # Requests of all threads share a single connection
+        assert server.connections - connections == 1
+
+    def test_http2_generator_body(self, s):
+        res = s.post("/upload", data=(c for c in [b"a", b"b"]))
+        assert res.json()["body"] == "ab"
+
+    def test_http2_reopened_after_close(self, s, server):
+        s.get("/item")
+        s.close()
+        assert s.get("/item").status_code == 200
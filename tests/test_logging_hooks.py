@@ -0,0 +1,267 @@
+import logging
+import threading
+from datetime import timedelta
+
+import pytest
+import requests_mock
+
+from apitist import (
+    PrepRequestInfoLoggingHook,
+    RequestInfoLoggingHook,
+    ResponseDebugLoggingHook,
+    ResponseInfoLoggingHook,
+)
+from apitist.hooks import (
+    BaseLogging,
+    compile_formatter,
+    compile_snapshot,
+    truncate_body,
+)
+from apitist.logging import BackgroundLogger, Logging, LogSampler
+
+URL = "http://testserver/items"
+BODY = b"x" * 1000
+
+
+@pytest.fixture(autouse=True)
+def items(mock):
+    mock.register_uri(requests_mock.ANY, URL, content=BODY)
+
+
+def records(capture):
+    """Records of apitist logger, requests are logged by requests_mock too"""
+    return [r for r in capture.records if r.name == Logging.logger.name]
+
+
+@pytest.fixture
+def background():
+    yield Logging.start_background()
+    Logging.stop_background()
+
+
+class TruncatedResponseHook(ResponseInfoLoggingHook):
+    max_body_length = 10
+
+
+class TestLoggingHooks:
+    def test_disabled_level_is_not_formatted(self, s, capture, monkeypatch):
+        def fail(*args):
+            raise AssertionError("Disabled record is formatted")
+
+        monkeypatch.setattr(BaseLogging, "format", fail)
+        s.add_hook(ResponseDebugLoggingHook)
+        s.get(URL)
+        assert not records(capture)
+
+    def test_body_not_read_if_not_used(self, s, capture, monkeypatch):
+        class NoBody(ResponseInfoLoggingHook):
+            formatter = "Response {data.status_code}"
+
+        monkeypatch.setattr(BaseLogging, "get_body", pytest.fail)
+        s.add_hook(NoBody)
+        s.get(URL)
+        assert records(capture)[0].msg == "Response 200"
+
+    def test_truncated_body(self, s, capture):
+        s.add_hook(TruncatedResponseHook)
+        s.get(URL)
+        assert records(capture)[0].msg.endswith("b'xxxxxxxxxx'... [990 more]")
+
+    def test_truncated_request_data(self, s, capture):
+        class Truncated(RequestInfoLoggingHook):
+            max_body_length = 5
+
+        s.add_hooks(Truncated, PrepRequestInfoLoggingHook)
+        s.post(URL, data="y" * 10)
+        assert records(capture)[0].msg.endswith("yyyyy... [5 more]")
+        assert records(capture)[1].msg.endswith("y" * 10)
+
+    def test_truncated_spooled_body(self, s, capture):
+        s.spool_threshold = 100
+        s.add_hook(TruncatedResponseHook)
+        res = s.get(URL)
+        assert res.spooled_body is not None
+        assert records(capture)[0].msg.endswith("... [990 more]")
+
+    def test_name_formatter(self, s, capture):
+        s.add_hook(ResponseInfoLoggingHook)
+        s.get(URL, name="Items")
+        assert "Items" in records(capture)[0].msg
+        assert URL not in records(capture)[0].msg
+
+    def test_compile_formatter(self):
+        formatter = "Request {data.method} {data.url} {body!r}"
+        assert compile_formatter(formatter) == (
+            formatter,
+            "Request {data.method} {data.name} {body!r}",
+            True,
+        )
+        assert compile_formatter(formatter) is compile_formatter(formatter)
+        assert not compile_formatter("{data.url} {data.body}")[2]
+
+
+@pytest.mark.parametrize(
+    "body,limit,expected",
+    [
+        (None, 3, None),
+        ("abc", None, "abc"),
+        ("abc", 3, "abc"),
+        ("abcd", 3, "abc... [1 more]"),
+        (b"abcd", 3, "b'abc'... [1 more]"),
+        ({"key": "value"}, 5, "{'key... [11 more]"),
+    ],
+)
+def test_truncate_body(body, limit, expected):
+    assert truncate_body(body, limit) == expected
+
+
+def test_info_level_by_default():
+    assert not ResponseDebugLoggingHook().is_enabled()
+    assert ResponseInfoLoggingHook().is_enabled()
+    assert ResponseInfoLoggingHook.logging_level == logging.INFO
+
+
+class TestBackgroundLogging:
+    def test_logged_in_worker_thread(self, s, capture, background):
+        s.add_hooks(RequestInfoLoggingHook, TruncatedResponseHook)
+        s.post(URL, json={"key": "value"}, name="Items")
+        s.close()
+        assert [r.msg for r in records(capture)] == [
+            "Request POST Items {}",
+            "Response 200 POST Items b'xxxxxxxxxx'... [990 more]",
+        ]
+        assert {r.threadName for r in records(capture)} == {"apitist-logging"}
+
+    def test_snapshot_is_immutable(self, s, capture, background):
+        class DataHook(RequestInfoLoggingHook):
+            formatter = "{data.method} {data.params!r}"
+
+        s.add_hook(DataHook)
+        params = {"page": 1}
+        s.get(URL, params=params)
+        params["page"] = 2
+        Logging.flush()
+        assert records(capture)[0].msg == "GET {'page': 1}"
+
+    def test_drop_if_full(self, capture):
+        logger = BackgroundLogger(max_queue=1)
+        waiting = _Waiting()
+        # Worker is blocked by the first record
+        logger.put(logging.INFO, "{0}", (waiting,))
+        waiting.started.wait(5)
+        logger.put(logging.INFO, "{0}", ("queued",))
+        assert not logger.put(logging.INFO, "{0}", ("dropped",))
+        assert logger.dropped == 1
+        waiting.event.set()
+        logger.close()
+        assert [r.msg for r in records(capture)] == ["done", "queued"]
+
+    def test_disabled_level_is_not_enqueued(self, s, background):
+        s.add_hook(ResponseDebugLoggingHook)
+        s.get(URL)
+        assert background._queue.unfinished_tasks == 0
+
+
+class _Waiting:
+    def __init__(self):
+        self.started = threading.Event()
+        self.event = threading.Event()
+
+    def __format__(self, spec):
+        self.started.set()
+        self.event.wait(5)
+        return "done"
+
+
+@pytest.mark.parametrize(
+    "formatter,expected",
+    [
+        ("plain {{text}}", ("plain {{text}}", ())),
+        (
+            "{data.url} {body!r:>10}",
+            ("{0} {1!r:>10}", ("data.url", "body")),
+        ),
+        ("{data.items[0]}", ("{0}", ("data.items[0]",))),
+    ],
+)
+def test_compile_snapshot(formatter, expected):
+    assert compile_snapshot(formatter) == expected
+
+
+class _Response:
+    def __init__(self, status_code=200, elapsed=0.1, name=None):
+        self.status_code = status_code
+        self.elapsed = timedelta(seconds=elapsed)
+        self.name = name
+
+
+class TestLogSampler:
+    def test_every(self):
+        sampler = LogSampler(every=3)
+        assert [sampler.allow(_Response()) for _ in range(6)] == [
+            True,
+            False,
+            False,
+            True,
+            False,
+            False,
+        ]
+        assert sampler.suppressed == {"sampled": 4}
+
+    @pytest.mark.parametrize(
+        "kwargs,status,elapsed,expected",
+        [
+            ({"errors_only": True}, 200, 5, False),
+            ({"errors_only": True}, 404, 0, True),
+            ({"slow_threshold": 1}, 200, 0.5, False),
+            ({"slow_threshold": 1}, 200, 1.5, True),
+            ({"errors_only": True, "slow_threshold": 1}, 500, 0, True),
+            ({"errors_only": True, "slow_threshold": 1}, 200, 2, True),
+            ({"errors_only": True, "slow_threshold": 1}, 200, 0, False),
+        ],
+    )
+    def test_filters(self, kwargs, status, elapsed, expected):
+        sampler = LogSampler(**kwargs)
+        assert sampler.allow(_Response(status, elapsed)) is expected
+        assert sampler.total_suppressed == (not expected)
+
+    def test_requests_are_not_filtered(self):
+        assert LogSampler(errors_only=True).allow(object())
+
+    def test_rate_limit_per_name(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr("apitist.logging.time.monotonic", lambda: now[0])
+        sampler = LogSampler(rate_limit=2)
+        allowed = [sampler.allow(_Response(name="a")) for _ in range(3)]
+        assert allowed == [True, True, False]
+        assert sampler.allow(_Response(name="b"))
+        now[0] = 0.5
+        assert sampler.allow(_Response(name="a"))
+        assert not sampler.allow(_Response(name="a"))
+        assert sampler.suppressed == {"rate_limited": 2}
+
+    def test_rate_limit_below_one(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr("apitist.logging.time.monotonic", lambda: now[0])
+        sampler = LogSampler(rate_limit=0.5)
+        assert sampler.allow(_Response())
+        assert not sampler.allow(_Response())
+        now[0] = 1.0
+        assert not sampler.allow(_Response())
+        now[0] = 2.0
+        assert sampler.allow(_Response())
+        now[0] = 10.0
+        # No burst is accumulated
+        assert sampler.allow(_Response())
+        assert not sampler.allow(_Response())
+
+    def test_hook(self, s, capture):
+        class Sampled(ResponseInfoLoggingHook):
+            formatter = "Response {data.status_code}"
+            sampler = LogSampler(every=2)
+
+        s.add_hook(Sampled)
+        for _ in range(4):
+            s.get(URL)
+        assert len(records(capture)) == 2
+        assert Sampled.sampler.suppressed["sampled"] == 2
@@ -0,0 +1,148 @@
+import json
+from io import BytesIO
+
+import pytest
+
+from requests.models import RequestEncodingMixin
+
+from apitist import PrepRequestInfoLoggingHook, session
+from apitist.multipart import MappedFile, MultipartEncoder
+
+HOST = "http://testserver"
+
+
+def echo_app(environ, start_response):
+    body = environ["wsgi.input"].read()
+    start_response("200 OK", [("Content-Type", "application/json")])
+    return [
+        json.dumps(
+            {
+                "content_type": environ.get("CONTENT_TYPE"),
+                "content_length": environ.get("CONTENT_LENGTH"),
+                "chunked": environ.get("HTTP_TRANSFER_ENCODING"),
+                "body": body.decode("latin-1"),
+            }
+        ).encode()
+    ]
+
+
+@pytest.fixture
+def big_file(tmp_path):
+    path = tmp_path / "big.bin"
+    path.write_bytes(bytes(range(256)) * 1024)
+    return str(path)
+
+
+def expected_body(data, files, boundary):
+    body, content_type = RequestEncodingMixin._encode_files(files, data)
+    original_boundary = content_type.split("boundary=")[1]
+    return body.replace(original_boundary.encode(), boundary.encode())
+
+
+class TestMultipart:
+    def test_encoder_body(self, big_file):
+        data = {"field": "value", "list": ["1", "2"]}
+        with open(big_file, "rb") as f:
+            expected = expected_body(
+                data,
+                {"file": f, "text": ("a.txt", "text", "text/plain")},
+                "boundary",
+            )
+        with open(big_file, "rb") as f:
+            encoder = MultipartEncoder(
+                data,
+                {"file": f, "text": ("a.txt", "text", "text/plain")},
+                boundary="boundary",
+            )
+            assert encoder.len == len(expected)
+            assert b"".join(encoder) == expected
+
+    def test_encoder_read_size(self):
+        encoder = MultipartEncoder({"a": "b"}, {"f": ("f", b"123")})
+        body = b""
+        while True:
+            chunk = encoder.read(3)
+            if not chunk:
+                break
+            assert len(chunk) <= 3
+            body += chunk
+        assert len(body) == encoder.len
+
+    def test_encoder_rewind(self, big_file):
+        with open(big_file, "rb") as f:
+            f.read(10)
+            encoder = MultipartEncoder({"a": "b"}, {"f": ("f", f)})
+            body = b"".join(encoder)
+            assert encoder.tell() == len(body)
+            assert encoder.seek(0) == 0
+            assert b"".join(encoder) == body
+            with pytest.raises(OSError):
+                encoder.seek(10)
+
+    def test_encoder_unknown_length(self):
+        class Stream:
+            def __init__(self):
+                self.data = BytesIO(b"data")
+
+            def read(self, size=-1):
+                return self.data.read(size)
+
+        encoder = MultipartEncoder(files={"f": ("f", Stream())})
+        assert encoder.len is None
+        assert b"data" in b"".join(encoder)
+        with pytest.raises(OSError):
+            encoder.seek(0)
+
+    def test_mapped_file(self, big_file):
+        with MappedFile(big_file) as f, open(big_file, "rb") as original:
+            assert f.len == 256 * 1024
+            assert f.read(10) == original.read(10)
+            assert f.tell() == 10
+            assert f.read() == original.read()
+            f.seek(0)
+            assert len(f.read(-1)) == 256 * 1024
+
+    def test_mapped_empty_file(self, tmp_path):
+        path = tmp_path / "empty"
+        path.write_bytes(b"")
+        with MappedFile(str(path)) as f:
+            assert f.len == 0
+            assert f.read() == b""
+
+    @pytest.mark.parametrize("mapped", [True, False])
+    def test_session_stream_uploads(self, big_file, mapped):
+        s = session(HOST, stream_uploads=True)
+        s.mount_wsgi(echo_app)
+        f = MappedFile(big_file) if mapped else open(big_file, "rb")
+        with f:
+            res = s.post("/upload", data={"a": "b"}, files={"file": f})
+        result = res.json()
+        assert result["content_type"].startswith("multipart/form-data")
+        assert int(result["content_length"]) == len(result["body"])
+        with open(big_file, "rb") as original:
+            assert original.read().decode("latin-1") in result["body"]
+
+    def test_stream_uploads_headers_not_changed(self):
+        s = session(HOST, stream_uploads=True)
+        s.mount_wsgi(echo_app)
+        headers = {"X-Test": "1"}
+        s.post("/upload", files={"file": ("f", b"1")}, headers=headers)
+        assert headers == {"X-Test": "1"}
+        res = s.post("/upload", json={"a": 1}, headers=headers)
+        assert res.json()["content_type"] == "application/json"
+
+    def test_mapped_file_body(self, big_file):
+        s = session(HOST)
+        s.mount_wsgi(echo_app)
+        with MappedFile(big_file) as f:
+            res = s.post("/upload", data=f)
+        assert res.json()["content_length"] == str(256 * 1024)
+
+    def test_stream_uploads_logging(self, big_file, capture):
+        s = session(HOST, stream_uploads=True)
+        s.mount_wsgi(echo_app)
+        s.add_hook(PrepRequestInfoLoggingHook)
+        with open(big_file, "rb") as f:
+            s.post("/upload", files={"file": f})
+        assert len(capture.records) == 1
+        assert "<streamed body <MultipartEncoder" in capture.records[0].msg
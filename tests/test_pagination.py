@@ -0,0 +1,158 @@
+import typing
+from dataclasses import dataclass
+
+import pytest
+
+from apitist import ResponseDataclassConverterHook
+from apitist.pagination import (
+    CursorPagination,
+    LinkHeaderPagination,
+    OffsetPagination,
+    PageNumberPagination,
+)
+
+HOST = "https://example.com"
+ITEMS = list(range(25))
+
+
+@pytest.fixture
+def s(s):
+    s.base_url = HOST
+    return s
+
+
+@dataclass
+class Item:
+    id: int
+
+
+@dataclass
+class Page:
+    results: typing.List[Item]
+
+
+@dataclass
+class CursorItems:
+    items: typing.List[Item]
+
+
+@dataclass
+class CursorPage:
+    data: CursorItems
+    next_cursor: typing.Optional[str]
+
+
+def page_number(request, context):
+    page, size = int(request.qs["page"][0]), int(request.qs["size"][0])
+    return {"results": ITEMS[(page - 1) * size : page * size]}
+
+
+def structured_page_number(request, context):
+    page = page_number(request, context)
+    return {"results": [{"id": i} for i in page["results"]]}
+
+
+def offset(request, context):
+    off, limit = int(request.qs["offset"][0]), int(request.qs["limit"][0])
+    return ITEMS[off : off + limit]
+
+
+def cursor(request, context):
+    start = int(request.qs.get("cursor", [0])[0])
+    end = start + 10
+    return {
+        "data": {"items": ITEMS[start:end]},
+        "next_cursor": str(end) if end < len(ITEMS) else None,
+    }
+
+
+def structured_cursor(request, context):
+    page = cursor(request, context)
+    page["data"]["items"] = [{"id": i} for i in page["data"]["items"]]
+    return page
+
+
+def link(request, context):
+    start = int(request.qs.get("start", [0])[0])
+    end = start + 10
+    if end < len(ITEMS):
+        context.headers["Link"] = f'<{HOST}/items?start={end}>; rel="next"'
+    return ITEMS[start:end]
+
+
+class TestPagination:
+    @pytest.mark.parametrize("prefetch", [True, False])
+    @pytest.mark.parametrize(
+        "callback,pagination",
+        [
+            (
+                page_number,
+                PageNumberPagination(
+                    page_size=10, page_size_param="size", items_key="results"
+                ),
+            ),
+            (offset, OffsetPagination(limit=10)),
+            (cursor, CursorPagination(items_key="data.items")),
+            (link, LinkHeaderPagination()),
+        ],
+    )
+    def test_paginate(self, s, mock, callback, pagination, prefetch):
+        mock.get(f"{HOST}/items", json=callback)
+        items = list(
+            s.paginate("GET", "/items", pagination, prefetch=prefetch)
+        )
+        assert items == ITEMS
+        assert mock.call_count == 3
+
+    def test_paginate_lazy(self, s, mock):
+        mock.get(f"{HOST}/items", json=offset)
+        items = s.paginate(
+            "GET", "/items", OffsetPagination(limit=10), prefetch=False
+        )
+        assert mock.call_count == 0
+        assert next(items) == 0
+        assert mock.call_count == 1
+
+    def test_paginate_max_pages(self, s, mock):
+        mock.get(f"{HOST}/items", json=offset)
+        items = list(
+            s.paginate(
+                "GET", "/items", OffsetPagination(limit=10), max_pages=2
+            )
+        )
+        assert items == ITEMS[:20]
+        assert mock.call_count == 2
+
+    def test_paginate_structured(self, s, mock):
+        s.add_hook(ResponseDataclassConverterHook)
+        mock.get(f"{HOST}/items", json=structured_page_number)
+        items = list(
+            s.paginate(
+                "GET",
+                "/items",
+                PageNumberPagination(
+                    page_size=10,
+                    page_size_param="size",
+                    items_key="results",
+                ),
+                structure_type=Page,
+                params={"filter": "all"},
+            )
+        )
+        assert items == [Item(i) for i in ITEMS]
+        assert mock.request_history[0].qs["filter"] == ["all"]
+
+    def test_paginate_cursor_released_content(self, s, mock):
+        s.release_content = True
+        s.add_hook(ResponseDataclassConverterHook)
+        mock.get(f"{HOST}/items", json=structured_cursor)
+        items = list(
+            s.paginate(
+                "GET",
+                "/items",
+                CursorPagination(items_key="data.items"),
+                structure_type=CursorPage,
+            )
+        )
+        assert items == [Item(i) for i in ITEMS]
+        assert mock.call_count == 3
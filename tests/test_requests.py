@@ -4,7 +4,7 @@ import requests_mock
 from requests_mock import NoMockAddress
 from test_hooks import ExampleResponseDataclass
 
-from apitist import ResponseDataclassConverterHook
+from apitist import RequestHook, ResponseDataclassConverterHook
 from apitist import decorators as deco
 from apitist import session
 from apitist.requests import SharedSession
@@ -242,3 +242,84 @@ class TestRequests:
 
         with pytest.raises(Exception):
             Test().test()
+
+    def test_cache_environment(self, monkeypatch):
+        monkeypatch.setenv("HTTPS_PROXY", "http://proxy:3128")
+        s = session("https://httpbin.org", cache_environment=True)
+        settings = s.merge_environment_settings(
+            "https://httpbin.org/get", {}, None, None, None
+        )
+        assert settings["proxies"]["https"] == "http://proxy:3128"
+
+        monkeypatch.setenv("HTTPS_PROXY", "http://other:3128")
+        settings = s.merge_environment_settings(
+            "https://httpbin.org/get", {}, None, None, None
+        )
+        assert settings["proxies"]["https"] == "http://proxy:3128"
+
+        s.refresh_environment()
+        settings = s.merge_environment_settings(
+            "https://httpbin.org/get", {}, None, None, None
+        )
+        assert settings["proxies"]["https"] == "http://other:3128"
+
+    def test_cache_environment_per_host(self, monkeypatch):
+        monkeypatch.setenv("HTTPS_PROXY", "http://proxy:3128")
+        monkeypatch.setenv("NO_PROXY", "example.com")
+        s = session(cache_environment=True)
+        with_proxy = s.merge_environment_settings(
+            "https://httpbin.org/get", {}, None, None, None
+        )
+        without_proxy = s.merge_environment_settings(
+            "https://example.com/get", {}, None, None, None
+        )
+        assert "https" in with_proxy["proxies"]
+        assert "https" not in without_proxy["proxies"]
+
+    def test_cache_environment_request(self):
+        host = "https://httpbin.org"
+        s = session(host, cache_environment=True)
+        with requests_mock.Mocker() as m:
+            m.get(f"{host}/get", text="mocked")
+            s.get("/get")
+            s.get("/get", verify=False)
+            s.get("/get")
+            assert len(s._environment_cache) == 2
+            assert list(s._netrc_cache) == ["httpbin.org"]
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_cache_environment_no_netrc(self, monkeypatch, compact):
+        calls = []
+
+        def get_netrc_auth(url):
+            calls.append(url)
+
+        for module in ("apitist.requests", "requests.sessions"):
+            monkeypatch.setattr(f"{module}.get_netrc_auth", get_netrc_auth)
+        host = "https://httpbin.org"
+        s = session(host, cache_environment=True, compact_cookies=compact)
+        with requests_mock.Mocker() as m:
+            m.get(f"{host}/get", text="mocked")
+            for _ in range(5):
+                s.get("/get")
+        assert len(calls) == 1
+
+    def test_netrc_auth_not_in_request_hooks(self, monkeypatch, tmp_path):
+        netrc = tmp_path / "netrc"
+        netrc.write_text("machine httpbin.org login user password secret\n")
+        monkeypatch.setenv("NETRC", str(netrc))
+        auths = []
+
+        class AuthHook(RequestHook):
+            def run(self, request):
+                auths.append(request.auth)
+                return request
+
+        host = "https://httpbin.org"
+        s = session(host, cache_environment=True)
+        s.add_hook(AuthHook)
+        with requests_mock.Mocker() as m:
+            m.get(f"{host}/get", text="mocked")
+            res = s.get("/get")
+        assert auths == [None]
+        assert res.request.headers["Authorization"].startswith("Basic ")
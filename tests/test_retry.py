@@ -0,0 +1,196 @@
+import io
+
+import pytest
+
+import requests_mock
+from requests.exceptions import ConnectTimeout
+
+from apitist import session
+from apitist.multipart import MappedFile
+from apitist.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+)
+
+HOST = "https://example.com"
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(total=2, backoff_factor=0)
+
+
+class TestRetry:
+    def test_retry_status(self, policy):
+        s = session(HOST, retry_policy=policy)
+        with requests_mock.Mocker() as m:
+            m.get(
+                f"{HOST}/get",
+                [{"status_code": 503}, {"status_code": 200, "text": "ok"}],
+            )
+            res = s.get("/get", name="Get")
+            assert res.text == "ok"
+            assert m.call_count == 2
+            assert res.request.name == "Get"
+
+    def test_retry_exhausted(self, policy):
+        s = session(HOST, retry_policy=policy)
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", status_code=503)
+            res = s.get("/get")
+            assert res.status_code == 503
+            assert m.call_count == 3
+
+    def test_retry_exception(self, policy):
+        s = session(HOST, retry_policy=policy)
+        with requests_mock.Mocker() as m:
+            m.get(
+                f"{HOST}/get",
+                [{"exc": ConnectTimeout}, {"status_code": 200}],
+            )
+            assert s.get("/get").status_code == 200
+            assert m.call_count == 2
+
+    def test_no_retry_not_idempotent(self, policy):
+        s = session(HOST, retry_policy=policy)
+        with requests_mock.Mocker() as m:
+            m.post(f"{HOST}/post", status_code=503)
+            s.post("/post")
+            assert m.call_count == 1
+
+    def test_no_retry_unknown_exception(self, policy):
+        s = session(HOST, retry_policy=policy)
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", exc=KeyError)
+            with pytest.raises(KeyError):
+                s.get("/get")
+            assert m.call_count == 1
+
+    def test_retry_budget(self):
+        budget = RetryBudget(ratio=0, min_retries=1)
+        s = session(
+            HOST, retry_policy=RetryPolicy(backoff_factor=0, budget=budget)
+        )
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", status_code=503)
+            s.get("/get")
+            s.get("/get")
+            assert m.call_count == 3
+
+    @pytest.mark.parametrize(
+        "jitter,attempt,expected",
+        [(False, 0, 0), (False, 1, 0.5), (False, 3, 2), (False, 10, 5)],
+    )
+    def test_backoff(self, jitter, attempt, expected):
+        policy = RetryPolicy(backoff_factor=0.5, backoff_max=5, jitter=jitter)
+        assert policy.get_backoff(attempt) == expected
+
+    def test_backoff_jitter(self):
+        policy = RetryPolicy(backoff_factor=1, backoff_max=5)
+        assert 0 <= policy.get_backoff(4) <= 5
+
+
+class FlakyApp:
+    """WSGI application failing with 503 first, keeps received bodies"""
+
+    def __init__(self):
+        self.bodies = []
+
+    def __call__(self, environ, start_response):
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        self.bodies.append(environ["wsgi.input"].read(length))
+        status = "503 Unavailable" if len(self.bodies) == 1 else "200 OK"
+        start_response(status, [])
+        return [b""]
+
+
+@pytest.fixture
+def flaky(policy):
+    s = session(HOST, retry_policy=policy)
+    app = FlakyApp()
+    s.mount_wsgi(app)
+    return s, app
+
+
+class TestRetryBody:
+    def test_file_body_rewound(self, flaky):
+        s, app = flaky
+        assert s.put("/put", data=io.BytesIO(b"payload")).status_code == 200
+        assert app.bodies == [b"payload", b"payload"]
+
+    def test_mapped_file_rewound(self, flaky, tmp_path):
+        s, app = flaky
+        path = tmp_path / "body.bin"
+        path.write_bytes(b"mapped")
+        with MappedFile(str(path)) as f:
+            assert s.put("/put", data=f).status_code == 200
+        assert app.bodies == [b"mapped", b"mapped"]
+
+    def test_multipart_rewound(self, policy):
+        s = session(HOST, retry_policy=policy, stream_uploads=True)
+        app = FlakyApp()
+        s.mount_wsgi(app)
+        res = s.put("/put", files={"file": ("f.txt", io.BytesIO(b"data"))})
+        assert res.status_code == 200
+        assert len(app.bodies) == 2
+        assert app.bodies[0] == app.bodies[1]
+        assert b"data" in app.bodies[0]
+
+    def test_not_rewindable_not_retried(self, flaky):
+        s, app = flaky
+        res = s.put("/put", data=(c for c in [b"a", b"b"]))
+        assert res.status_code == 503
+        assert app.bodies == [b"ab"]
+
+
+class TestCircuitBreaker:
+    def test_circuit_opens(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        s = session(HOST, circuit_breaker=breaker)
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", status_code=500)
+            s.get("/get")
+            s.get("/get")
+            with pytest.raises(CircuitOpenError):
+                s.get("/get")
+            assert m.call_count == 2
+            assert breaker.is_open("example.com")
+
+    def test_circuit_half_open(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        s = session(HOST, circuit_breaker=breaker)
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", [{"status_code": 500}, {"status_code": 200}])
+            s.get("/get")
+            assert breaker.is_open("example.com")
+            s.get("/get")
+            assert not breaker.is_open("example.com")
+
+    def test_circuit_by_name(self):
+        breaker = CircuitBreaker(failure_threshold=1, key="name")
+        s = session(HOST, circuit_breaker=breaker)
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", status_code=500)
+            s.get("/get", name="Broken")
+            s.get("/get", name="Other")
+            with pytest.raises(CircuitOpenError):
+                s.get("/get", name="Broken")
+
+    def test_circuit_stops_retries(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        s = session(
+            HOST,
+            retry_policy=RetryPolicy(total=5, backoff_factor=0),
+            circuit_breaker=breaker,
+        )
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", status_code=503)
+            with pytest.raises(CircuitOpenError):
+                s.get("/get")
+            assert m.call_count == 2
+
+    def test_circuit_incorrect_key(self):
+        with pytest.raises(ValueError):
+            CircuitBreaker(key="path")
@@ -0,0 +1,52 @@
+import typing
+from dataclasses import dataclass
+
+import requests_mock
+
+from apitist import ResponseDataclassConverterHook, session
+
+HOST = "https://example.com"
+ITEMS = [{"id": i, "name": "x" * 50} for i in range(200)]
+
+
+@dataclass
+class Item:
+    id: int
+    name: str
+
+
+class TestSpool:
+    def test_spool_large_body(self, tmp_path):
+        s = session(
+            HOST, spool_threshold=1024, spool_directory=str(tmp_path)
+        )
+        s.add_hook(ResponseDataclassConverterHook)
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/items", json=ITEMS)
+            res = s.get("/items", structure_type=typing.List[Item])
+        body = res.spooled_body
+        assert body is not None
+        assert body.on_disk
+        assert res._content is False
+        assert res.json() == ITEMS
+        assert res.data[10] == Item(**ITEMS[10])
+        assert b"".join(res.iter_content(100)) == res.content
+        assert "".join(res.iter_content(100, decode_unicode=True)) == res.text
+        res.close()
+        assert body.closed
+
+    def test_spool_small_body(self):
+        s = session(HOST, spool_threshold=1024)
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/item", json=ITEMS[0])
+            res = s.get("/item")
+        assert res.spooled_body is None
+        assert res.json() == ITEMS[0]
+
+    def test_spool_explicit_stream(self):
+        s = session(HOST, spool_threshold=1024)
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/items", json=ITEMS)
+            res = s.get("/items", stream=True)
+        assert res.spooled_body is None
+        assert res.json() == ITEMS
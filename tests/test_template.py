@@ -0,0 +1,93 @@
+import json
+from dataclasses import dataclass
+
+import pytest
+
+import requests_mock
+
+from apitist import (
+    RequestDataclassConverterHook,
+    ResponseDataclassConverterHook,
+    session,
+)
+from apitist.requests import PreparedRequestHook
+
+HOST = "https://example.com"
+
+
+@dataclass
+class User:
+    id: int
+
+
+class NameHook(PreparedRequestHook):
+    names = []
+
+    def run(self, request):
+        self.names.append(request.name)
+        return request
+
+
+@pytest.fixture
+def s():
+    s = session(HOST)
+    s.headers["X-Session"] = "1"
+    s.cookies.set("token", "abc")
+    s.add_hooks(
+        RequestDataclassConverterHook, ResponseDataclassConverterHook
+    )
+    return s
+
+
+class TestTemplate:
+    def test_template_url(self, s):
+        get_user = s.template(
+            "get", "/users/{id}", params={"a": "1"}, structure_type=User
+        )
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/users/1", json={"id": 1})
+            m.get(f"{HOST}/users/2", json={"id": 2})
+            assert get_user(id=1).data == User(1)
+            assert get_user(id=2, params={"b": "2"}).data == User(2)
+            first, second = m.request_history
+            assert first.qs == {"a": ["1"]}
+            assert second.qs == {"a": ["1"], "b": ["2"]}
+            assert second.headers["X-Session"] == "1"
+            assert second.headers["Cookie"] == "token=abc"
+
+    def test_template_body(self, s):
+        create = s.template("POST", "/users", auth=("user", "pass"))
+        with requests_mock.Mocker() as m:
+            m.post(f"{HOST}/users", text="ok")
+            create(data=User(1))
+            create(json={"id": 2}, headers={"X-Call": "2"})
+            create()
+            first, second, third = m.request_history
+            assert json.loads(first.text) == {"id": 1}
+            assert first.headers["Content-Type"] == "application/json"
+            assert first.headers["Authorization"].startswith("Basic")
+            assert second.json() == {"id": 2}
+            assert second.headers["X-Call"] == "2"
+            assert "X-Call" not in third.headers
+            assert third.headers["Content-Length"] == "0"
+
+    def test_template_hooks(self, s):
+        s.add_hook(NameHook)
+        get = s.template("GET", "/get", name="Get template")
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", text="ok")
+            res = get()
+            assert res.name == "Get template"
+            assert NameHook.names == ["Get template"]
+
+    def test_template_refresh(self, s):
+        get = s.template("GET", "/get")
+        s.cookies.set("token", "new")
+        with requests_mock.Mocker() as m:
+            m.get(f"{HOST}/get", text="ok")
+            get()
+            get.refresh()
+            get()
+            first, second = m.request_history
+            assert first.headers["Cookie"] == "token=abc"
+            assert second.headers["Cookie"] == "token=new"
@@ -0,0 +1,324 @@
+"""
+Conformance tests, which every :class:`Transport` should pass.
+New transports are added to ``TRANSPORTS``.
+"""
+import json
+import socket
+import threading
+from dataclasses import dataclass
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import pytest
+from requests import ConnectionError, Request, Response
+
+from apitist import (
+    RequestHook,
+    RequestsTransport,
+    ResponseDataclassConverterHook,
+    ResponseHook,
+    Transport,
+    Urllib3Transport,
+    session,
+)
+from apitist.requests import ApitistResponse
+
+TRANSPORTS = [RequestsTransport, Urllib3Transport]
+
+
+@dataclass
+class Echo:
+    method: str
+    path: str
+    query: str
+    body: str
+    headers: dict
+
+
+@dataclass
+class Error:
+    error: str
+
+
+def echo_app(environ, start_response):
+    body = environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))
+    path = environ["PATH_INFO"]
+    if path.endswith("redirect"):
+        start_response("302 Found", [("Location", "/api/target")])
+        return [b""]
+    if path.endswith("missing"):
+        start_response(
+            "404 Not Found", [("Content-Type", "application/json")]
+        )
+        return [json.dumps({"error": "missing"}).encode()]
+    data = {
+        "method": environ["REQUEST_METHOD"],
+        "path": path,
+        "query": environ["QUERY_STRING"],
+        "body": body.decode(),
+        "headers": {
+            key[5:].lower(): value
+            for key, value in environ.items()
+            if key.startswith("HTTP_X_")
+        },
+    }
+    start_response(
+        "200 OK",
+        [("Content-Type", "application/json"), ("X-Server", "echo")],
+    )
+    return [json.dumps(data).encode()]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = make_server("127.0.0.1", 0, echo_app, handler_class=QuietHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(params=TRANSPORTS)
+def s(request, server):
+    s = session(server + "/api", transport=request.param())
+    s.add_hook(ResponseDataclassConverterHook)
+    yield s
+    s.close()
+
+
+class TestTransportConformance:
+    def test_base_url_and_params(self, s):
+        res = s.get("/users", params={"q": "1"}, structure_type=Echo)
+        assert res.status_code == 200
+        assert res.headers["X-Server"] == "echo"
+        assert res.data.method == "GET"
+        assert res.data.path == "/api/users"
+        assert res.data.query == "q=1"
+
+    def test_absolute_url(self, s, server):
+        res = s.get(server + "/other")
+        assert res.json()["path"] == "/other"
+
+    def test_json_body(self, s):
+        res = s.post("/users", json={"id": 1}, structure_type=Echo)
+        assert json.loads(res.data.body) == {"id": 1}
+
+    def test_data_body(self, s):
+        res = s.put("/users", data="raw", structure_type=Echo)
+        assert res.data.method == "PUT"
+        assert res.data.body == "raw"
+
+    def test_headers(self, s):
+        s.headers["X-Session"] = "1"
+        res = s.get("/", headers={"X-Request": "2"}, structure_type=Echo)
+        assert res.data.headers == {"x_session": "1", "x_request": "2"}
+
+    def test_hooks(self, s):
+        seen = []
+
+        class AddHeader(RequestHook):
+            def run(self, request: Request) -> Request:
+                seen.append(("request", request.name))
+                request.headers = dict(request.headers or {})
+                request.headers["X-Hook"] = "1"
+                return request
+
+        class Record(ResponseHook):
+            def run(self, response: Response) -> Response:
+                seen.append(("response", response.name))
+                assert isinstance(response, ApitistResponse)
+                return response
+
+        s.add_hooks(AddHeader, Record)
+        res = s.get("/", name="Root", structure_type=Echo)
+        assert res.name == "Root"
+        assert res.data.headers == {"x_hook": "1"}
+        assert seen == [("request", "Root"), ("response", "Root")]
+
+    def test_structure_err_type(self, s):
+        res = s.get("/missing", structure_type=Echo, structure_err_type=Error)
+        assert res.status_code == 404
+        assert res.data == Error("missing")
+
+    def test_redirect(self, s):
+        res = s.get("/redirect")
+        assert res.json()["path"] == "/api/target"
+        res = s.get("/redirect", allow_redirects=False)
+        assert res.status_code == 302
+
+    def test_post_redirect(self, s):
+        res = s.post("/redirect", data="body")
+        assert res.json()["method"] == "GET"
+        assert res.json()["body"] == ""
+        res = s.template("POST", "/redirect")(data="body")
+        assert res.json()["method"] == "GET"
+        res = s.post("/redirect", data="body", allow_redirects=False)
+        assert res.status_code == 302
+
+    def test_stream(self, s):
+        res = s.get("/stream", stream=True)
+        body = b"".join(res.iter_content(8))
+        assert json.loads(body)["path"] == "/api/stream"
+
+    def test_template(self, s):
+        template = s.template(
+            "POST", "/users/{id}", structure_type=Echo, name="Create"
+        )
+        res = template(id=1, params={"q": "1"}, json={"id": 1})
+        assert res.name == "Create"
+        assert res.data.path == "/api/users/1"
+        assert res.data.query == "q=1"
+        assert json.loads(res.data.body) == {"id": 1}
+
+    def test_template_headers_and_err_type(self, s):
+        s.headers["X-Session"] = "1"
+        template = s.template(
+            "GET",
+            "/{path}",
+            headers={"X-Template": "2"},
+            structure_type=Echo,
+            structure_err_type=Error,
+        )
+        res = template(path="users", headers={"X-Call": "3"})
+        assert res.data.headers == {
+            "x_session": "1",
+            "x_template": "2",
+            "x_call": "3",
+        }
+        assert template(path="missing").data == Error("missing")
+
+    def test_template_session_params(self, s):
+        s.params = {"api_key": "k", "q": "0"}
+        template = s.template("GET", "/users/{id}", structure_type=Echo)
+        res = template(id=1, params={"q": "1"})
+        expected = s.get("/users/1", params={"q": "1"}, structure_type=Echo)
+        assert res.data.query == expected.data.query == "api_key=k&q=1"
+
+    def test_connection_error(self, s):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        with pytest.raises(ConnectionError):
+            s.get(f"http://127.0.0.1:{port}/", timeout=5)
+
+
+class FakeTransport(Transport):
+    def __init__(self):
+        self.requests = []
+        self.closed = False
+
+    def send(self, session, request, **options) -> Response:
+        self.requests.append((request, options))
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"error": "fake"}'
+        response.request = request
+        return response
+
+    def close(self):
+        self.closed = True
+
+
+def test_custom_transport():
+    transport = FakeTransport()
+    s = session("http://fake", transport=transport)
+    s.add_hook(ResponseDataclassConverterHook)
+    res = s.get("/users", timeout=3, structure_type=Error, name="Fake")
+    assert res.data == Error("fake")
+    assert res.name == "Fake"
+    request, options = transport.requests[0]
+    assert request.url == "http://fake/users"
+    assert options["timeout"] == 3
+    s.close()
+    assert transport.closed
+
+
+def test_custom_transport_template():
+    transport = FakeTransport()
+    s = session("http://fake", transport=transport)
+    s.add_hook(ResponseDataclassConverterHook)
+    template = s.template("GET", "/users/{id}", timeout=3, name="Fake")
+    res = template(id=1, structure_type=None)
+    assert res.status_code == 200
+    assert res.name == "Fake"
+    request, options = transport.requests[0]
+    assert request.url == "http://fake/users/1"
+    assert options["timeout"] == 3
+
+
+class TestUrllib3Transport:
+    @pytest.fixture
+    def fast(self, server):
+        s = session(server + "/api", fast_path=True)
+        yield s
+        s.close()
+
+    def test_fast_path_session(self, fast):
+        assert isinstance(fast.transport, Urllib3Transport)
+        res = fast.get("/users")
+        assert res.json()["path"] == "/api/users"
+
+    @pytest.mark.parametrize(
+        "kwargs,options,simple",
+        [
+            ({}, {}, True),
+            ({"json": {"a": 1}}, {"verify": True}, True),
+            ({"cookies": {"a": "1"}}, {}, False),
+            ({"auth": ("user", "password")}, {}, False),
+            ({"files": {"file": b"data"}}, {}, False),
+            ({"data": iter([b"data"])}, {}, False),
+            ({}, {"proxies": {"http": "http://proxy"}}, False),
+            ({}, {"verify": False}, False),
+            ({"method": "POST"}, {}, False),
+            ({"method": "POST"}, {"allow_redirects": False}, True),
+            ({"method": "HEAD"}, {}, True),
+        ],
+    )
+    def test_is_simple(self, fast, kwargs, options, simple):
+        kwargs = dict({"method": "GET", "url": fast.base_url}, **kwargs)
+        request = Request(**kwargs)
+        assert fast.transport.is_simple(fast, request, options) is simple
+
+    def test_is_simple_session_hooks(self, fast):
+        called = []
+        fast.hooks["response"].append(lambda r, **kwargs: called.append(r))
+        request = Request("GET", fast.base_url)
+        assert not fast.transport.is_simple(fast, request, {})
+        fast.get("/users")
+        fast.template("GET", "/users")()
+        assert len(called) == 2
+
+    def test_session_settings_fallback(self, fast):
+        request = Request("GET", fast.base_url)
+        fast.cookies.set("a", "1")
+        assert not fast.transport.is_simple(fast, request, {})
+        fast.cookies.clear()
+        fast.mount_wsgi(echo_app)
+        assert not fast.transport.is_simple(fast, request, {})
+
+    def test_template_fast_path(self, fast, monkeypatch):
+        sent = []
+        urlopen = fast.transport._urlopen
+        monkeypatch.setattr(
+            fast.transport,
+            "_urlopen",
+            lambda session, prep, *args: sent.append(prep.url)
+            or urlopen(session, prep, *args),
+        )
+        res = fast.template("GET", "/users/{id}")(id=1)
+        assert res.json()["path"] == "/api/users/1"
+        assert sent == [res.request.url]
+        fast.cookies.set("a", "1")
+        assert fast.template("GET", "/users")().status_code == 200
+        assert len(sent) == 1
+
+    def test_fallback_to_mounted_adapter(self, fast):
+        fast.mount_wsgi(echo_app, "http://testserver")
+        res = fast.get("http://testserver/wsgi")
+        assert res.json()["path"] == "/wsgi"